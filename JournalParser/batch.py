@@ -0,0 +1,192 @@
+import time
+import datetime
+from JournalParser.markgrid import MarkMatrix, HAS_NUMPY, np
+from JournalParser.rules import RuleEngine, enabled_rules, needed_columns, ordered
+
+
+class MarkTensor:
+    """
+    Checked subject-terms of the school as padded arrays, subject-term is the first axis:
+    marks: int16 (items x students x lessons) cell codes, 0 is the empty cell, -1 is padding
+    types: int16 (items x lessons) lesson type codes, -1 is padding
+    metas: bool (items x lessons), dates: int (items x lessons) ordinals
+    avg, avg_ok, term, term_ok: (items x rows) parsed term marks of the first page
+    Real lengths of the columns are kept in *_len, lessons and students arrays (items)
+    """
+    def __init__(self, items: list):
+        self.items = items
+        self.subjects = [data.subject for data in items]
+        count = len(items)
+
+        self.lessons = np.array([data.lessons_count() for data in items], dtype=np.int32)
+        self.students = np.array([len(data.marks) for data in items], dtype=np.int32)
+        lessons = max([max(len(data.dates), len(data.lesson_types), len(data.lesson_metas)) for data in items] +
+                      self.lessons.tolist() + [0])
+        students = max(self.students.tolist() + [0])
+        rows = max([len(data.term_marks) for data in items] + [0])
+
+        self.mark_codes = {'': 0}
+        self.type_codes = {}
+        self.marks = np.full((count, students, lessons), -1, dtype=np.int16)
+        self.types = np.full((count, lessons), -1, dtype=np.int16)
+        self.metas = np.zeros((count, lessons), dtype=bool)
+        self.dates = np.zeros((count, lessons), dtype=np.int32)
+        self.avg = np.zeros((count, rows), dtype=float)
+        self.avg_ok = np.zeros((count, rows), dtype=bool)
+        self.term = np.zeros((count, rows), dtype=np.int32)
+        self.term_ok = np.zeros((count, rows), dtype=bool)
+
+        for k, data in enumerate(items):
+            self.__fill(k, data)
+
+        self.types_len = np.array([len(data.lesson_types) for data in items], dtype=np.int32)
+        self.metas_len = np.array([len(data.lesson_metas) for data in items], dtype=np.int32)
+        self.dates_len = np.array([len(data.dates) for data in items], dtype=np.int32)
+        self.term_len = np.array([len(data.term_marks) for data in items], dtype=np.int32)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __fill(self, k, data: 'CheckData'):
+        types = [self.type_codes.setdefault(l_type, len(self.type_codes)) for l_type in data.lesson_types]
+        self.types[k, :len(types)] = types
+        self.metas[k, :len(data.lesson_metas)] = [bool(meta) for meta in data.lesson_metas]
+        self.dates[k, :len(data.dates)] = [date.toordinal() for date in data.dates]
+
+        students, lessons = len(data.marks), data.lessons_count()
+        if isinstance(data.marks, MarkMatrix):
+            lookup = np.array([self.mark_codes.setdefault(symbol, len(self.mark_codes)) for symbol in data.marks.symbols],
+                              dtype=np.int16)
+            self.marks[k, :students, :lessons] = lookup[data.marks.codes]
+        elif students:
+            cells = [self.mark_codes.setdefault(mark, len(self.mark_codes)) for row in data.marks for mark in row]
+            self.marks[k, :students, :lessons] = np.array(cells, dtype=np.int16).reshape(students, lessons)
+
+        for i, (avg_m, term_m) in enumerate(data.term_marks):
+            if not term_m.isdigit():
+                continue
+            self.term[k, i], self.term_ok[k, i] = int(term_m), True
+            try:
+                self.avg[k, i], self.avg_ok[k, i] = float(avg_m.replace(',', '.')), True
+            except ValueError:
+                pass
+
+    @staticmethod
+    def fits(data: 'CheckData', columns: frozenset):
+        """
+        Subject-terms with ragged marks or columns of different lengths are checked item by item,
+        so they give the same warnings (and errors) as RuleEngine
+        :param columns: columns the rules read
+        :return: True if data can be a part of the tensor
+        """
+        lessons = data.lessons_count()
+        if len(data.marks) and not lessons:
+            return False
+        if not isinstance(data.marks, MarkMatrix) and any(len(row) != lessons for row in data.marks):
+            return False
+
+        if 'lesson_types' in columns and lessons > len(data.lesson_types):
+            return False
+
+        return 'dates' not in columns or (len(data.lesson_metas) <= len(data.dates) and lessons <= len(data.dates))
+
+    def upto(self, lengths: 'np.ndarray', size: int):
+        """
+        :return: bool (items x size), True where index < the item's length
+        """
+        return np.arange(size)[None, :] < lengths[:, None]
+
+    def types_in(self, values):
+        codes = [self.type_codes[value] for value in values if value in self.type_codes]
+        return np.isin(self.types, codes)
+
+    def marks_in(self, values):
+        codes = [self.mark_codes[value] for value in values if value in self.mark_codes]
+        return np.isin(self.marks, codes)
+
+    def old(self):
+        """
+        :return: bool (items x lessons), True if teacher had a week to fill the lesson
+        """
+        return self.dates + 8 < datetime.date.today().toordinal()
+
+    def lookup(self, lengths: 'np.ndarray', rule):
+        """
+        Ratios are rounded with Python's round as the item by item checks do,
+        so rule(count, length) is computed once for every distinct length and looked up by count
+        :return: bool (items x max count + 1), False for zero lengths
+        """
+        width = max(self.marks.shape[1:]) + 1
+        table = np.zeros((len(self), width), dtype=bool)
+        for length in set(lengths.tolist()):
+            if length:
+                table[lengths == length] = [rule(count, length) for count in range(width)]
+
+        return table
+
+
+class BatchEvaluator:
+    """
+    Checks all the subject-terms of the run at once. Warnings only hand their data in with add,
+    evaluate fills their warnings. Rules without batch are checked item by item as in RuleEngine.
+    Time spent in every rule is summed in costs: {rule_name: seconds}
+    """
+    def __init__(self, PARAMS):
+        self._PARAMS = PARAMS
+        self.rules = enabled_rules(PARAMS)
+        self.costs = {rule.name: 0.0 for rule in self.rules}
+        self._pending = [] #[(Warnings, CheckData), ...]
+
+    def add(self, warns: 'Warnings', data: 'CheckData'):
+        self._pending.append((warns, data))
+
+    def evaluate(self, tensor: 'MarkTensor' = None):
+        """
+        :param tensor: MarkTensor returned by the evaluator of another params profile for the same data.
+        It's reused if it holds the data this evaluator checks in the tensor
+        :return: MarkTensor of the checked data
+        """
+        pending, self._pending = self._pending, []
+        found = [[] for _ in pending] #(section, index, rule position, warnings) of every item
+        columns = needed_columns(self._PARAMS)
+        items = [k for k, (_, data) in enumerate(pending) if MarkTensor.fits(data, columns)]
+
+        for k in set(range(len(pending))) - set(items):
+            engine = RuleEngine(self._PARAMS, self.rules)
+            found[k] = engine.found(pending[k][1])
+            self.__add_costs(engine.costs)
+
+        data = [pending[k][1] for k in items]
+        if tensor is None or len(tensor.items) != len(data) or any(a is not b for a, b in zip(tensor.items, data)):
+            tensor = MarkTensor(data)
+
+        for pos, rule in enumerate(self.rules):
+            start = time.perf_counter()
+            hits = rule.batch(tensor, self._PARAMS)
+
+            if hits is None:
+                engine = RuleEngine(self._PARAMS, [rule])
+                for k in items:
+                    found[k] += [(section, i, pos, warns) for section, i, _, warns in engine.found(pending[k][1])]
+            else:
+                for item, i, warns in hits:
+                    found[items[item]].append((rule.section, int(i), pos, warns))
+
+            self.costs[rule.name] += time.perf_counter() - start
+
+        for (warns, _), item_found in zip(pending, found):
+            warns.warnings = ordered(item_found)
+
+        return tensor
+
+    def __add_costs(self, costs):
+        for name, seconds in costs.items():
+            self.costs[name] += seconds
+
+
+def create_batch(PARAMS):
+    """
+    :return: BatchEvaluator or None if batch checks are off or numpy isn't installed
+    """
+    if PARAMS.batch_checks and HAS_NUMPY:
+        return BatchEvaluator(PARAMS)
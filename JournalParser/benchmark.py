@@ -0,0 +1,159 @@
+"""
+Compares parser backends on saved journal pages:
+    python -m JournalParser.benchmark page1.html pages_dir/ ... [-n 10]
+    python -m JournalParser.benchmark --cache cache
+Directories are searched for *.html, --cache takes journal pages from the disk cache.
+Also measures what raw bytes mode saves per page: r.text with guessed or known charset vs bytes handed to the parser
+"""
+
+import os
+import sys
+import time
+import zlib
+import sqlite3
+import argparse
+import requests
+from JournalParser.parser import make_soup, HAS_LXML
+from JournalParser.fastextract import scan_table, ScanError
+
+MODES = (
+    ('html.parser', False),
+    ('html.parser', True),
+    ('lxml', False),
+    ('lxml', True),
+)
+
+
+def load_files(paths):
+    """
+    :return: list of pages' bytes
+    """
+    pages = []
+    for path in paths:
+        if os.path.isdir(path):
+            names = sorted(name for name in os.listdir(path) if name.endswith('.html'))
+            pages += load_files([os.path.join(path, name) for name in names])
+        else:
+            with open(path, 'rb') as inf:
+                pages.append(inf.read())
+
+    return pages
+
+
+def load_cache(cache_dir):
+    """
+    :return: list of journal pages' bytes stored in the disk cache
+    """
+    db = sqlite3.connect(os.path.join(cache_dir, 'responses.sqlite3'))
+    rows = db.execute("SELECT body FROM entries WHERE key LIKE '%|journal:%'").fetchall()
+    db.close()
+
+    return [zlib.decompress(body) for body, in rows]
+
+
+def journal_table(page: bytes, backend, strain):
+    return make_soup(page, 'journal', backend=backend, strain=strain).find('table', {'class': 'table'})
+
+
+def table_text(page: bytes, backend, strain):
+    """
+    :return: text of the journal table or None if the backend hasn't found it
+    """
+    table = journal_table(page, backend, strain)
+    return table.get_text() if table is not None else None
+
+
+def body_rows(table):
+    return [[cell.text.strip() for cell in row.find_all('td')] for row in table.find('tbody').find_all('tr')]
+
+
+def scanned_rows(page: bytes):
+    try:
+        return scan_table(page).body_rows
+    except ScanError:
+        return
+
+
+def response(page: bytes, charset: str = None):
+    """
+    :param charset: None is a response without charset in Content-Type, requests guesses it from the body then
+    :return: requests.Response with the page as its body
+    """
+    r = requests.models.Response()
+    r.status_code = 200
+    r._content = page
+    r.encoding = charset
+
+    return r
+
+
+def bench(pages, parse, repeat):
+    """
+    :return: average seconds per page
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            parse(page)
+
+    return (time.perf_counter() - start) / (repeat * len(pages))
+
+
+def report(mode, seconds, base_time, same):
+    print(f'{mode:<24} {seconds * 1000:8.2f} мс/стр.  x{base_time / seconds:4.1f}  '
+          f'{"совпадает" if same else "ОТЛИЧАЕТСЯ"}')
+
+
+def main(argv=None):
+    args = argparse.ArgumentParser(description='Parser backends benchmark')
+    args.add_argument('paths', nargs='*', help='saved journal pages or directories with them')
+    args.add_argument('--cache', help='disk cache directory to take journal pages from')
+    args.add_argument('-n', type=int, default=5, help='times every page is parsed')
+    args = args.parse_args(argv)
+
+    pages = load_files(args.paths) + (load_cache(args.cache) if args.cache else [])
+    skipped = len(pages)
+    pages = [page for page in pages if journal_table(page, 'html.parser', False) is not None] #e.g. login or error pages
+    skipped -= len(pages)
+    if skipped:
+        print(f'Пропущено страниц без таблицы журнала: {skipped}')
+    if not pages:
+        print('Нет страниц для замера')
+        return 1
+
+    modes = [(backend, strain) for backend, strain in MODES if backend != 'lxml' or HAS_LXML]
+    reference = [table_text(page, 'html.parser', False) for page in pages]
+    base_time = None
+
+    print(f'Страниц: {len(pages)}, повторов: {args.n}')
+    for backend, strain in modes:
+        same = [table_text(page, backend, strain) for page in pages] == reference
+        seconds = bench(pages, lambda page: journal_table(page, backend, strain), args.n)
+        base_time = base_time or seconds
+
+        report(backend + (' + strainer' if strain else ''), seconds, base_time, same)
+
+    same = [scanned_rows(page) for page in pages] == [body_rows(journal_table(page, 'html.parser', False)) for page in pages]
+    report('scanner (fast_extract)', bench(pages, scanned_rows, args.n), base_time, same)
+
+    guessed = bench(pages, lambda page: response(page).text, args.n)
+    known = bench(pages, lambda page: response(page, 'utf-8').text, args.n)
+    print(f'r.text: {guessed * 1000:.2f} мс/стр. без charset в ответе (угадывается), {known * 1000:.2f} мс/стр. с ним')
+
+    backend = 'lxml' if HAS_LXML else 'html.parser'
+    text_time = bench(pages, lambda page: make_soup(response(page).text, 'journal', backend), args.n)
+    raw_time = bench(pages, lambda page: make_soup(page, 'journal', backend), args.n)
+    same = ([make_soup(page, 'journal', backend).get_text() for page in pages] ==
+            [make_soup(response(page).text, 'journal', backend).get_text() for page in pages])
+    report(f'r.text + {backend}', text_time, text_time, True)
+    report(f'bytes + {backend}', raw_time, text_time, same)
+    print(f'raw_bytes экономит {(text_time - raw_time) * 1000:.2f} мс/стр.')
+
+    if not HAS_LXML:
+        print('lxml не установлен')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,182 @@
+import os
+import time
+import zlib
+import sqlite3
+import threading
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+
+URL_CLASSES = (
+    ('journal', '/school/journal/school_editor'), #subject's journal pages
+    ('report', '/school/reports/'),
+    ('navigation', '/school/journal/'), #grades lists and grades' initial pages
+)
+
+DEFAULT_TTLS = { #seconds, None means the page never expires
+    'journal': 15 * 60,
+    'report': 15 * 60,
+    'navigation': 24 * 60 * 60,
+}
+
+
+def url_class(url):
+    """
+    :return: name of the url class from URL_CLASSES or None if the url shouldn't be cached
+    """
+    path = urlsplit(url).path
+    for name, prefix in URL_CLASSES:
+        if path.startswith(prefix):
+            return name
+    return
+
+
+def normalize_url(url):
+    """
+    Makes cache key from the url. Query params are sorted, journal pages are keyed only by
+    term, criteria, edu_class_id and page (the first page has no page param, it's the same as page=1)
+    :return: str
+    """
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+
+    if url_class(url) == 'journal':
+        return 'journal:{}:{}:{}:{}'.format(query.get('term'), query.get('criteria'), query.get('edu_class_id'),
+                                            query.get('page', '1'))
+
+    return '{}{}?{}'.format(parts.netloc, parts.path, urlencode(sorted(query.items())))
+
+
+class CachedResponse:
+    """
+    Response restored from the cache. Has the fields of requests.Response used in this app
+    """
+    status_code = 200
+
+    def __init__(self, url, content: bytes, encoding: str, headers: dict = None):
+        self.url = url
+        self.content = content
+        self.encoding = encoding
+        self.headers = headers or {}
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+
+class DiskCache:
+    """
+    SQLite storage of zlib-compressed response bodies. Least recently used entries are evicted
+    when the total size exceeds max_size bytes
+    """
+    def __init__(self, cache_dir: str, max_size: int):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(cache_dir, 'responses.sqlite3'), check_same_thread=False)
+        self._db.execute('CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, body BLOB, encoding TEXT, '
+                         'etag TEXT, last_modified TEXT, stored REAL, accessed REAL, size INTEGER)')
+        self._size = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def get(self, key):
+        """
+        :return: (body: bytes, encoding, etag, last_modified, stored: float) or None if there's no such entry
+        """
+        with self._lock:
+            row = self._db.execute('SELECT body, encoding, etag, last_modified, stored FROM entries WHERE key = ?',
+                                   (key,)).fetchone()
+            if row is None:
+                return
+
+            self._db.execute('UPDATE entries SET accessed = ? WHERE key = ?', (time.time(), key))
+            self._db.commit()
+
+        body, encoding, etag, last_modified, stored = row
+        return zlib.decompress(body), encoding, etag, last_modified, stored
+
+    def put(self, key, content: bytes, encoding, etag=None, last_modified=None):
+        body = zlib.compress(content)
+        now = time.time()
+
+        with self._lock:
+            old = self._db.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+            self._size += len(body) - (old[0] if old else 0)
+
+            self._db.execute('REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                             (key, body, encoding, etag, last_modified, now, now, len(body)))
+            self.__evict()
+            self._db.commit()
+
+    def touch(self, key):
+        """
+        Marks entry as fresh after successful revalidation
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute('UPDATE entries SET stored = ?, accessed = ? WHERE key = ?', (now, now, key))
+            self._db.commit()
+
+    def __evict(self):
+        """
+        Removes least recently used entries until the cache fits max_size. Lock must be held
+        """
+        while self._size > self.max_size:
+            row = self._db.execute('SELECT key, size FROM entries ORDER BY accessed LIMIT 1').fetchone()
+            if row is None:
+                self._size = 0
+                break
+            self._db.execute('DELETE FROM entries WHERE key = ?', (row[0],))
+            self._size -= row[1]
+
+
+class CachedSession:
+    """
+    Wraps SESSION so that GET requests are served from the disk cache while the page is fresh.
+    Expired pages are revalidated with If-None-Match/If-Modified-Since if the server sent validators.
+    Journal pages of closed terms never expire. Everything else is passed to the wrapped session
+    """
+    def __init__(self, SESSION, cache: 'DiskCache', namespace: str = '', ttls: dict = None, closed_terms=()):
+        self._SESSION = SESSION
+        self._cache = cache
+        self._namespace = namespace #different accounts must not share pages
+        self._ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self._closed_terms = {str(term) for term in closed_terms}
+
+    def __getattr__(self, name):
+        return getattr(self._SESSION, name)
+
+    def __ttl(self, url, cls):
+        if cls == 'journal' and dict(parse_qsl(urlsplit(url).query)).get('term') in self._closed_terms:
+            return
+        return self._ttls.get(cls, 0)
+
+    def get(self, url, **kwargs):
+        cls = url_class(url)
+        if cls is None:
+            return self._SESSION.get(url, **kwargs)
+
+        key = self._namespace + '|' + normalize_url(url)
+        entry = self._cache.get(key)
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        if entry:
+            content, encoding, etag, last_modified, stored = entry
+            ttl = self.__ttl(url, cls)
+            if ttl is None or time.time() - stored < ttl:
+                return CachedResponse(url, content, encoding)
+
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        r = self._SESSION.get(url, headers=headers, **kwargs)
+
+        if entry and r.status_code == 304:
+            self._cache.touch(key)
+            return CachedResponse(url, entry[0], entry[1])
+
+        if r.status_code == 200 and not urlsplit(r.url).path.startswith('/logon'): #never cache login form
+            self._cache.put(key, r.content, r.encoding, r.headers.get('ETag'), r.headers.get('Last-Modified'))
+
+        return r
@@ -0,0 +1,142 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from JournalParser.parser import make_soup, page_markup
+from JournalParser.objects import SubjectTables, Warnings
+from JournalParser.limiter import crawl_width
+from JournalParser.funcs import parse_initial_data, get_terms_range, journal_page_url, get_teacher, get_last_page, \
+    get_hidden_last_page
+
+
+class AsyncClient:
+    """
+    Semaphore-limited asyncio wrapper around blocking SESSION.
+    Requests are made in a thread pool, so the event loop never blocks on the network. Pages are parsed
+    and checked in the same pool, so it never blocks on BS4 either
+    """
+    def __init__(self, SESSION, limit: int):
+        self._SESSION = SESSION
+        self._semaphore = asyncio.Semaphore(limit)
+        self._executor = ThreadPoolExecutor(max_workers=limit)
+
+    async def get(self, url):
+        """
+        :param url:
+        :return: response text (bytes in raw bytes mode)
+        """
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            r = await loop.run_in_executor(self._executor, self._SESSION.get, url)
+        return page_markup(r)
+
+    async def run(self, func, *args):
+        """
+        Runs blocking func in the thread pool
+        :return: func's result
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+class Crawler:
+    """
+    Crawls journals of all the grades on one event loop. Every grade, subject, term and page is a separate task.
+    The result is the same dict execute() gets: {grade1: {subj1: [Warnings1t, ...], ..., subjN: [...]}, ..., gradeN: {...}}
+    """
+    def __init__(self, globals_cont: 'GlobalsContainer', pBar=None, label=None):
+        self._globals = globals_cont
+        self._PARAMS = globals_cont.PARAMS
+        self._pBar = pBar
+        self._label = label
+
+        self._progress = 0
+        self._subj_value = {}
+
+    def run(self, grades_to_link: dict):
+        """
+        Runs the crawl on a new event loop
+        :param grades_to_link: {grade1: link_to_journal, ..., gradeN: link_to_journal}
+        :return: data dict
+        """
+        return asyncio.run(self.crawl(grades_to_link))
+
+    async def crawl(self, grades_to_link: dict):
+        client = AsyncClient(self._globals.SESSION, max(crawl_width(self._PARAMS)))
+        grade_val = 95 / (len(grades_to_link) if grades_to_link else 1)
+
+        try:
+            grades = await asyncio.gather(*(self.__crawl_grade(client, grade, link, grade_val)
+                                            for grade, link in grades_to_link.items()))
+        finally:
+            client.close()
+
+        return dict(zip(grades_to_link.keys(), grades))
+
+    async def __crawl_grade(self, client, grade, link, grade_val):
+        """
+        :return: {subj1: [Warnings1t, ...], ..., subjN: [...]} without subjects having no Warnings
+        """
+        grade_id, subj_to_id = parse_initial_data(link, await client.get(link))
+        subj_value = grade_val / (len(subj_to_id) if subj_to_id else 1)
+
+        subjects = await asyncio.gather(*(self.__crawl_subject(client, grade, grade_id, subj_name, id_, subj_value)
+                                          for subj_name, id_ in subj_to_id.items()))
+
+        return {subj_name: warns for subj_name, warns in zip(subj_to_id.keys(), subjects) if warns}
+
+    async def __crawl_subject(self, client, grade, grade_id, subj_name, subj_id, subj_value):
+        """
+        :return: list [Warnings1t, ..., WarningsNt]
+        """
+        terms = await asyncio.gather(*(self.__crawl_term(client, grade, grade_id, subj_name, subj_id, term)
+                                       for term in get_terms_range(grade, self._PARAMS)))
+
+        self._progress += subj_value
+        if self._pBar:
+            self._pBar.emit(self._progress)
+
+        return [warns for warns in terms if warns]
+
+    async def __crawl_term(self, client, grade, grade_id, subj_name, subj_id, term):
+        """
+        Fetches all the pages of the subject's term and checks them. The first page is page 1 of the journal,
+        so it's not fetched twice
+        :return: Warnings or None if there's nothing to check
+        """
+        def url(page=None):
+            return journal_page_url(term, subj_id, grade_id, page, self._PARAMS.base_url)
+
+        first_page = await client.get(url())
+        first_soup = await client.run(make_soup, first_page)
+
+        if not get_teacher(first_soup):
+            return
+
+        if self._PARAMS.only_term:
+            last_page = 1
+        else:
+            last_page, exact = get_last_page(first_soup)
+            if not exact:
+                hidden_page = await client.get(url(last_page))
+                last_page = get_hidden_last_page(await client.run(make_soup, hidden_page))
+
+        raw_pages = [first_page]
+        raw_pages += await asyncio.gather(*(client.get(url(page_num)) for page_num in range(2, last_page + 1)))
+
+        if self._label:
+            self._label.emit(f'{grade} {subj_name} {term} четверть...')
+
+        return await client.run(self.__check, grade, term, grade_id, subj_name, subj_id, first_page, raw_pages)
+
+    def __check(self, grade, term, grade_id, subj_name, subj_id, first_page, raw_pages):
+        """
+        Parses fetched pages and checks them, runs in the client's thread pool
+        :return: Warnings or None if there's nothing to check
+        """
+        tables = SubjectTables(self._globals, grade, term, grade_id, subj_name, subj_id,
+                               first_page=first_page, raw_pages=raw_pages)
+
+        if tables.raw_pages:
+            return Warnings(self._globals, tables)
@@ -1,19 +1,23 @@
 """A part of this code was provided by Ramil Aglyamzanov"""
 
-import requests
+from urllib.parse import urlsplit
+from JournalParser.transport import create_session
+from JournalParser.cache import DiskCache, CachedSession
+from JournalParser.singleflight import SingleFlightSession
 
-def edu_auth(login, password):
-    s = requests.Session()
+def edu_auth(login, password, PARAMS=None):
+    s = create_session(PARAMS)
+    base_url = PARAMS.base_url if PARAMS is not None else 'https://edu.tatar.ru'
 
-    s.headers.update({"Host": "edu.tatar.ru",
+    s.headers.update({"Host": urlsplit(base_url).netloc,
                       "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
                                     "AppleWebKit/537.36 (KHTML, like Gecko) "
                                     "Chrome/89.0.4389.90 Safari/537.36"
                       })
-    h = {"Referer": "https://edu.tatar.ru/logon",
+    h = {"Referer": base_url + "/logon",
          }
 
-    r = s.post("https://edu.tatar.ru/logon", headers=h,
+    r = s.post(base_url + "/logon", headers=h,
                data={
                    "main_login2": login,
                    "main_password2": password}
@@ -24,4 +28,11 @@ def edu_auth(login, password):
     else:
         raise PermissionError('Не удалось войти в аккаунт. Убедитесь, что вы верно ввели логин/пароль и двухфакторная аутентификация отключена.')
 
+    if PARAMS is not None and PARAMS.cache:
+        s = CachedSession(s, DiskCache(PARAMS.cache_dir, PARAMS.cache_size), namespace=login,
+                          ttls=PARAMS.cache_ttls, closed_terms=PARAMS.closed_terms)
+
+    if PARAMS is not None and PARAMS.single_flight:
+        s = SingleFlightSession(s, PARAMS.flight_memo)
+
     return s
\ No newline at end of file
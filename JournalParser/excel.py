@@ -1,50 +1,92 @@
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font
 
+FILE_NAME = 'Проверка журналов.xlsx'
 
 
-def excelify(warnings: dict, order: str = 'grades'):
-    file = Workbook()
+class ExcelWriter:
+    """
+    Writes subjects' Warnings to the workbook one by one, in the same layout excelify does.
+    With write_only rows go straight to temporary files, so memory doesn't grow with the number of subjects
+    """
+    def __init__(self, order: str = 'grades', write_only: bool = False):
+        self.order = order
+        self.write_only = write_only
 
-    if order == 'grades':
-        for grade, subjs in warnings.items():
-            sheet = file.create_sheet(grade) #name sheet as a grade
-            for subj_name, warns_list in subjs.items():
-                sheet.append([subj_name]) # for each subj write its name
-                makebold(sheet)
-                sheet.append([warns_list[0].teacher]) #and teacher
-                makebold(sheet)
-                for w_list in warns_list:
-                    sheet.append([f'Четверть {w_list.term}']) #write term
-                    for row in w_list.warnings:
-                        sheet.append(row)
-                    create_space(sheet) #gap between terms
-                create_space(sheet) #gap between subjects
-
-    else: #by teachers ordering
+        self._file = Workbook(write_only=write_only)
+        if write_only:
+            self._file.create_sheet('Sheet') #the same sheets as in a usual workbook
+        self._sheets = {}
+
+    def __sheet(self, name):
+        if name not in self._sheets:
+            self._sheets[name] = self._file.create_sheet(name)
+        return self._sheets[name]
+
+    def __append_bold(self, sheet, value):
+        if self.write_only:
+            cell = WriteOnlyCell(sheet, value=value)
+            cell.font = Font(bold=True)
+            sheet.append([cell])
+        else:
+            sheet.append([value])
+            makebold(sheet)
+
+    def add_grade(self, grade):
+        """
+        Grade's sheet is created even if it has no warnings
+        """
+        if self.order == 'grades':
+            self.__sheet(grade)
+
+    def add_subject(self, grade, subj_name, warns_list: list):
+        """
+        :param warns_list: [Warnings1t, ..., WarningsNt]
+        """
+        if self.order == 'grades':
+            sheet = self.__sheet(grade)
+            self.__append_bold(sheet, subj_name) # for each subj write its name
+            self.__append_bold(sheet, warns_list[0].teacher) #and teacher
+            for w_list in warns_list:
+                sheet.append([f'Четверть {w_list.term}']) #write term
+                for row in w_list.warnings:
+                    sheet.append(row)
+                create_space(sheet) #gap between terms
+            create_space(sheet) #gap between subjects
+
+        else: #by teachers ordering
+            teacher = warns_list[0].teacher
+            initials = teacher.split()
+            initials = ' '.join([initials[0], initials[1][0], initials[-1][0]])
+
+            sheet = self.__sheet(initials)
+            for w_list in warns_list:
+                self.__append_bold(sheet, subj_name)
+                self.__append_bold(sheet, grade)
+                sheet.append([f'Четверть {w_list.term}'])
+                for row in w_list.warnings:
+                    sheet.append(row)
+                create_space(sheet)
+            create_space(sheet)
+
+    def add_data(self, warnings: dict):
+        """
+        :param warnings: {grade1: {subj1: [Warnings1t, ...], ..., subjN: [...]}, ..., gradeN: {...}}
+        """
         for grade, subjs in warnings.items():
+            self.add_grade(grade)
             for subj_name, warns_list in subjs.items():
-                teacher = warns_list[0].teacher
-                initials = teacher.split()
-                initials = ' '.join([initials[0], initials[1][0], initials[-1][0]])
-
-                if initials in file.sheetnames:
-                    sheet = file.get_sheet_by_name(initials)
-                else:
-                    sheet = file.create_sheet(initials)
-
-                for w_list in warns_list:
-                    sheet.append([subj_name])
-                    makebold(sheet)
-                    sheet.append([grade])
-                    makebold(sheet)
-                    sheet.append([f'Четверть {w_list.term}'])
-                    for row in w_list.warnings:
-                        sheet.append(row)
-                    create_space(sheet)
-                create_space(sheet)
+                self.add_subject(grade, subj_name, warns_list)
+
+    def save(self, path: str = FILE_NAME):
+        self._file.save(path)
+
 
-    file.save('Проверка журналов.xlsx')
+def excelify(warnings: dict, order: str = 'grades', path: str = FILE_NAME):
+    writer = ExcelWriter(order)
+    writer.add_data(warnings)
+    writer.save(path)
 
 def create_space(sheet, n=1):
     for i in range(n):
@@ -53,4 +95,4 @@ def create_space(sheet, n=1):
 def makebold(sheet):
     bold = Font(bold=True)
     cell = sheet.cell(sheet.max_row, 1)
-    cell.font = bold
\ No newline at end of file
+    cell.font = bold
@@ -0,0 +1,178 @@
+import re
+import html
+import hashlib
+
+TAG = re.compile(r'<!--.*?-->|<(/?)([a-zA-Z][\w:-]*)((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>', re.S)
+ATTR = re.compile(r'([^\s=/>]+)(?:\s*=\s*("[^"]*"|\'[^\']*\'|[^\s>]+))?')
+TABLE_START = re.compile(r'<table\b((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>', re.I)
+
+SECTIONS = ('thead', 'tbody', 'tfoot')
+UNSUPPORTED = ('table', 'script', 'style', 'textarea') #their contents can't be read as plain cell text
+
+
+class ScanError(Exception):
+    """
+    Table has something the scanner doesn't handle. The page is parsed with BS4 then
+    """
+
+
+class ScannedTable:
+    """
+    Journal <table> read by scan_table without building a DOM
+    head_rows: [[(text, attrs), ...], ...] <thead> rows, text is not stripped (month names are used as is)
+    body_rows: [[text, ...], ...] <tbody> rows, texts are stripped
+    hash: md5 of the table's html
+    """
+    def __init__(self, head_rows: list, body_rows: list, digest: str):
+        self.head_rows = head_rows
+        self.body_rows = body_rows
+        self.hash = digest
+
+    def months(self):
+        """
+        :return: [(month_name, colspan), ...] of the month cells
+        """
+        return [(text, int(attrs['colspan'])) for text, attrs in self.head_rows[0] if 'colspan' in attrs]
+
+    def days(self):
+        """
+        :return: [(day_number, colspan), ...] of the date cells
+        """
+        return [(int(text), int(attrs['colspan'])) for text, attrs in self.head_rows[1]]
+
+    def last_month(self):
+        return self.head_rows[0][-3][0].strip()
+
+    def last_day(self):
+        return int(self.head_rows[1][-1][0].strip())
+
+    def lesson_types(self):
+        return [text.strip() for text, _ in self.head_rows[-1]]
+
+    def lesson_titles(self):
+        """
+        :return: [True or falsy title, ...] of the lesson cells
+        """
+        return [True if attrs.get('title') else attrs.get('title') for _, attrs in self.head_rows[-1]]
+
+    def mark_rows(self):
+        return [cells[2: -2] for cells in self.body_rows]
+
+    def students(self):
+        return [cells[1] if len(cells) > 1 else '' for cells in self.body_rows]
+
+    def term_marks(self):
+        """
+        :return: [(avg1, term_mark1), ..., (avgN, term_markN)]
+        """
+        return [(cells[-2], cells[-1]) for cells in self.body_rows]
+
+
+def parse_attrs(source):
+    """
+    :return: dict {name: unescaped value}, valueless attributes get ''
+    """
+    attrs = {}
+    for name, value in ATTR.findall(source):
+        if value[:1] in ('"', "'"):
+            value = value[1:-1]
+        attrs[name.lower()] = html.unescape(value)
+
+    return attrs
+
+
+def find_table(page: str):
+    """
+    :return: position right after the opening tag of the first <table class="table">
+    """
+    for match in TABLE_START.finditer(page):
+        if 'table' in parse_attrs(match.group(1)).get('class', '').split():
+            return match.start(), match.end()
+
+    raise ScanError('journal table not found')
+
+
+def scan_table(page, encoding: str = 'utf-8'):
+    """
+    Reads the journal table in one pass over the page's html. Only well-formed tables are read,
+    anything unusual (nested tables, unclosed cells, scripts) raises ScanError
+    :param page: page's html, str or bytes in encoding
+    :return: ScannedTable
+    """
+    if isinstance(page, bytes):
+        try:
+            page = page.decode(encoding)
+        except (UnicodeDecodeError, LookupError):
+            raise ScanError(f'page is not {encoding}')
+
+    table_start, pos = find_table(page)
+    head_rows, body_rows = [], []
+    seen = set()
+    section = row = cell = None
+
+    for match in TAG.finditer(page, pos):
+        if cell is not None:
+            cell[0].append(page[pos:match.start()])
+        pos = match.end()
+
+        closing, name, source = match.groups()
+        if name is None: #comment
+            continue
+
+        name = name.lower()
+        if not closing and name in UNSUPPORTED:
+            raise ScanError(f'<{name}> in the table')
+
+        if name in SECTIONS:
+            if cell is not None or row is not None:
+                raise ScanError(f'<{name}> inside a row')
+            if closing:
+                section = None
+            elif name in seen or section:
+                raise ScanError(f'unexpected <{name}>')
+            else:
+                seen.add(name)
+                section = name
+
+        elif name == 'tr':
+            if cell is not None:
+                raise ScanError('unclosed cell')
+            if closing:
+                if row is not None and section == 'thead':
+                    head_rows.append(row)
+                elif row is not None and section == 'tbody':
+                    body_rows.append([html.unescape(text).strip() for text, _ in row])
+                row = None
+            elif row is not None:
+                raise ScanError('unclosed row')
+            else:
+                row = []
+
+        elif name == 'td':
+            if row is None:
+                raise ScanError('cell outside a row')
+            if closing:
+                if cell is None:
+                    raise ScanError('unexpected </td>')
+                row.append((''.join(cell[0]), cell[1]))
+                cell = None
+            elif cell is not None:
+                raise ScanError('unclosed cell')
+            elif source.rstrip().endswith('/'):
+                row.append(('', parse_attrs(source.rstrip()[:-1])))
+            else:
+                cell = ([], parse_attrs(source))
+
+        elif name == 'table' and closing:
+            if section or row is not None:
+                raise ScanError('unclosed table parts')
+
+            if 'thead' not in seen or 'tbody' not in seen or len(head_rows) < 2:
+                raise ScanError('table has no header or body')
+
+            head_rows = [[(html.unescape(text), attrs) for text, attrs in row] for row in head_rows]
+            digest = hashlib.md5(page[table_start: pos].encode('utf-8')).hexdigest()
+
+            return ScannedTable(head_rows, body_rows, digest)
+
+    raise ScanError('table is not closed')
@@ -0,0 +1,113 @@
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from JournalParser.parser import make_soup, page_markup
+from JournalParser.planner import journal_key
+from JournalParser.funcs import journal_page_url, get_teacher, get_last_page, get_hidden_last_page, page_last_date
+
+
+class Fetcher:
+    """
+    Fetches several pages at once in a bounded thread pool.
+    Number of simultaneous requests to one host never exceeds host_limit, whatever the number of workers is
+    """
+    def __init__(self, SESSION, workers: int, host_limit: int):
+        self._SESSION = SESSION
+        self.workers = max(1, workers)
+        self.host_limit = max(1, host_limit)
+
+        self._lock = threading.Lock()
+        self._semaphores = {}
+
+    def __get_semaphore(self, url):
+        """
+        Returns semaphore of the url's host. Creates it if the host is new
+        :param url:
+        :return: threading.BoundedSemaphore
+        """
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.host_limit)
+            return self._semaphores[host]
+
+    def get(self, url):
+        """
+        Makes GET request respecting host limit
+        :param url:
+        :return: response text (bytes in raw bytes mode)
+        """
+        with self.__get_semaphore(url):
+            r = self._SESSION.get(url)
+        return page_markup(r)
+
+    def fetch(self, urls: list):
+        """
+        Fetches all the urls concurrently
+        :param urls:
+        :return: list of response texts in the same order as urls
+        """
+        if len(urls) < 2:
+            return [self.get(url) for url in urls]
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(urls))) as pool:
+            return list(pool.map(self.get, urls))
+
+
+def fetch_subject(globals_cont: 'GlobalsContainer', grade, term, subj_id, grade_id, as_bytes=False):
+    """
+    Fetches the subject's term pages up to the cutoff without parsing their tables, as SubjectTables would fetch them:
+    pages are walked one by one until a page whose last column is from the future, it's not fetched further.
+    Last dates are read with the table scanner. With the planner the remembered cutoff is used, it's trusted
+    if the last page before it still ends on the remembered date
+    :param as_bytes: return raw response bodies instead of texts
+    :return: (first_page_text, [page1_text, ..., pageN_text]). Pages list is empty if the subject has no teacher
+    """
+    SESSION, PARAMS, PLANNER = globals_cont.SESSION, globals_cont.PARAMS, globals_cont.PLANNER
+    key = journal_key(globals_cont.YEARS, grade_id, subj_id, term)
+
+    def url(page=None):
+        return journal_page_url(term, subj_id, grade_id, page, PARAMS.base_url)
+
+    def body(r):
+        return r.content if as_bytes else page_markup(r)
+
+    r = SESSION.get(url())
+    first_page = page_markup(r)
+    first_soup = make_soup(first_page)
+
+    if not get_teacher(first_soup):
+        return first_page, []
+
+    if PARAMS.only_term:
+        last_page = 1
+    else:
+        last_page, exact = get_last_page(first_soup)
+        if not exact:
+            last_page = get_hidden_last_page(make_soup(page_markup(SESSION.get(url(last_page)))))
+
+    today = datetime.date.today()
+    cutoff = PLANNER.cutoff(key, last_page, today) if PLANNER else None
+    expected = PLANNER.last_date(key, cutoff - 1) if cutoff else None
+    if PLANNER:
+        PLANNER.remember_last_page(key, last_page)
+
+    raw_pages = []
+    page, page_num = body(r), 1 #the first page is page 1 of the journal
+    while True:
+        last_date = page_last_date(page, globals_cont.CALENDAR, grade, term, PARAMS.encoding)
+        if last_date is None or last_date > today:
+            break
+        if PLANNER:
+            PLANNER.remember_page(key, page_num, last_date)
+        raw_pages.append(page)
+
+        if page_num == last_page:
+            break
+        if cutoff and page_num == cutoff - 1 and last_date == expected: #the next page is still from the future
+            break
+        page_num += 1
+        page = body(SESSION.get(url(page_num)))
+
+    return first_page, raw_pages
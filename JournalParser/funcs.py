@@ -1,5 +1,6 @@
 import re
-from bs4 import BeautifulSoup
+from JournalParser.parser import make_soup, page_markup
+from JournalParser.fastextract import ScannedTable, ScanError, scan_table
 import datetime
 
 
@@ -10,8 +11,8 @@ def create_grade_to_link_dict(SESSION, PARAMS):
     """
     d = {}
     for class_num in range(PARAMS.class1, PARAMS.class2 + 1):
-        r = SESSION.get('https://edu.tatar.ru/school/journal/select_edu_class?number={}'.format(class_num))
-        soup = BeautifulSoup(r.text, 'html.parser')
+        r = SESSION.get(PARAMS.base_url + '/school/journal/select_edu_class?number={}'.format(class_num))
+        soup = make_soup(page_markup(r))
 
         grades = []
         links_to_journal = []
@@ -30,20 +31,137 @@ def create_grade_to_link_dict(SESSION, PARAMS):
     return d
 
 
+def journal_page_url(term, subj_id, grade_id, page=None, base_url='https://edu.tatar.ru'):
+    """
+    Makes url of the subject's journal page
+    :param page: page number. If None, server returns the first one
+    :return: str
+    """
+    url = base_url + '/school/journal/school_editor?term={0}' \
+          '&criteria={1}&edu_class_id={2}&' \
+          'show_moved_pupils=0'.format(term, subj_id, grade_id)
+    if page is not None:
+        url += '&page={}'.format(page)
+
+    return url
+
+
 def get_initial_data(SESSION, link_to_grade):
     """
     Gets grade id and list of subject ids for exact grade
     :return grade_id, subjects_ids: list
     """
-    grade_id = re.findall(r'\d+', link_to_grade)[0]
     r = SESSION.get(link_to_grade)
-    init_page = BeautifulSoup(r.text, 'html.parser')
+
+    return parse_initial_data(link_to_grade, page_markup(r))
+
+
+def parse_initial_data(link_to_grade, text):
+    """
+    Extracts grade id and subject ids from already fetched grade's initial page
+    :return grade_id, subjects_ids: list
+    """
+    grade_id = re.findall(r'\d+', link_to_grade)[0]
+    init_page = make_soup(text, 'subjects')
 
     subject_ids = get_subjects_ids(init_page)
 
     return grade_id, subject_ids
 
 
+def get_terms_range(grade, PARAMS):
+    """
+    Terms to be checked for the grade. 10-11 grades have semesters instead of terms
+    :return: range
+    """
+    if grade.startswith(('10', '11')):
+        return range(1, PARAMS.term2 // 3 + 2)
+    return range(PARAMS.term1, PARAMS.term2 + 1)
+
+
+def get_teacher(page):
+    """
+    Extracts teacher's name from subject's journal page
+    :param page: BS4 instance
+    :return: str or None if not found
+    """
+    teacher = page.find('div', {'class': 'line last'})
+    if teacher:
+        try:
+            teacher = teacher.text.strip().split(maxsplit=1)[1]
+            return teacher
+        except IndexError:
+            pass
+    return
+
+
+def get_last_page(page):
+    """
+    Reads the pager of subject's journal first page.
+    If the pager is cut with '>>' the real last page is unknown, so the first hidden page number is returned.
+    It should be fetched and passed to get_hidden_last_page
+    :param page: BS4 instance
+    :return: (last_page: int, exact: bool)
+    """
+    pages = page.find('p', {'class': 'pages'})
+
+    if not pages:
+        return 1, True
+
+    pages = [p for p in pages.text.split() if (p.isdigit() or p == '>>')]
+    if pages[-1] != '>>':
+        return int(pages[-1]), True
+
+    return int(pages[-2]) + 1, False
+
+
+def get_hidden_last_page(page):
+    """
+    Reads the last page number from the page opened after '>>'
+    :param page: BS4 instance
+    :return: int
+    """
+    pages = page.find('div', {'class': 'pages'})
+    pages = [p for p in pages.text.split() if p.isdigit()]
+
+    return int(pages[-1])
+
+
+def table_last_date(table, CALENDAR, grade, term):
+    """
+    Finds the date of journal table's last column
+    :param table: BS4 <table> or ScannedTable
+    :return: datetime.date()
+    """
+    if isinstance(table, ScannedTable):
+        return CALENDAR.date(table.last_day(), table.last_month(), grade, term)
+
+    header = table.find('thead')
+    month_row = header.find_next('tr')
+    date_row = month_row.find_next('tr')
+
+    last_month = month_row.find_all('td')[-3].text.strip()
+    last_date = int(date_row.find_all('td')[-1].text.strip())
+
+    return CALENDAR.date(last_date, last_month, grade, term)
+
+
+def page_last_date(page, CALENDAR, grade, term, encoding='utf-8'):
+    """
+    Finds the date of journal page's last column. The page is scanned without building a DOM,
+    BS4 is used if the scanner can't read it
+    :param page: page's html, str or bytes in encoding
+    :return: datetime.date() or None if the page has no journal table
+    """
+    try:
+        table = scan_table(page, encoding)
+    except ScanError:
+        table = make_soup(page, 'journal').find('table', {'class': 'table'})
+
+    if table is not None:
+        return table_last_date(table, CALENDAR, grade, term)
+
+
 def get_subjects_ids(html):
     """
     Collects subjects' ids and name from grade's tables initial page. Excluding 'Электив'.
@@ -63,13 +181,23 @@ def get_subjects_ids(html):
     return subject_to_id
 
 
-def get_years(SESSION):
+def get_soup(SESSION, url):
+    """
+    GETs the url and parses it
+    :return: BS4 instance
+    """
+    if hasattr(SESSION, 'soup'):
+        return SESSION.soup(url)
+
+    return make_soup(page_markup(SESSION.get(url)))
+
+
+def get_years(SESSION, base_url='https://edu.tatar.ru'):
     """
     Fetches this schoolyear eg 2019/2020
     :return: list: int [year1, year2]
     """
-    r = SESSION.get('https://edu.tatar.ru/school')
-    html = BeautifulSoup(r.text, 'html.parser')
+    html = get_soup(SESSION, base_url + '/school')
 
     h3 = html.find('h3')
     years = list(map(int, re.findall(r'\d+', h3.text)))
@@ -0,0 +1,149 @@
+import os
+import pickle
+import datetime
+from JournalParser.parser import make_soup, page_markup
+from JournalParser.objects import SubjectTables, Warnings
+from JournalParser.snapshot import extracted_columns
+from JournalParser.funcs import journal_page_url, get_teacher, get_last_page, get_hidden_last_page
+
+
+class JournalState:
+    """
+    What the previous runs have seen in the journals. Stored in PARAMS.state_file as
+    {login: {'run': int, 'subjects': {(years, grade_id, subj_id, term): {'teacher', 'pages', 'warnings', 'signature', 'extraction', 'date'}}}}
+    where 'pages' are JournalPages extracted by SubjectTables (with date span and content hash inside).
+
+    Only pages covering recent dates and a rotating sample of older pages are fetched again,
+    the rest are taken from the state. Closed terms are not fetched at all
+    """
+    def __init__(self, PARAMS):
+        self._PARAMS = PARAMS
+        self._all = {}
+
+        if os.path.exists(PARAMS.state_file):
+            try:
+                with open(PARAMS.state_file, 'rb') as inf:
+                    self._all = pickle.load(inf)
+            except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+                self._all = {} #broken or outdated state, start from scratch
+
+        self._state = self._all.setdefault(PARAMS.login, {'run': 0, 'subjects': {}})
+        self._state['run'] += 1
+        self._subjects = self._state['subjects']
+
+        self._today = datetime.date.today()
+        self._recent = self._today - datetime.timedelta(days=PARAMS.recent_days)
+
+    def save(self):
+        with open(self._PARAMS.state_file, 'wb') as ouf:
+            pickle.dump(self._all, ouf)
+
+    def check(self, globals_cont: 'GlobalsContainer', grade, term, grade_id, subj_name, subj_id):
+        """
+        Checks subject's term journal reusing what is known from the previous runs
+        :return: Warnings or None if there's nothing to check
+        """
+        key = (tuple(globals_cont.YEARS), grade_id, subj_id, term) #last year's journals are never taken for this year's
+        stored = self._subjects.get(key)
+        if stored and stored['extraction'] != self.__extraction():
+            stored = None #stored pages lack some data needed now
+
+        if stored and term in self._PARAMS.closed_terms:
+            if self.__reusable(stored):
+                return stored['warnings']
+
+            tables = SubjectTables.from_pages(globals_cont, grade, term, grade_id, subj_name, subj_id,
+                                              stored['teacher'], stored['pages'])
+            return self.__store(key, globals_cont, tables, changed=False)
+
+        def url(page=None):
+            return journal_page_url(term, subj_id, grade_id, page, self._PARAMS.base_url)
+
+        SESSION = globals_cont.SESSION
+        first_page = page_markup(SESSION.get(url()))
+        first_soup = make_soup(first_page)
+
+        if not get_teacher(first_soup):
+            self._subjects.pop(key, None)
+            return
+
+        if self._PARAMS.only_term:
+            last_page = 1
+        else:
+            last_page, exact = get_last_page(first_soup)
+            if not exact:
+                last_page = get_hidden_last_page(make_soup(page_markup(SESSION.get(url(last_page)))))
+
+        known = stored['pages'] if stored and len(stored['pages']) <= last_page else []
+
+        def raw_pages(): #lazy, so nothing is fetched after the cutoff
+            yield first_page #the first page is the first one of the journal, it's always fresh
+            for page_num in range(2, last_page + 1):
+                page = known[page_num - 1] if page_num <= len(known) else None
+                if page is None or self.__should_refetch(page, page_num):
+                    yield page_markup(SESSION.get(url(page_num)))
+                else:
+                    yield page
+
+        tables = SubjectTables(globals_cont, grade, term, grade_id, subj_name, subj_id,
+                               first_page=first_page, raw_pages=raw_pages())
+
+        if not tables.pages:
+            self._subjects.pop(key, None)
+            return
+
+        if known and tables.pages[0]['hash'] != known[0]['hash'] and tables.pages[0]['dates'] != known[0]['dates']:
+            #lessons were moved, so stored pages don't correspond to page numbers anymore. Fetch everything again
+            tables = SubjectTables(globals_cont, grade, term, grade_id, subj_name, subj_id, first_page=first_page)
+            if not tables.pages:
+                self._subjects.pop(key, None)
+                return
+
+        changed = not stored or [p['hash'] for p in tables.pages] != [p['hash'] for p in stored['pages']]
+        return self.__store(key, globals_cont, tables, changed)
+
+    def __extraction(self):
+        """
+        What SubjectTables extracts from pages with current params
+        """
+        PARAMS = self._PARAMS
+        return (PARAMS.only_term, tuple(sorted(extracted_columns(PARAMS))),
+                bool(PARAMS.fast_extract), #page hashes are made from html or from BS4 tree
+                'JournalPage')
+
+    def __should_refetch(self, page, page_num):
+        """
+        Page is fetched again if it covers recent dates or its turn in the rotating sample has come
+        """
+        dates = page['dates']
+        if not dates or dates[-1] >= self._recent:
+            return True
+
+        return (page_num + self._state['run']) % self._PARAMS.sample_every == 0
+
+    def __reusable(self, stored):
+        """
+        Stored warnings are valid if they were made today with the same checks
+        """
+        return stored['date'] == self._today and stored['signature'] == self._PARAMS.checks_signature()
+
+    def __store(self, key, globals_cont, tables, changed):
+        """
+        Checks the tables (or reuses stored warnings if nothing has changed) and remembers the result
+        :return: Warnings
+        """
+        stored = self._subjects.get(key)
+        if stored and not changed and stored['extraction'] == self.__extraction() and self.__reusable(stored):
+            return stored['warnings']
+
+        warns = Warnings(globals_cont, tables)
+        self._subjects[key] = {
+            'teacher': tables.teacher,
+            'pages': tables.pages,
+            'warnings': warns,
+            'signature': self._PARAMS.checks_signature(),
+            'extraction': self.__extraction(),
+            'date': self._today,
+        }
+
+        return warns
@@ -0,0 +1,85 @@
+import threading
+
+
+class AdaptiveLimiter:
+    """
+    AIMD limit of simultaneous requests. While responses come fast (smoothed latency is within
+    latency_factor of the best one seen) and successful, the limit grows by one per window of requests.
+    5xx responses, timeouts and the login page instead of the requested one cut it by decrease factor,
+    at most once per window, so one burst of errors doesn't drop it to min_limit at once
+    """
+    def __init__(self, start: int = 2, min_limit: int = 1, max_limit: int = 16,
+                 latency_factor: float = 2.0, decrease: float = 0.5):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.latency_factor = latency_factor
+        self.decrease = decrease
+        self.limit = float(min(max(start, self.min_limit), self.max_limit))
+
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._latency = None #exponentially smoothed
+        self._best_latency = None
+        self._completed = 0
+        self._cut_at = -self.max_limit
+        self._cuts = 0
+        self._peak = self.limit
+        self._limit_sum = 0.0
+
+    def acquire(self):
+        """
+        Waits until the number of requests in flight is below the limit
+        """
+        with self._cond:
+            while self._in_flight >= int(self.limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self, elapsed: float, ok: bool):
+        """
+        Adjusts the limit with the result of the finished request
+        :param elapsed: request's duration in seconds
+        :param ok: False if the server failed or throttled the request
+        """
+        with self._cond:
+            self._in_flight -= 1
+            self._completed += 1
+
+            if ok:
+                self._latency = elapsed if self._latency is None else 0.8 * self._latency + 0.2 * elapsed
+                self._best_latency = min(self._best_latency or self._latency, self._latency)
+                if self._latency <= self._best_latency * self.latency_factor:
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            elif self._completed - self._cut_at >= int(self.limit):
+                self.limit = max(self.min_limit, self.limit * self.decrease)
+                self._cut_at = self._completed
+                self._cuts += 1
+
+            self._peak = max(self._peak, self.limit)
+            self._limit_sum += self.limit
+            self._cond.notify_all()
+
+    def summary(self):
+        """
+        :return: {'limit': settled limit, 'average', 'peak', 'cuts', 'requests'}
+        """
+        with self._cond:
+            return {
+                'limit': int(self.limit),
+                'average': round(self._limit_sum / self._completed, 1) if self._completed else int(self.limit),
+                'peak': int(self._peak),
+                'cuts': self._cuts,
+                'requests': self._completed,
+            }
+
+
+def crawl_width(PARAMS):
+    """
+    Number of fetching threads and per-host limit. With adaptive concurrency there must be enough
+    threads for the highest limit, the limiter itself keeps the actual number of requests
+    :return: (workers, host_limit)
+    """
+    if PARAMS.adaptive:
+        return PARAMS.max_concurrency, PARAMS.max_concurrency
+
+    return PARAMS.fetch_threads, PARAMS.host_limit
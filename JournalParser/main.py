@@ -3,19 +3,28 @@
 from JournalParser.edutatarauth import edu_auth
 from JournalParser.params import Params
 from JournalParser.objects import SubjectTables, GlobalsContainer, Warnings
-from JournalParser.excel import excelify
-from JournalParser.funcs import get_years, create_grade_to_link_dict, get_initial_data
+from JournalParser.excel import excelify, ExcelWriter
+from JournalParser.memory import MemoryGuard
+from JournalParser.rules import RuleCosts
+from JournalParser.batch import create_batch
+from JournalParser.funcs import get_years, create_grade_to_link_dict, get_initial_data, get_terms_range
+from JournalParser.crawler import Crawler
+from JournalParser.pipeline import Pipeline
+from JournalParser.incremental import JournalState
+from JournalParser.parser import configure
+from JournalParser.transport import session_summary
 
 
 
 def execute(PARAMS, pBar, label):
     PARAMS = Params(PARAMS)
+    configure(PARAMS)
 
-    SESSION = edu_auth(PARAMS.login, PARAMS.password)
-    SESSION.get('https://edu.tatar.ru')
+    SESSION = edu_auth(PARAMS.login, PARAMS.password, PARAMS)
+    SESSION.get(PARAMS.base_url)
     label.emit('Успешный вход в аккаунт')
 
-    YEARS = get_years(SESSION)
+    YEARS = get_years(SESSION, PARAMS.base_url)
     label.emit('Сбор нужных данных...')
     global_vars = GlobalsContainer(SESSION, PARAMS, YEARS)
 
@@ -24,40 +33,101 @@ def execute(PARAMS, pBar, label):
     grades_count = len(grades_to_link.keys())
     grade_val = 95 / (grades_count if grades_count else 1)#each grade's value in progress
 
-    data = {}
+    writer = ExcelWriter(PARAMS.group_by, write_only=True) if PARAMS.stream else None #streaming is sequential
+    costs = RuleCosts()
 
-    v = 0
-    for grade, link in grades_to_link.items():
-        grade_id, subj_to_id = get_initial_data(SESSION, link)
+    if PARAMS.incremental and (PARAMS.async_crawl or PARAMS.pipeline or PARAMS.process_pool) and not writer:
+        label.emit('Инкрементальная проверка работает только при последовательной проверке, журналы проверяются полностью')
 
-        data[grade] = {}
+    if PARAMS.async_crawl and not writer:
+        data = Crawler(global_vars, pBar, label).run(grades_to_link)
+    elif (PARAMS.pipeline or PARAMS.process_pool) and not writer:
+        data = Pipeline(global_vars, pBar, label).run(grades_to_link)
+    else:
+        state = JournalState(PARAMS) if PARAMS.incremental else None
+        guard = MemoryGuard(PARAMS.memory_limit, [SESSION.trim] if hasattr(SESSION, 'trim') else [])
+        batch = create_batch(PARAMS) if not writer and not state else None #streamed and stored warnings are needed at once
+        data = {}
 
-        subjs_count = len(subj_to_id.keys())
-        subj_value = grade_val / (subjs_count if subjs_count else 1)   # each subjs value in grade's value
+        v = 0
+        for grade, link in grades_to_link.items():
+            grade_id, subj_to_id = get_initial_data(SESSION, link)
 
-        for subj_name, id_ in subj_to_id.items():
-            data[grade][subj_name] = []
-
-            if grade.startswith(('10', '11')):
-                terms_range = range(1, PARAMS.term2 // 3 + 2)
+            if writer:
+                writer.add_grade(grade)
             else:
-                terms_range = range(PARAMS.term1, PARAMS.term2 + 1)
-
-            for term in terms_range:
-                label.emit(f'{grade} {subj_name} {term} четверть...')
-                grade_subj_term_tables = SubjectTables(global_vars, grade, term, grade_id, subj_name, id_)
-
-                if grade_subj_term_tables.raw_pages:
-                    data[grade][subj_name].append(Warnings(global_vars, grade_subj_term_tables))
-
-            if not data[grade][subj_name]:
-                data[grade].pop(subj_name) #remove subj with no Warnings instance
-
-            v += subj_value
-            pBar.emit(v)
+                data[grade] = {}
+
+            subjs_count = len(subj_to_id.keys())
+            subj_value = grade_val / (subjs_count if subjs_count else 1)   # each subjs value in grade's value
+
+            for subj_name, id_ in subj_to_id.items():
+                warns_list = []
+
+                for term in get_terms_range(grade, PARAMS):
+                    label.emit(f'{grade} {subj_name} {term} четверть...')
+
+                    if state:
+                        warns = state.check(global_vars, grade, term, grade_id, subj_name, id_)
+                        if warns:
+                            warns_list.append(warns)
+                        continue
+
+                    grade_subj_term_tables = SubjectTables(global_vars, grade, term, grade_id, subj_name, id_)
+
+                    if grade_subj_term_tables.raw_pages:
+                        warns_list.append(Warnings(global_vars, grade_subj_term_tables, batch))
+
+                    grade_subj_term_tables = None #free the pages before the next term is fetched
+
+                costs.add(warns_list)
+                if warns_list: #skip subj with no Warnings instance
+                    if writer:
+                        writer.add_subject(grade, subj_name, warns_list) #written right away, nothing is kept
+                    else:
+                        data[grade][subj_name] = warns_list
+
+                if not guard.check() and guard.failed == 1:
+                    if writer:
+                        label.emit('Превышен лимит памяти, освободить больше не удалось')
+                    else: #the checked subjects are written right away from now on, like with stream
+                        label.emit('Превышен лимит памяти, проверенные предметы записываются в файл по ходу проверки')
+                        if batch:
+                            batch.evaluate()
+                            costs.add_seconds(batch.costs)
+                            batch = None
+                        writer = ExcelWriter(PARAMS.group_by, write_only=True)
+                        writer.add_data(data)
+                        data = {}
+
+                v += subj_value
+                pBar.emit(v)
+
+        if state:
+            state.save()
+        if batch:
+            batch.evaluate()
+            costs.add_seconds(batch.costs)
     """
     Here we should get
     data = {grade1: {subj1: [Warnings1t, Warnings2t, ...]}, ... subjN: Warnings}, ..., gradeN: {...}}
     """
-    excelify(data, PARAMS.group_by)
+    costs.add_all(data) #nothing is left there if the subjects were counted in the loop
+    if global_vars.PLANNER:
+        global_vars.PLANNER.save()
+    if global_vars.SNAPSHOT:
+        global_vars.SNAPSHOT.save(PARAMS.snapshot_file)
+
+    if global_vars.MISMATCHES:
+        label.emit('Быстрое чтение таблиц отличалось от BS4, использован BS4: ' + ', '.join(global_vars.MISMATCHES))
+    for line in session_summary(SESSION):
+        label.emit(line)
+    checks = ', '.join(f'{name} {seconds} с' for name, (seconds, _) in costs.summary().items())
+    if checks:
+        label.emit('Время проверок: ' + checks)
+
+    if writer:
+        writer.save()
+    else:
+        excelify(data, PARAMS.group_by)
     pBar.emit(100)
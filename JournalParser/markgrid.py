@@ -0,0 +1,89 @@
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+
+class MarkMatrix:
+    """
+    Marks of all the subject's pages as one int8 matrix (students x lessons).
+    Every distinct cell string has a code, symbols[code] is the string; the empty cell is always 0
+    """
+    def __init__(self, codes: 'np.ndarray', symbols: list):
+        self.codes = codes
+        self.symbols = symbols
+
+    def __len__(self):
+        return self.codes.shape[0]
+
+    @property
+    def lessons_count(self):
+        return self.codes.shape[1]
+
+    @classmethod
+    def from_pages(cls, pages: list):
+        """
+        Joins the byte grids of JournalPages without decoding them to strings.
+        Pages' own codes are mapped to the common ones with a lookup array
+        :return: MarkMatrix or None if the pages can't be joined into a rectangle (the list path handles them then)
+        """
+        if not HAS_NUMPY:
+            return
+
+        codes = {'': 0}
+        blocks = []
+        for page in pages:
+            grid = page.mark_grid() if hasattr(page, 'mark_grid') else None
+            if grid is None:
+                return
+
+            symbols, rows = grid
+            if not rows:
+                continue
+
+            width = len(rows[0])
+            if any(len(row) != width for row in rows) or (blocks and len(rows) != blocks[0].shape[0]):
+                return
+
+            for symbol in symbols:
+                if symbol not in codes:
+                    codes[symbol] = len(codes)
+            if len(codes) > 127:
+                return
+
+            lookup = np.array([codes[symbol] for symbol in symbols] or [0], dtype=np.int8)
+            page_codes = np.frombuffer(b''.join(rows), dtype=np.uint8).reshape(len(rows), width)
+            blocks.append(lookup[page_codes])
+
+        if not blocks or not blocks[0].shape[0]:
+            return
+
+        return cls(np.hstack(blocks), list(codes))
+
+    def isin(self, values):
+        """
+        :return: bool matrix, True where the cell is one of values
+        """
+        value_codes = [code for code, symbol in enumerate(self.symbols) if symbol in values]
+        return np.isin(self.codes, value_codes)
+
+    def row_counts(self, values):
+        """
+        :return: number of cells with one of values in every row
+        """
+        return self.isin(values).sum(axis=1)
+
+    def empty_counts(self):
+        """
+        :return: number of empty cells in every column
+        """
+        return (self.codes == 0).sum(axis=0)
+
+    def pairs(self, value):
+        """
+        :return: bool matrix (students x lessons-1), True where the cell and the next one are both value
+        """
+        equal = self.isin((value,))
+        return equal[:, :-1] & equal[:, 1:]
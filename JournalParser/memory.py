@@ -0,0 +1,79 @@
+import gc
+import os
+import sys
+
+
+def process_memory():
+    """
+    Resident memory of the process. psutil is used if it's installed, else the OS is asked directly
+    :return: bytes or None if it can't be measured
+    """
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+        return
+
+    try:
+        with open('/proc/self/statm') as inf:
+            return int(inf.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return
+
+
+class MemoryGuard:
+    """
+    Keeps the process below limit bytes. When it's exceeded, garbage is collected and trims are called
+    (they drop memoized pages, halve cache sizes etc.) until the memory is below the limit or nothing is left to trim
+    """
+    def __init__(self, limit: int, trims: list = None):
+        self.limit = limit
+        self.trims = trims or []
+        self.exceeded = 0 #times the limit was exceeded
+        self.failed = 0 #times trimming didn't help
+
+    def check(self):
+        """
+        Called between subjects
+        :return: True if the process fits the limit
+        """
+        if not self.limit:
+            return True
+
+        used = process_memory()
+        if used is None or used <= self.limit:
+            return True
+
+        self.exceeded += 1
+        gc.collect()
+        for trim in self.trims:
+            trim()
+            used = process_memory()
+            if used is None or used <= self.limit:
+                return True
+            gc.collect()
+
+        used = process_memory()
+        if used is None or used <= self.limit:
+            return True
+
+        self.failed += 1
+        return False
@@ -1,9 +1,20 @@
-from bs4 import BeautifulSoup
-from JournalParser.str_to_date import str_to_date
+import hashlib
+from sys import intern
+from itertools import chain
+from bs4 import Tag
+from JournalParser.parser import make_soup, page_markup
+from JournalParser.schoolcalendar import school_calendar
+from JournalParser.funcs import journal_page_url, get_teacher, get_last_page, get_hidden_last_page, get_soup, \
+    table_last_date
+from JournalParser.fetcher import Fetcher
+from JournalParser.planner import PaginationPlanner, journal_key
+from JournalParser.limiter import crawl_width
+from JournalParser.fastextract import ScannedTable, ScanError, scan_table
+from JournalParser.page import JournalPage
+from JournalParser.markgrid import MarkMatrix
+from JournalParser.rules import RuleEngine, CheckData
+from JournalParser.snapshot import Snapshot, extracted_columns
 import datetime
-import locale
-
-locale.setlocale(locale.LC_ALL, '')
 
 class GlobalsContainer:
     """
@@ -13,11 +24,25 @@ class GlobalsContainer:
         self._SESSION = SESSION
         self._PARAMS = PARAMS
         self._YEARS = YEARS
+        self._CALENDAR = school_calendar(tuple(YEARS))
+        self._SNAPSHOT = Snapshot(PARAMS) if PARAMS.snapshot else None
+        workers, host_limit = crawl_width(PARAMS)
+        self._FETCHER = Fetcher(SESSION, workers, host_limit) if workers > 1 else None
+        self._PLANNER = PaginationPlanner(PARAMS) if PARAMS.plan_pages else None
+        self._MISMATCHES = [] #journals whose scanned tables differed from BS4 ones, reported when the run is over
 
     @property
     def SESSION(self):
         return self._SESSION
 
+    @property
+    def FETCHER(self):
+        return self._FETCHER
+
+    @property
+    def PLANNER(self):
+        return self._PLANNER
+
     @property
     def PARAMS(self):
         return self._PARAMS
@@ -26,54 +51,105 @@ class GlobalsContainer:
     def YEARS(self):
         return self._YEARS
 
+    @property
+    def CALENDAR(self):
+        return self._CALENDAR
+
+    @property
+    def SNAPSHOT(self):
+        return self._SNAPSHOT
+
+    @property
+    def MISMATCHES(self):
+        return self._MISMATCHES
+
 class SubjectTables:
     """
     Class for getting storing an exact subject's data: grade, term, teacher, html <table> to be handled later
-    We only pass there session, term, subject id and grade id
+    We only pass there session, term, subject id and grade id.
+    If pages were already fetched (e.g. by the async crawler) their texts can be passed as first_page and raw_pages,
+    nothing is fetched then. raw_pages may also contain pages extracted during the previous run, they are reused as is.
+    Data of every page is extracted to self.pages: [JournalPage1, ..., JournalPageN]. Page DOMs are dropped right after that,
+    self.raw_pages keeps JournalPages of the pages fetched this time
     """
-    def __init__(self, globals_cont: 'GlobalsContainer', grade, term, grade_id, subj_name, subj_id):
+    def __init__(self, globals_cont: 'GlobalsContainer', grade, term, grade_id, subj_name, subj_id,
+                 first_page: str = None, raw_pages: list = None):
         self._SESSION, self._PARAMS, self._YEARS = globals_cont.SESSION, globals_cont.PARAMS, globals_cont.YEARS
+        self._FETCHER, self._PLANNER = globals_cont.FETCHER, globals_cont.PLANNER
+        self._CALENDAR, self._MISMATCHES = globals_cont.CALENDAR, globals_cont.MISMATCHES
+        self._columns = extracted_columns(self._PARAMS) #only the columns the checks read are extracted
 
         self.grade = grade
         self.term = term
         self.grade_id = grade_id
-        self.subj_name = subj_name
+        self.subj_name = intern(subj_name)
         self.subj_id = subj_id
 
-        self._first_page = self.__get_first_page()
-        self.teacher = self.__get_teacher()
-        self._last_page = self.__get_last_page()
-        self.raw_pages = self.__get_raw_pages()
+        if first_page is None:
+            self._first_page = self.__get_first_page()
+        else:
+            self._first_page = make_soup(first_page)
+
+        self.teacher = get_teacher(self._first_page)
+        if self.teacher:
+            self.teacher = intern(self.teacher)
+
+        self._hidden_page = None #first page hidden by '>>' in the pager if the last page number was taken from the planner
+        if raw_pages is None:
+            self._last_page = self.__get_last_page()
+        elif hasattr(raw_pages, '__len__'):
+            self._last_page = len(raw_pages)
+        else: #pages are generated lazily
+            self._last_page = None
+
+        self.pages = []
+        self.raw_pages = self.__get_raw_pages(raw_pages)
+        self._first_page = None #teacher and pager are read, the DOM isn't needed anymore
 
         self.dates = []
 
+    @classmethod
+    def from_pages(cls, globals_cont: 'GlobalsContainer', grade, term, grade_id, subj_name, subj_id, teacher, pages: list):
+        """
+        Restores SubjectTables from pages extracted during the previous run. Nothing is fetched
+        :param pages: [JournalPage1, ..., JournalPageN]
+        :return: SubjectTables without raw_pages
+        """
+        tables = cls.__new__(cls)
+        tables._SESSION, tables._PARAMS, tables._YEARS = globals_cont.SESSION, globals_cont.PARAMS, globals_cont.YEARS
+        tables._FETCHER, tables._PLANNER = globals_cont.FETCHER, globals_cont.PLANNER
+        tables._CALENDAR, tables._MISMATCHES = globals_cont.CALENDAR, globals_cont.MISMATCHES
+
+        tables.grade, tables.term, tables.grade_id = grade, term, grade_id
+        tables.subj_name, tables.subj_id = subj_name, subj_id
+        tables.teacher = teacher
+        tables._last_page = len(pages)
+        tables.pages = list(pages)
+        tables.raw_pages = []
+        tables.dates = []
+
+        return tables
+
+    def __url(self, page=None):
+        return journal_page_url(self.term, self.subj_id, self.grade_id, page, self._PARAMS.base_url)
+
+    def __key(self):
+        return journal_key(self._YEARS, self.grade_id, self.subj_id, self.term)
+
     def __get_first_page(self):
         """
         Gets subjects' first page to extract last page and teacher
         :return: BS4 instance
         """
-        url = 'https://edu.tatar.ru/school/journal/school_editor?term={0}' \
-              '&criteria={1}&edu_class_id={2}&' \
-              'show_moved_pupils=0'.format(self.term, self.subj_id, self.grade_id)
-
-        r = self._SESSION.get(url)
-        page = BeautifulSoup(r.text, 'html.parser')
-
-        return page
+        return get_soup(self._SESSION, self.__url())
 
-    def __get_teacher(self):
+    def __first_table(self):
         """
-        Extracts teacher's name from self._first_page
-        :return: str or None if not found
+        The first page is page 1 of the journal, its table is taken from the parsed first page instead of fetching it again
+        :return: BS4 <table> or None
         """
-        teacher = self._first_page.find('div', {'class': 'line last'})
-        if teacher:
-            try:
-                teacher = teacher.text.strip().split(maxsplit=1)[1]
-                return teacher
-            except IndexError:
-                pass
-        return
+        if self._first_page is not None:
+            return self._first_page.find('table', {'class': 'table'})
 
     def __get_last_page(self):
         """
@@ -82,191 +158,286 @@ class SubjectTables:
         """
 
         if self._PARAMS.only_term:
-            last_page = 1
-        else:
-            pages = self._first_page.find('p', {'class': 'pages'})
+            return 1
+
+        last_page, exact = get_last_page(self._first_page)
+        if not exact:
+            remembered = self._PLANNER.last_page(self.__key()) if self._PLANNER else None
+            if remembered and remembered >= last_page: #verified later, when the pages are fetched
+                self._hidden_page = last_page
+                return remembered
+
+            last_page = self.__get_hidden_last_page(last_page)
+
+        if self._PLANNER:
+            self._PLANNER.remember_last_page(self.__key(), last_page)
 
-            if pages:
-                pages = [p for p in pages.text.split() if (p.isdigit() or p == '>>')]
-                if pages[-1] != '>>':
-                    last_page = int(pages[-1])
-                else:
-                    r = self._SESSION.get('https://edu.tatar.ru/school/journal/school_editor?term={0}' \
-                                    '&criteria={1}&edu_class_id={2}&' \
-                                    'show_moved_pupils=0&page={3}'.format(self.term, self.subj_id, self.grade_id,
-                                                                          int(pages[-2]) + 1))
-                    html = BeautifulSoup(r.text, 'html.parser')
-                    pages = html.find('div', {'class': 'pages'})
-                    pages = [p for p in pages.text.split() if p.isdigit()]
-                    last_page = int(pages[-1])
-            else:
-                last_page = 1
         return last_page
 
-    def __get_raw_pages(self):
+    def __get_hidden_last_page(self, hidden_page):
+        """
+        Opens the first page hidden by '>>' to find out the real last page number
+        :return: int
         """
-        Collects BS4 <table> instances for each subject journal's page.
-        If teacher doesn't exist returns empty list
+        last_page = get_hidden_last_page(get_soup(self._SESSION, self.__url(hidden_page)))
+
+        if self._PLANNER:
+            self._PLANNER.remember_last_page(self.__key(), last_page)
+
+        return last_page
 
-        :return: list [table1, ..., table(LASTPAGE)]
+    def __get_raw_pages(self, texts=None):
+        """
+        Collects BS4 <table> instances (ScannedTable with fast_extract) for each subject journal's page.
+        If teacher doesn't exist returns empty list.
+        With fetch_threads > 1 all the pages are fetched concurrently and the ones past the cutoff page are dropped
+        :param texts: already fetched pages' texts. Fetched here if None
+        :return: list [JournalPage1, ..., JournalPage(LASTPAGE)]
         """
         if not self.teacher:
             return []
 
-        tables = []
-        for page_num in range(1, self._last_page + 1):
-            url = 'https://edu.tatar.ru/school/journal/school_editor?term={0}' \
-                  '&criteria={1}&edu_class_id={2}&' \
-                  'show_moved_pupils=0&page={3}'.format(self.term, self.subj_id, self.grade_id, page_num)
+        if texts is None and self._PLANNER:
+            texts = self.__get_planned_tables()
+
+        if texts is None:
+            first = self.__first_table()
+            start = 1 if first is None else 2
+            urls = [self.__url(page_num) for page_num in range(start, self._last_page + 1)]
+
+            if self._FETCHER:
+                texts = self._FETCHER.fetch(urls)
+            elif self._PARAMS.fast_extract:
+                texts = (page_markup(self._SESSION.get(url)) for url in urls)
+            else:
+                texts = (get_soup(self._SESSION, url).find('table', {'class': 'table'})
+                         for url in urls) #lazy, so nothing is fetched after the cutoff
 
-            r = self._SESSION.get(url)
-            page = BeautifulSoup(r.text, 'html.parser')
-            table = page.find('table', {'class': 'table'})
+            if first is not None:
+                texts = chain([first], texts)
 
+        tables = []
+        for text in texts:
+            if isinstance(text, (JournalPage, dict)): #page reused from the previous run
+                self.pages.append(text)
+                continue
 
+            if isinstance(text, (Tag, ScannedTable)): #already parsed
+                table = text
+            else:
+                table = self.__read_table(text)
 
             if self.__check_date(table):
                 break
 
-            tables.append(table)
+            page = self.__extract_page(table)
+            tables.append(page)
+            self.pages.append(page)
 
         return tables
 
-    def __check_date(self, table):
+    def __get_planned_tables(self):
         """
-        Checks whether table's last column date is bigger that today. Not to fetch extra empty tables from the future
-        :param table: BS4 Page element
-        :return: True if last column date is bigger than today else False
+        Fetches pages before the cutoff (the first page from the future) only.
+        The cutoff is predicted from the pages' last dates remembered by the planner and verified with the fresh last page.
+        Without history it's found with binary search if pages are fetched concurrently, else pages are walked one by one.
+        A page without journal table is past the end, the journal has shrunk since its last page was remembered
+        :return: list [table1, ..., tableN]
         """
-        table_year = self._YEARS[self.term // 2] if self.grade.startswith(('10', '11')) else self._YEARS[self.term // 3]  # calendar year of the table
-        header = table.find('thead')
-        month_row = header.find_next('tr')
-        date_row = month_row.find_next('tr')
+        key = self.__key()
+        today = datetime.date.today()
+        tables = {}
+
+        def load(page_nums):
+            first = self.__first_table()
+            if 1 in page_nums and first is not None:
+                tables[1] = first
+                self._PLANNER.remember_page(key, 1, self.__last_date(first))
+                page_nums = [page_num for page_num in page_nums if page_num != 1]
+
+            urls = [self.__url(page_num) for page_num in page_nums]
+            texts = self._FETCHER.fetch(urls) if self._FETCHER else [page_markup(self._SESSION.get(url)) for url in urls]
+            for page_num, text in zip(page_nums, texts):
+                tables[page_num] = self.__read_table(text)
+                if tables[page_num] is not None:
+                    self._PLANNER.remember_page(key, page_num, self.__last_date(tables[page_num]))
+
+        def future(page_num):
+            if page_num not in tables:
+                load([page_num])
+            return tables[page_num] is None or self.__last_date(tables[page_num]) > today
+
+        cutoff = self._PLANNER.cutoff(key, self._last_page, today)
+        if cutoff is not None:
+            expected = self._PLANNER.last_date(key, cutoff - 1)
+            load(range(1, cutoff))
+            if None in tables.values() or self._PLANNER.last_date(key, cutoff - 1) != expected:
+                cutoff = None #lessons were moved or pages are gone, the prediction can't be trusted
+
+        elif self._FETCHER: #binary search, pages before lo are from the past, page hi is from the future
+            lo, hi = 1, self._last_page + 1
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if future(mid):
+                    hi = mid
+                else:
+                    lo = mid + 1
+            cutoff = lo
+            load([page_num for page_num in range(1, cutoff) if page_num not in tables])
 
-        last_month = month_row.find_all('td')[-3].text.strip()
-        last_date = int(date_row.find_all('td')[-1].text.strip())
+        if None in tables.values() and self._hidden_page: #remembered last page is gone, find the real one and replan
+            self._last_page = self.__get_hidden_last_page(self._hidden_page)
+            self._hidden_page = None
+            cutoff = None
 
-        last_col_date = str_to_date(last_date, last_month, table_year)
+        if cutoff is None:
+            cutoff = 1
+            while cutoff <= self._last_page and not future(cutoff):
+                cutoff += 1
 
-        if last_col_date > datetime.date.today():
+        if cutoff > self._last_page and self._hidden_page: #remembered last page may be outdated
+            self._last_page = self.__get_hidden_last_page(self._hidden_page)
+            while cutoff <= self._last_page and not future(cutoff):
+                cutoff += 1
 
-            return True
-        return False
+        return [tables[page_num] for page_num in range(1, cutoff)]
 
-class Warnings:
-    """
-    Checks BS4 <table> instances in SubjectsTable and returns lists of warnings
-    """
-    def __init__(self, globals_cont: 'GlobalsContainer', subj_table: 'SubjectTables'):
-        self._PARAMS, self._YEARS = globals_cont.PARAMS, globals_cont.YEARS
-        self._subject_table = subj_table
+    def __read_table(self, text):
+        """
+        Reads journal table of the page. With fast_extract it's scanned without building a DOM,
+        BS4 is used if the scanner can't read the table or (in 'verify' mode) its result differs from the BS4 one
+        :param text: page's html
+        :return: ScannedTable or BS4 <table>
+        """
+        if self._PARAMS.fast_extract:
+            try:
+                table = scan_table(text, self._PARAMS.encoding)
+            except ScanError:
+                table = None
 
-        self.subject = self._subject_table.subj_name
-        self.teacher = self._subject_table.teacher
-        self.term = self._subject_table.term
+            if table and (self._PARAMS.fast_extract != 'verify' or self.__verify(table, text)):
+                return table
 
-        self.warnings = self.__check()
+        return make_soup(text, 'journal').find('table', {'class': 'table'})
 
-    def __check(self):
+    def __verify(self, table, text):
         """
-        Performs needed checks with all the SubjectTables <table>s
-        :return: global list of warnings
+        Compares what is extracted from ScannedTable with the BS4 result. Differing journals are collected to globals' MISMATCHES
+        :return: True if they're the same
         """
+        bs4_table = make_soup(text, 'journal').find('table', {'class': 'table'})
+        scanned, parsed = self.__extract_page(table), self.__extract_page(bs4_table)
+
+        if scanned.same_data(parsed) and self.__last_date(table) == self.__last_date(bs4_table): #hashes are made from different sources
+            return True
 
-        if self._PARAMS.only_term: #don't do deep check if we need to check only term marks
-            tm_warns = self.__check_term_marks(self._subject_table.raw_pages[0])
-            return tm_warns
+        self._MISMATCHES.append(f'{self.grade} {self.subj_name} {self.term}')
+        return False
 
+    def __last_date(self, table):
+        """
+        Finds the date of table's last column
+        :param table: BS4 Page element or ScannedTable
+        :return: datetime.date()
+        """
+        return table_last_date(table, self._CALENDAR, self.grade, self.term)
 
-        all_data = self.__merge_all_tables()
-        warnings = self.__deepcheck(all_data)
+    def __check_date(self, table):
+        """
+        Checks whether table's last column date is bigger that today. Not to fetch extra empty tables from the future
+        :param table: BS4 Page element
+        :return: True if last column date is bigger than today else False
+        """
+        if self.__last_date(table) > datetime.date.today():
 
-        return warnings
+            return True
+        return False
 
-    def __merge_all_tables(self):
+    def __extract_page(self, table):
         """
-        Extracts dates, lesson_types, marks etc from <table>s given into one dict. And removes dates from the future
-        :return:
+        Extracts everything checks need from the page's <table>. Dates from the future are cropped with their columns
+        :param table: BS4 <table> or ScannedTable
+        :return: JournalPage
         """
-        super_dict = {
+        if isinstance(table, ScannedTable):
+            return self.__extract_scanned(table)
+
+        term_marks, students = self.__extract_term_marks(table)
+        page = {
             'dates': [],
             'lesson_types': [],
             'lesson_metas': [], #optional
-            'marks': [] #optional
+            'marks': [], #optional
+            'term_marks': term_marks,
+            'students': students,
+            'hash': hashlib.md5(str(table).encode('utf-8')).hexdigest(), #to find out if the page has changed since the last run
         }
 
-        for table in self._subject_table.raw_pages:
-            new_dates = self.__create_dates(table)
-            super_dict['dates'] += new_dates #dates needed anyway
+        if self._PARAMS.only_term: #only term marks are checked
+            return JournalPage(**page)
 
-            crop = len(new_dates)
+        page['dates'] = self.__create_dates(table)
+        crop = len(page['dates'])
 
-            l_types, l_metas = self.__extract_lesson_types_and_metas(table)
-            super_dict['lesson_types'] += l_types[:crop] #types may be needed while marks checking, so collect them too
+        l_types, l_metas = self.__extract_lesson_types_and_metas(table)
+        if 'lesson_types' in self._columns:
+            page['lesson_types'] = l_types[:crop]
+        page['lesson_metas'] = l_metas[:crop]
 
-            if l_metas:
-                super_dict['lesson_metas'] += l_metas[:crop] #optional
-
-            if (self._PARAMS.check_lessons_fill or self._PARAMS.check_students_fill or self._PARAMS.check_double_two): #collect marks only if they're needed
-                if not super_dict['marks']:
-                    super_dict['marks'] = [row[:crop] for row in self.__extract_marks(table)]
-                else:
-                    new_rows = self.__extract_marks(table)
-                    for row_old, row_new in zip(super_dict['marks'], new_rows):
-                        row_old += row_new[:crop]
+        if 'marks' in self._columns: #collect marks only if they're needed
+            page['marks'] = [row[:crop] for row in self.__extract_marks(table)]
 
-        return super_dict
+        return JournalPage(**page)
 
-    def __check_term_marks(self, table):
+    def __extract_scanned(self, table: 'ScannedTable'):
         """
-        Checks whether term marks correspond to averages
-        :param table:
-        :return: list of warnings
+        Same as __extract_page, but the data is taken from the flat arrays of ScannedTable
+        :return: JournalPage
         """
-        tm_warns = []
-        rows = table.find('tbody').find_all('tr')
-
-        counter = 1 #this is just to count row number
-        for row in rows:
-            cells = row.find_all('td')
+        page = {
+            'dates': [],
+            'lesson_types': [],
+            'lesson_metas': [],
+            'marks': [],
+            'term_marks': table.term_marks(),
+            'students': table.students(),
+            'hash': table.hash,
+        }
 
-            term_m = cells[-1].text.strip()
+        if self._PARAMS.only_term:
+            return JournalPage(**page)
 
-            if term_m.isdigit():
-                term_m = int(term_m)
-                avg_m = cells[-2].text.strip().replace(',', '.')
-                try:
-                    avg_m = float(avg_m)
+        datenums = []
+        for day, joint in table.days():
+            datenums += [day] * joint
 
-                    if not self.__avg_and_term_compare(avg_m, term_m):
-                        tm_warns.append(['Несоответствие средней и четвертной оценок. Строка {}'.format(counter)])
+        page['dates'] = self.__dates_from_columns(dict(table.months()), datenums)
+        crop = len(page['dates'])
 
-                except ValueError:
-                    tm_warns.append(['Нет среднего балла. Строка {}'.format(counter)])
-            else:
-                tm_warns.append(['Нет четвертной оценки. Строка {}'.format(counter)])
+        if 'lesson_types' in self._columns:
+            page['lesson_types'] = table.lesson_types()[:crop]
+        if 'lesson_metas' in self._columns:
+            page['lesson_metas'] = table.lesson_titles()[:crop]
 
-            counter += 1
+        if 'marks' in self._columns:
+            page['marks'] = [row[:crop] for row in table.mark_rows()]
 
-        return tm_warns
+        return JournalPage(**page)
 
-    def __avg_and_term_compare(self, average: float, term: int):
+    def __extract_term_marks(self, table):
         """
-        Checks whether average mark correspond to term mark
-        :param average:
-        :param term:
-        :return: True if correspond else False
+        Extracts average and term marks of every student
+        :param table:
+        :return: list [(avg1, term_mark1), ..., (avgN, term_markN)] of strings, list of students' cells texts
         """
-        if average >= self._PARAMS.min_for_5 and term != 5:
-            return False
-
-        elif self._PARAMS.min_for_4 <= average < self._PARAMS.min_for_5 and term != 4:
-            return False
-
-        elif self._PARAMS.min_for_3 <= average < self._PARAMS.min_for_4 and term != 3:
-            return False
+        term_marks = []
+        students = []
+        for row in table.find('tbody').find_all('tr'):
+            cells = row.find_all('td')
+            term_marks.append((cells[-2].text.strip(), cells[-1].text.strip()))
+            students.append(cells[1].text.strip() if len(cells) > 1 else '')
 
-        return True
+        return term_marks, students
 
     def __create_dates(self, table):
         """
@@ -286,16 +457,24 @@ class Warnings:
             joint = int(date['colspan'])
             datenums += [int(date.text)] * joint
 
+        return self.__dates_from_columns(months, datenums)
+
+    def __dates_from_columns(self, months, datenums):
+        """
+        :param months: {month_name: columns_count, ...}
+        :param datenums: day number of every column
+        :return: list of datetime.date() instances. It's cropped if there're dates from the future
+        """
         for name, count in months.items():
             months[name] = datenums[:count]
             datenums = datenums[count:]
 
-
         dates = []
+        term_dates = self._CALENDAR.term_dates(self.grade, self.term)
 
         for name, date_nums in months.items():
             for day_num in date_nums:
-                date = str_to_date(day_num, name, self._YEARS[self.term // 2] if self._subject_table.grade.startswith(('10', '11')) else self._YEARS[self.term // 3])
+                date = term_dates.get((name, day_num)) or self._CALENDAR.date(day_num, name, self.grade, self.term) #raises for wrong dates
 
                 if date > datetime.date.today():
                     return dates
@@ -319,7 +498,7 @@ class Warnings:
         for lesson in lessons_row.find_all('td'):
             types.append(lesson.text.strip())
 
-            if self._PARAMS.check_meta:
+            if 'lesson_metas' in self._columns:
                 try:
                     meta = lesson.get('title')
                     if meta:
@@ -346,103 +525,101 @@ class Warnings:
 
         return marks_rows
 
-    def __deepcheck(self, all_data: dict):
-        """
-        Performs checking according to all the parameters listed
-        :param all_data:
-        :return: list of warnings
-        """
-
-
-        l_types = all_data.get('lesson_types', [])
-        l_metas = all_data.get('lesson_metas', [])
-        marks = all_data.get('marks', [])
-        self.dates = all_data.get('dates', []) #make a property
+class Warnings:
+    """
+    Checks pages extracted by SubjectsTable and returns lists of warnings
+    """
+    def __init__(self, globals_cont: 'GlobalsContainer', subj_table: 'SubjectTables', batch: 'BatchEvaluator' = None):
+        self._PARAMS, self._YEARS, self._CALENDAR = globals_cont.PARAMS, globals_cont.YEARS, globals_cont.CALENDAR
+        self._subject_table = subj_table
 
-        warns = []
+        self.subject = self._subject_table.subj_name
+        self.teacher = self._subject_table.teacher
+        self.term = self._subject_table.term
 
-        if self._PARAMS.check_RO:
-            warns += self.__check_RO(l_types)
+        data = self.__merge_all_tables(extracted_columns(self._PARAMS))
+        if globals_cont.SNAPSHOT is not None:
+            globals_cont.SNAPSHOT.add(subj_table.grade, self, data)
 
-        if self._PARAMS.check_meta:
-            warns += self.__check_meta(l_metas)
+        self.warnings = self.__check(data, batch)
+        self._subject_table = None #tables are not needed anymore, let them be garbage collected
 
-        if marks:
-            warns += self.__check_marks(l_types, marks)
+    @classmethod
+    def from_data(cls, PARAMS, subject, teacher, term, data: 'CheckData', batch: 'BatchEvaluator' = None):
+        """
+        Checks data kept from the previous run (see snapshot.Snapshot) with other params. Nothing is fetched
+        :return: Warnings
+        """
+        warns = cls.__new__(cls)
+        warns._PARAMS, warns._YEARS, warns._CALENDAR = PARAMS, None, data.calendar
+        warns._subject_table = None
 
-        if self._PARAMS.check_term_marks:
-            warns += self.__check_term_marks(self._subject_table.raw_pages[0])
+        warns.subject, warns.teacher, warns.term = subject, teacher, term
+        warns.warnings = warns.__check(data, batch)
 
         return warns
 
-    def __check_RO(self, l_types: list):
+    def __getstate__(self):
         """
-        Checks 'После КР или Д должна быть РО'
-        :param l_types:
-        :return: warnings: list of lists[text, date]
+        Only results are pickled (sent from worker processes, stored for the next run). Params hold credentials
         """
-        w = []
-        for i in range(len(l_types)):
-            try:
-                if (l_types[i] in self._PARAMS.CONTROL_WORKS and l_types[i+1] != 'РО'):
-                    w.append(['После КР или Дикт. не работа над ошибками', datetime.datetime.strftime(self.dates[i], '%d %B')])
-            except IndexError:
-                pass
-
-        return w
+        state = self.__dict__.copy()
+        state['_PARAMS'] = state['_YEARS'] = state['_CALENDAR'] = None
+        return state
 
-    def __check_meta(self, l_metas: list):
+    def __check(self, data: 'CheckData', batch=None):
         """
-        Checks 'Заполнены ли темы уроков и дз'
-        :param l_meta:
-        :return: warnings: list of lists[text, date]
+        Performs enabled checks (see rules.RULES) with the merged data of all the SubjectTables pages
+        :param batch: if it's passed, warnings are filled later by batch.evaluate()
+        :return: global list of warnings
         """
-        w = []
-        for i in range(len(l_metas)):
-            if not l_metas[i]:
-                w.append(['Нет темы урока или ДЗ', datetime.datetime.strftime(self.dates[i], '%d %B')])
-
-        return w
+        self.dates = data.dates
 
-    def __check_marks(self, l_types: list, marks: list):
-        w = []
+        if batch is not None:
+            batch.add(self, data)
+            self.costs = {}
+            return []
 
-        lessons_count = len(marks[0])
-        if self._PARAMS.check_students_fill or self._PARAMS.check_double_two:
+        engine = RuleEngine(self._PARAMS)
 
-            for i in range(len(marks)):
-                row = marks[i]
-                if self._PARAMS.check_students_fill:
-                    marks_count = len([m for m in row if m in self._PARAMS.STR_MARKS])
-                    if round(marks_count / lessons_count, 2) < round(self._PARAMS.term_percent / 100, 2):
-                        w.append([f'У ученика мало оценок за четверть. Строка {i}'])
+        warnings = engine.run(data)
+        self.costs = engine.costs #{rule_name: seconds}, summed up by rules.RuleCosts
 
-                if self._PARAMS.check_double_two:
-                    for j in range(len(row)):
-                        try:
-                            if row[j] == '2' and row[j+1] == '2':
-                                w.append(['Две двойки подряд', datetime.datetime.strftime(self.dates[j], '%d %B')])
-                        except IndexError:
-                            pass
+        return warnings
 
-        if self._PARAMS.check_lessons_fill:
-            for i in range(lessons_count):
-                l_type = l_types[i]
-                col = [row[i] for row in marks]
-                students_count = len(col)
+    def __merge_all_tables(self, columns):
+        """
+        Merges the columns the rules need of all the pages into one CheckData
+        :return: CheckData
+        """
+        pages = self._subject_table.pages
+        super_dict = {
+            'dates': [],
+            'lesson_types': [],
+            'lesson_metas': [],
+            'marks': [],
+            'term_marks': pages[0]['term_marks'] if 'term_marks' in columns else [], #of the first page only
+        }
 
-                if l_type in self._PARAMS.MARKS_COL_TYPES and not (l_type == 'ПР' and self.subject.startswith(self._PARAMS.allowed_not_row)):
-                    if col.count('') and self.dates[i] + datetime.timedelta(days=8) < datetime.date.today():
-                        w.append(['Должен быть ряд оценок', datetime.datetime.strftime(self.dates[i], '%d %B')])
+        if self._PARAMS.only_term: #nothing but term marks is checked
+            return CheckData(self.subject, self._CALENDAR, **super_dict)
 
-                else:
-                    if round(col.count('') / students_count, 2) > 1 - round(self._PARAMS.lesson_percent / 100, 2):
-                        if l_type in ('Р', 'П'):
-                            if self.dates[i] + datetime.timedelta(days=8) < datetime.date.today():
-                                w.append(['Мало оценок за урок', datetime.datetime.strftime(self.dates[i], '%d %B')])
-                        else:
-                            w.append(['Мало оценок за урок', datetime.datetime.strftime(self.dates[i], '%d %B')])
+        if 'marks' in columns and self._PARAMS.numpy_marks:
+            matrix = MarkMatrix.from_pages(pages)
+            if matrix is not None:
+                super_dict['marks'] = matrix #the list path is used for the pages it can't join
 
-        return w
+        for page in pages:
+            super_dict['dates'] += page['dates'] #dates needed anyway
+            super_dict['lesson_types'] += page['lesson_types']
+            super_dict['lesson_metas'] += page['lesson_metas'] #optional
 
+            if 'marks' not in columns or isinstance(super_dict['marks'], MarkMatrix):
+                continue
+            elif not super_dict['marks']:
+                super_dict['marks'] = [list(row) for row in page['marks']] #copy, pages may be stored for the next run
+            else:
+                for row_old, row_new in zip(super_dict['marks'], page['marks']):
+                    row_old += row_new
 
+        return CheckData(self.subject, self._CALENDAR, **super_dict)
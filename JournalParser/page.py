@@ -0,0 +1,82 @@
+from sys import intern
+
+FIELDS = ('dates', 'lesson_types', 'lesson_metas', 'marks', 'term_marks', 'students', 'hash')
+
+
+def encode_marks(rows):
+    """
+    Packs mark rows into one byte per cell. Codes index the page's symbols (distinct cell strings)
+    :param rows: [[mark, ...], ...] of strings
+    :return: (symbols: tuple, grid: tuple of bytes) or (None, tuple of tuples) if there're more than 256 symbols
+    """
+    codes = {}
+    grid = []
+    for row in rows:
+        for mark in row:
+            if mark not in codes:
+                codes[mark] = len(codes)
+        if len(codes) > 256:
+            return None, tuple(tuple(intern(mark) for mark in row) for row in rows)
+        grid.append(bytes(codes[mark] for mark in row))
+
+    return tuple(intern(mark) for mark in codes), tuple(grid)
+
+
+class JournalPage:
+    """
+    Everything the checks need from one journal page. Nothing refers to the page's DOM.
+    Strings are interned, so lesson types and marks repeated over thousands of cells are stored once,
+    marks are kept as a byte per cell grid. Fields can be read as page['marks'] as well
+    """
+    __slots__ = ('dates', 'lesson_types', 'lesson_metas', 'term_marks', 'students', 'hash', '_symbols', '_grid')
+
+    def __init__(self, dates=(), lesson_types=(), lesson_metas=(), marks=(), term_marks=(), students=(), hash=None):
+        self.dates = tuple(dates)
+        self.lesson_types = tuple(intern(l_type) for l_type in lesson_types)
+        self.lesson_metas = tuple(lesson_metas)
+        self.term_marks = tuple((intern(avg), intern(term)) for avg, term in term_marks)
+        self.students = tuple(students)
+        self.hash = hash
+        self._symbols, self._grid = encode_marks(marks)
+
+    @property
+    def marks(self):
+        """
+        :return: list of mark rows (lists of strings)
+        """
+        if self._symbols is None:
+            return [list(row) for row in self._grid]
+
+        symbols = self._symbols
+        return [[symbols[code] for code in row] for row in self._grid]
+
+    def mark_grid(self):
+        """
+        :return: (symbols, rows of bytes) or None if the page has too many distinct marks to be coded with bytes
+        """
+        if self._symbols is None:
+            return
+        return self._symbols, self._grid
+
+    def __getitem__(self, key):
+        if key not in FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def same_data(self, other: 'JournalPage'):
+        """
+        :return: True if the pages have the same data, hashes are not compared
+        """
+        return all(self[key] == other[key] for key in FIELDS if key != 'hash')
+
+    def __eq__(self, other):
+        if not isinstance(other, JournalPage):
+            return NotImplemented
+        return self.hash == other.hash and self.same_data(other)
+
+    def __getstate__(self):
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    def __setstate__(self, state):
+        for key, value in state.items():
+            setattr(self, key, value)
@@ -26,6 +26,60 @@ class Params:
         self.check_double_two = kwargs.get('check_double_two', False)
         self.check_term_marks = kwargs.get('check_term_marks', False)
 
+        self.fetch_threads = int(kwargs.get('fetch_threads', 1)) # 1 means pages are fetched one by one
+        self.host_limit = int(kwargs.get('host_limit', 4)) # max simultaneous requests to one host
+        self.async_crawl = kwargs.get('async_crawl', False) # crawl all the journals on one asyncio event loop
+        self.base_url = kwargs.get('base_url', 'https://edu.tatar.ru')
+
+        self.pipeline = kwargs.get('pipeline', False) # overlap fetching, parsing and checking
+        self.parse_workers = int(kwargs.get('parse_workers', 1))
+        self.check_workers = int(kwargs.get('check_workers', 1))
+        self.queue_size = int(kwargs.get('queue_size', 8)) # max items waiting between pipeline stages
+        self.process_pool = kwargs.get('process_pool', False) # parse and check journal pages and parse report pages in worker processes
+        self.processes = int(kwargs.get('processes', 0)) # 0 means one process per CPU core
+
+        self.cache = kwargs.get('cache', False) # keep fetched pages on disk
+        self.cache_dir = kwargs.get('cache_dir', 'cache')
+        self.cache_size = int(kwargs.get('cache_size', 200)) * 1024 * 1024 # MB
+        self.cache_ttls = kwargs.get('cache_ttls', {}) # {url_class: seconds}, see cache.DEFAULT_TTLS
+        self.closed_terms = tuple(kwargs.get('closed_terms', ())) # their journal pages never expire
+
+        self.incremental = kwargs.get('incremental', False) # refetch only pages that can have changed
+        self.state_file = kwargs.get('state_file', 'journal_state.pkl')
+        self.recent_days = int(kwargs.get('recent_days', 14)) # pages with lessons in these days are always refetched
+        self.sample_every = int(kwargs.get('sample_every', 5)) # every older page is refetched once in this many runs
+
+        self.plan_pages = kwargs.get('plan_pages', False) # fetch only the pages before the cutoff
+        self.planner_file = kwargs.get('planner_file', 'pagination.pkl')
+
+        self.single_flight = kwargs.get('single_flight', False) # identical GETs of one job share one request and one parse
+        self.flight_memo = int(kwargs.get('flight_memo', 64)) # responses kept in memory, journal pages aren't kept
+
+        self.pool_size = int(kwargs.get('pool_size', 10)) # kept-alive connections per host
+        self.connect_timeout = float(kwargs.get('connect_timeout', 10)) # seconds
+        self.read_timeout = float(kwargs.get('read_timeout', 60))
+        self.retries = int(kwargs.get('retries', 3)) # GETs are retried on connection errors and 5xx
+        self.backoff = float(kwargs.get('backoff', 0.5))
+
+        self.adaptive = kwargs.get('adaptive', False) # tune the number of simultaneous requests to the server's health
+        self.max_concurrency = int(kwargs.get('max_concurrency', 16))
+
+        self.parser = kwargs.get('parser', 'html.parser') # or 'lxml' if it's installed
+        self.strain = kwargs.get('strain', False) # build only the needed part of the journal and grade pages
+        self.fast_extract = kwargs.get('fast_extract', False) # read journal tables without DOM. 'verify' compares with BS4
+        self.raw_bytes = kwargs.get('raw_bytes', False) # hand response bodies to the parser without decoding them to str
+        self.encoding = kwargs.get('encoding', 'utf-8') # encoding of the site's pages, it's not guessed
+
+        self.stream = kwargs.get('stream', False) # write every subject's warnings as soon as they're ready
+        self.memory_limit = int(kwargs.get('memory_limit', 0)) * 1024 * 1024 # MB, 0 means no limit
+
+        self.numpy_marks = kwargs.get('numpy_marks', True) # check marks with numpy arrays if it's installed
+        self.batch_checks = kwargs.get('batch_checks', False) # check all the subjects at once after fetching, needs numpy
+        self.snapshot = kwargs.get('snapshot', False) # keep the checked data to check it again with other thresholds
+        self.snapshot_file = kwargs.get('snapshot_file', 'last_run.pkl')
+        self.topology_ttl = int(kwargs.get('topology_ttl', 0)) # seconds teachers' grades and term links are kept between reports, 0 means they're found every run
+        self.topology_file = kwargs.get('topology_file', 'teachers.pkl')
+
 
         self.group_by_alias = {'По учителям': 'teachers', 'По классам': 'grades'}
         self.group_by = self.group_by_alias[kwargs.get('group_by', 'По классам')]
@@ -40,4 +94,13 @@ class Params:
         and not self.check_students_fill and not self.check_double_two):
             self.only_term = True
         else:
-            self.only_term = False
\ No newline at end of file
+            self.only_term = False
+
+    def checks_signature(self):
+        """
+        Everything the warnings depend on. Warnings made with another signature can't be reused
+        :return: tuple
+        """
+        return (self.check_RO, self.check_meta, self.check_lessons_fill, self.check_students_fill,
+                self.check_double_two, self.check_term_marks, self.min_for_5, self.min_for_4, self.min_for_3,
+                self.lesson_percent, self.term_percent, self.allowed_not_row)
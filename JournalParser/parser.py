@@ -0,0 +1,57 @@
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+BACKENDS = ('html.parser', 'lxml')
+
+STRAINERS = { #parts of pages that are enough for their handlers
+    'journal': SoupStrainer('table', {'class': 'table'}), #subject's journal page without the first one
+    'subjects': SoupStrainer('select', id='criteria'), #grade's initial page
+    'info_letter': SoupStrainer('table'), #student's info letter in reports
+}
+
+_backend = 'html.parser'
+_strain = False
+_raw = False
+_encoding = 'utf-8'
+
+
+def configure(PARAMS):
+    """
+    Selects parser backend for the whole process. lxml falls back to html.parser if it's not installed
+    """
+    global _backend, _strain, _raw, _encoding
+
+    _backend = PARAMS.parser if PARAMS.parser in BACKENDS and (PARAMS.parser != 'lxml' or HAS_LXML) else 'html.parser'
+    _strain = PARAMS.strain
+    _raw = PARAMS.raw_bytes
+    _encoding = PARAMS.encoding
+
+
+def page_markup(r):
+    """
+    What is handed to the parser: response body as is in raw bytes mode, else its text
+    :return: bytes or str
+    """
+    return r.content if _raw else r.text
+
+
+def make_soup(markup, only: str = None, backend: str = None, strain: bool = None):
+    """
+    Parses the page with the selected backend
+    :param markup: str or bytes. Bytes are decoded by the backend with the pinned encoding, nothing is guessed
+    :param only: key of STRAINERS. If strained parsing is on, only this part of the page is built
+    :param backend: overrides the selected backend
+    :param strain: overrides the selected strain mode
+    :return: BS4 instance
+    """
+    strain = _strain if strain is None else strain
+    parse_only = STRAINERS[only] if strain and only else None
+
+    from_encoding = _encoding if isinstance(markup, bytes) else None
+
+    return BeautifulSoup(markup, backend or _backend, parse_only=parse_only, from_encoding=from_encoding)
@@ -0,0 +1,182 @@
+import threading
+from queue import Queue
+from JournalParser.objects import SubjectTables, Warnings
+from JournalParser.funcs import get_initial_data, get_terms_range
+from JournalParser.fetcher import fetch_subject
+from JournalParser.procpool import create_pool, pool_size, check_subject, worker_params
+from JournalParser.limiter import crawl_width
+
+_DONE = object() #tells a stage worker to stop
+
+
+class Pipeline:
+    """
+    Checks journals in three overlapping stages connected with bounded queues:
+    fetchers download raw pages -> parsers build SubjectTables -> checkers run Warnings.
+    A full queue blocks the previous stage, so only queue_size items per stage are kept in memory.
+    With process_pool parsing and checking are both done in worker processes, raw page bytes are sent there.
+    The result is the same dict execute() gets: {grade1: {subj1: [Warnings1t, ...], ..., subjN: [...]}, ..., gradeN: {...}}
+    """
+    def __init__(self, globals_cont: 'GlobalsContainer', pBar=None, label=None):
+        self._globals = globals_cont
+        self._SESSION, self._PARAMS = globals_cont.SESSION, globals_cont.PARAMS
+        self._pBar = pBar
+        self._label = label
+
+        self._lock = threading.Lock()
+        self._results = {}
+        self._progress = 0
+        self._error = None
+        self._pool = None
+        self._worker_params = worker_params(self._PARAMS)
+
+    def run(self, grades_to_link: dict):
+        """
+        :param grades_to_link: {grade1: link_to_journal, ..., gradeN: link_to_journal}
+        :return: data dict
+        """
+        size = self._PARAMS.queue_size
+        jobs_q, raw_q, tables_q = Queue(size), Queue(size), Queue(size)
+
+        parse_workers = self._PARAMS.parse_workers
+        if self._PARAMS.process_pool:
+            self._pool = create_pool(self._PARAMS)
+            parse_workers = pool_size(self._PARAMS) #one waiting thread per process
+
+        stages = [
+            (self.__fetch, jobs_q, raw_q, crawl_width(self._PARAMS)[0]),
+            (self.__parse, raw_q, tables_q, parse_workers),
+            (self.__check, tables_q, None, self._PARAMS.check_workers),
+        ]
+
+        workers = []
+        for func, in_q, out_q, count in stages:
+            threads = [threading.Thread(target=self.__work, args=(func, in_q, out_q), daemon=True)
+                       for _ in range(max(1, count))]
+            for thread in threads:
+                thread.start()
+            workers.append((in_q, threads))
+
+        order = self.__produce(grades_to_link, jobs_q)
+
+        for in_q, threads in workers: #stages are stopped one by one, so nothing is left in the queues
+            for _ in threads:
+                in_q.put(_DONE)
+            for thread in threads:
+                thread.join()
+
+        if self._pool:
+            self._pool.shutdown()
+            self._pool = None
+
+        if self._error:
+            raise self._error
+
+        return self.__collect(order)
+
+    def __produce(self, grades_to_link, jobs_q):
+        """
+        Puts (grade, grade_id, subj_name, subj_id, term, value) jobs into the first queue
+        :return: [(grade, [(subj_name, terms), ...]), ...] order to assemble results in
+        """
+        grade_val = 95 / (len(grades_to_link) if grades_to_link else 1)
+        order = []
+
+        for grade, link in grades_to_link.items():
+            if self._error:
+                break
+
+            grade_id, subj_to_id = get_initial_data(self._SESSION, link)
+            subj_value = grade_val / (len(subj_to_id) if subj_to_id else 1)
+            subjects = []
+
+            for subj_name, id_ in subj_to_id.items():
+                terms = get_terms_range(grade, self._PARAMS)
+                subjects.append((subj_name, terms))
+
+                for term in terms:
+                    jobs_q.put((grade, grade_id, subj_name, id_, term, subj_value / len(terms)))
+
+            order.append((grade, subjects))
+
+        return order
+
+    def __work(self, func, in_q, out_q):
+        """
+        Stage worker loop. After an error the rest of items is drained, not handled
+        """
+        while True:
+            item = in_q.get()
+            if item is _DONE:
+                return
+            if self._error:
+                continue
+
+            try:
+                result = func(*item)
+            except Exception as e:
+                with self._lock:
+                    self._error = self._error or e
+                continue
+
+            if out_q is not None and result is not None:
+                out_q.put(result)
+
+    def __fetch(self, grade, grade_id, subj_name, subj_id, term, value):
+        first_page, raw_pages = fetch_subject(self._globals, grade, term, subj_id, grade_id,
+                                              as_bytes=self._pool is not None)
+        if not raw_pages:
+            return self.__done(grade, subj_name, term, value, None)
+
+        return grade, grade_id, subj_name, subj_id, term, value, first_page, raw_pages
+
+    def __parse(self, grade, grade_id, subj_name, subj_id, term, value, first_page, raw_pages):
+        if self._label:
+            self._label.emit(f'{grade} {subj_name} {term} четверть...')
+
+        if self._pool:
+            warns, kept, mismatches = self._pool.submit(check_subject, self._worker_params, self._globals.YEARS, grade,
+                                                        term, grade_id, subj_name, subj_id, first_page,
+                                                        raw_pages).result()
+            self._globals.MISMATCHES.extend(mismatches)
+            if kept is not None and self._globals.SNAPSHOT is not None:
+                self._globals.SNAPSHOT.add(grade, warns, kept)
+            return self.__done(grade, subj_name, term, value, warns)
+
+        tables = SubjectTables(self._globals, grade, term, grade_id, subj_name, subj_id,
+                               first_page=first_page, raw_pages=raw_pages)
+        if not tables.raw_pages:
+            return self.__done(grade, subj_name, term, value, None)
+
+        return grade, subj_name, term, value, tables
+
+    def __check(self, grade, subj_name, term, value, tables):
+        self.__done(grade, subj_name, term, value, Warnings(self._globals, tables))
+
+    def __done(self, grade, subj_name, term, value, warns):
+        """
+        Stores job's result and moves progress bar
+        """
+        with self._lock:
+            self._results[grade, subj_name, term] = warns
+            self._progress += value
+            progress = self._progress
+
+        if self._pBar:
+            self._pBar.emit(progress)
+
+    def __collect(self, order):
+        """
+        Assembles results in the same order the sequential check does
+        :return: data dict
+        """
+        data = {}
+        for grade, subjects in order:
+            data[grade] = {}
+            for subj_name, terms in subjects:
+                warns = [self._results.get((grade, subj_name, term)) for term in terms]
+                warns = [w for w in warns if w]
+                if warns:
+                    data[grade][subj_name] = warns
+
+        return data
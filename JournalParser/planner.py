@@ -0,0 +1,69 @@
+import os
+import pickle
+
+
+def journal_key(YEARS, grade_id, subj_id, term):
+    """
+    Journal ids are reused from year to year, so last year's page counts are never taken for this year's
+    :return: key of the journal in the planner
+    """
+    return tuple(YEARS), grade_id, subj_id, term
+
+
+class PaginationPlanner:
+    """
+    Remembers page counts of the journals and the last date of every page between the runs.
+    Stored in PARAMS.planner_file as {login: {(years, grade_id, subj_id, term): {'last_page': int, 'last_dates': {page_num: date}}}}
+    """
+    def __init__(self, PARAMS):
+        self._PARAMS = PARAMS
+        self._all = {}
+
+        if os.path.exists(PARAMS.planner_file):
+            try:
+                with open(PARAMS.planner_file, 'rb') as inf:
+                    self._all = pickle.load(inf)
+            except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+                self._all = {}
+
+        self._journals = self._all.setdefault(PARAMS.login, {})
+
+    def save(self):
+        with open(self._PARAMS.planner_file, 'wb') as ouf:
+            pickle.dump(self._all, ouf)
+
+    def __journal(self, key):
+        return self._journals.setdefault(key, {'last_page': None, 'last_dates': {}})
+
+    def last_page(self, key):
+        """
+        :return: remembered number of the journal's last page or None
+        """
+        return self._journals.get(key, {}).get('last_page')
+
+    def last_date(self, key, page_num):
+        """
+        :return: remembered date of the page's last column or None
+        """
+        return self._journals.get(key, {}).get('last_dates', {}).get(page_num)
+
+    def remember_last_page(self, key, last_page: int):
+        self.__journal(key)['last_page'] = last_page
+
+    def remember_page(self, key, page_num: int, last_date):
+        self.__journal(key)['last_dates'][page_num] = last_date
+
+    def cutoff(self, key, last_page: int, today):
+        """
+        Predicts the first page whose last column is from the future
+        :return: page number (last_page + 1 if all the pages are from the past) or None if some pages are unknown yet
+        """
+        last_dates = self._journals.get(key, {}).get('last_dates', {})
+
+        for page_num in range(1, last_page + 1):
+            if page_num not in last_dates:
+                return
+            if last_dates[page_num] > today:
+                return page_num
+
+        return last_page + 1
@@ -0,0 +1,77 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from JournalParser.params import Params
+from JournalParser.objects import GlobalsContainer, SubjectTables, Warnings
+from JournalParser.parser import configure
+
+WORKER_PARAMS = ('check_RO', 'check_meta', 'check_lessons_fill', 'check_students_fill', 'check_double_two',
+                 'check_term_marks', 'min_for_5', 'min_for_4', 'min_for_3', 'lesson_percent', 'term_percent',
+                 'parser', 'strain', 'fast_extract', 'raw_bytes', 'encoding', 'numpy_marks', 'snapshot')
+
+
+def pool_size(PARAMS):
+    """
+    Number of worker processes: one per CPU core unless PARAMS.processes is set
+    :return: int
+    """
+    return PARAMS.processes or os.cpu_count() or 1
+
+
+def create_pool(PARAMS):
+    """
+    :return: ProcessPoolExecutor
+    """
+    return ProcessPoolExecutor(max_workers=pool_size(PARAMS))
+
+
+def worker_params(PARAMS):
+    """
+    What parsing and checking pages needs: checks, thresholds and parser settings.
+    Sent with every task instead of PARAMS, so credentials, paths and network settings stay in the parent
+    :return: dict for Params
+    """
+    params = {name: getattr(PARAMS, name) for name in WORKER_PARAMS}
+    params['allowed_not_row'] = ' '.join(PARAMS.allowed_not_row)
+
+    return params
+
+
+def check_subject(params: dict, YEARS, grade, term, grade_id, subj_name, subj_id, first_page, raw_pages: list):
+    """
+    Runs in a worker process. Parses raw pages of the subject's term and performs the checks.
+    Returned Warnings keeps no BS4 trees, so it's cheap to send back
+    :param params: worker_params
+    :param first_page: markup of the first page, bytes if raw_bytes else str
+    :return: (Warnings or None if there's nothing to check, CheckData kept for the snapshot or None,
+    journals whose scanned tables differed from BS4 ones)
+    """
+    PARAMS = Params(params)
+    configure(PARAMS) #worker processes don't share the parent's settings
+    globals_cont = GlobalsContainer(None, PARAMS, YEARS)
+    tables = SubjectTables(globals_cont, grade, term, grade_id, subj_name, subj_id,
+                           first_page=first_page, raw_pages=raw_pages)
+
+    if not tables.raw_pages:
+        return None, None, globals_cont.MISMATCHES
+
+    warns = Warnings(globals_cont, tables)
+    kept = None
+    if globals_cont.SNAPSHOT is not None: #the worker's snapshot is dropped, the parent keeps the data
+        _, kept = globals_cont.SNAPSHOT.grades[grade][warns.subject][warns.term]
+
+    return warns, kept, globals_cont.MISMATCHES
+
+
+def build_table(params: dict, cls, raw_page, kwargs: dict):
+    """
+    Runs in a worker process. Builds Report table and drops its DOM before sending it back
+    :param params: worker_params
+    :param cls: Report.objects.Table subclass
+    :param raw_page: markup of the page, bytes if raw_bytes else str
+    :return: cls instance
+    """
+    configure(Params(params))
+    table = cls(raw_page, **kwargs)
+    table.release()
+
+    return table
@@ -0,0 +1,459 @@
+import time
+import datetime
+from JournalParser.markgrid import MarkMatrix, np
+
+COLUMNS = ('dates', 'lesson_types', 'lesson_metas', 'marks', 'term_marks')
+AXES = ('lessons', 'students', 'term_marks')
+
+RULES = [] #registered rules in the order their warnings are written
+
+
+def register(rule_cls):
+    """
+    Class decorator, adds the rule to the registry
+    """
+    RULES.append(rule_cls())
+    return rule_cls
+
+
+def enabled_rules(PARAMS):
+    return [rule for rule in RULES if rule.enabled(PARAMS)]
+
+
+def needed_columns(PARAMS):
+    """
+    Union of the columns the enabled rules read. Only these are extracted from the pages
+    :return: frozenset
+    """
+    columns = set()
+    for rule in enabled_rules(PARAMS):
+        columns.update(rule.columns)
+
+    return frozenset(columns)
+
+
+class CheckData:
+    """
+    Merged columns of all the subject's pages. Columns the rules don't need are empty
+    marks: list of rows or MarkMatrix
+    term_marks: [(avg1, term_mark1), ..., (avgN, term_markN)] of the first page
+    """
+    def __init__(self, subject, calendar: 'SchoolCalendar', dates=(), lesson_types=(), lesson_metas=(), marks=(), term_marks=()):
+        self.subject = subject
+        self.calendar = calendar
+        self.dates = dates
+        self.lesson_types = lesson_types
+        self.lesson_metas = lesson_metas
+        self.marks = marks
+        self.term_marks = term_marks
+
+    def day(self, i):
+        return self.calendar.label(self.dates[i])
+
+    def is_old(self, i):
+        """
+        :return: True if teacher had a week to fill the lesson
+        """
+        return self.dates[i] + datetime.timedelta(days=8) < datetime.date.today()
+
+    def lessons_count(self):
+        if isinstance(self.marks, MarkMatrix):
+            return self.marks.lessons_count
+        return len(self.marks[0]) if self.marks else 0
+
+
+class Rule:
+    """
+    One check of the journal. The rule reads the columns it declares and walks one of AXES:
+    'lessons' (journal columns), 'students' (mark rows) or 'term_marks' (rows of the first page).
+    Warnings of the rules with the same section are merged by index, so they come in the journal's order
+    """
+    flag = None #Params attribute that switches the rule on, also its name
+    columns = ()
+    axis = 'lessons'
+    section = 0
+
+    @property
+    def name(self):
+        return self.flag
+
+    def enabled(self, PARAMS):
+        return bool(getattr(PARAMS, self.flag))
+
+    def prepare(self, data: 'CheckData', PARAMS):
+        """
+        Called once before the traversal
+        :return: (length of the axis the rule checks, state passed to check)
+        """
+        return 0, None
+
+    def check(self, data: 'CheckData', PARAMS, i: int, state):
+        """
+        :return: list of warnings for index i of the axis
+        """
+        return []
+
+    def batch(self, tensor: 'MarkTensor', PARAMS):
+        """
+        Checks all the subject-terms of batch.MarkTensor at once
+        :return: [(item, index, warnings), ...] or None if the rule is checked item by item
+        """
+        return None
+
+
+@register
+class ControlWorkRO(Rule):
+    """
+    'После КР или Д должна быть РО'
+    """
+    flag = 'check_RO'
+    columns = ('dates', 'lesson_types')
+    section = 0
+
+    def prepare(self, data, PARAMS):
+        return len(data.lesson_types), None
+
+    def check(self, data, PARAMS, i, state):
+        l_types = data.lesson_types
+        try:
+            if l_types[i] in PARAMS.CONTROL_WORKS and l_types[i+1] != 'РО':
+                return [['После КР или Дикт. не работа над ошибками', data.day(i)]]
+        except IndexError:
+            pass
+
+        return []
+
+    def batch(self, tensor, PARAMS):
+        lessons = tensor.types.shape[1]
+        if lessons < 2:
+            return []
+
+        next_type = tensor.types[:, 1:]
+        hits = (tensor.types_in(PARAMS.CONTROL_WORKS)[:, :-1] & (next_type != -1) & ~tensor.types_in(('РО',))[:, 1:]
+                & tensor.upto(tensor.dates_len, lessons - 1)) #dates[i] must exist
+
+        return [(k, i, [['После КР или Дикт. не работа над ошибками', tensor.items[k].day(i)]])
+                for k, i in zip(*np.nonzero(hits))]
+
+
+@register
+class LessonMeta(Rule):
+    """
+    'Заполнены ли темы уроков и дз'
+    """
+    flag = 'check_meta'
+    columns = ('dates', 'lesson_metas')
+    section = 1
+
+    def prepare(self, data, PARAMS):
+        return len(data.lesson_metas), None
+
+    def check(self, data, PARAMS, i, state):
+        if not data.lesson_metas[i]:
+            return [['Нет темы урока или ДЗ', data.day(i)]]
+
+        return []
+
+    def batch(self, tensor, PARAMS):
+        hits = tensor.upto(tensor.metas_len, tensor.metas.shape[1]) & ~tensor.metas
+        return [(k, i, [['Нет темы урока или ДЗ', tensor.items[k].day(i)]]) for k, i in zip(*np.nonzero(hits))]
+
+
+@register
+class StudentsFill(Rule):
+    """
+    Student has enough marks for the term
+    """
+    flag = 'check_students_fill'
+    columns = ('marks',)
+    axis = 'students'
+    section = 2
+
+    def prepare(self, data, PARAMS):
+        marks = data.marks
+        if not len(marks):
+            return 0, None
+
+        lessons_count = data.lessons_count()
+        limit = round(PARAMS.term_percent / 100, 2)
+        if isinstance(marks, MarkMatrix): #ratio is rounded as in the list path, so it's looked up by marks count
+            few = np.array([round(count / lessons_count, 2) < limit for count in range(lessons_count + 1)])
+            return len(marks), few[marks.row_counts(PARAMS.STR_MARKS)].tolist()
+
+        return len(marks), None
+
+    def check(self, data, PARAMS, i, state):
+        if state is not None:
+            few = state[i]
+        else:
+            row = data.marks[i]
+            marks_count = len([m for m in row if m in PARAMS.STR_MARKS])
+            few = round(marks_count / len(data.marks[0]), 2) < round(PARAMS.term_percent / 100, 2)
+
+        if few:
+            return [[f'У ученика мало оценок за четверть. Строка {i}']]
+
+        return []
+
+    def batch(self, tensor, PARAMS):
+        counts = tensor.marks_in(PARAMS.STR_MARKS).sum(axis=2)
+        limit = round(PARAMS.term_percent / 100, 2)
+        few = tensor.lookup(tensor.lessons, lambda count, lessons_count: round(count / lessons_count, 2) < limit)
+        hits = few[np.arange(len(tensor))[:, None], counts] & tensor.upto(tensor.students, counts.shape[1])
+
+        return [(k, i, [[f'У ученика мало оценок за четверть. Строка {i}']]) for k, i in zip(*np.nonzero(hits))]
+
+
+@register
+class DoubleTwo(Rule):
+    """
+    Two '2' in a row
+    """
+    flag = 'check_double_two'
+    columns = ('dates', 'marks')
+    axis = 'students'
+    section = 2
+
+    def prepare(self, data, PARAMS):
+        marks = data.marks
+        if isinstance(marks, MarkMatrix):
+            return len(marks), marks.pairs('2')
+
+        return len(marks), None
+
+    def check(self, data, PARAMS, i, state):
+        if state is not None:
+            lessons = np.flatnonzero(state[i]).tolist()
+        else:
+            row = data.marks[i]
+            lessons = [j for j in range(len(row) - 1) if row[j] == '2' and row[j+1] == '2']
+
+        return [['Две двойки подряд', data.day(j)] for j in lessons if j < len(data.dates)]
+
+    def batch(self, tensor, PARAMS):
+        lessons = tensor.marks.shape[2]
+        if lessons < 2:
+            return []
+
+        twos = tensor.marks_in(('2',))
+        hits = twos[:, :, :-1] & twos[:, :, 1:] & tensor.upto(tensor.dates_len, lessons - 1)[:, None, :]
+
+        found = {} #{(item, row): warnings}, nonzero goes in the rows' order
+        for k, i, j in zip(*np.nonzero(hits)):
+            found.setdefault((k, i), []).append(['Две двойки подряд', tensor.items[k].day(j)])
+
+        return [(k, i, warns) for (k, i), warns in found.items()]
+
+
+@register
+class LessonsFill(Rule):
+    """
+    Lesson has enough marks, lessons of MARKS_COL_TYPES have marks of every student
+    """
+    flag = 'check_lessons_fill'
+    columns = ('dates', 'lesson_types', 'marks')
+    section = 3
+
+    def prepare(self, data, PARAMS):
+        marks = data.marks
+        if not len(marks):
+            return 0, None
+
+        lessons_count = data.lessons_count()
+        if isinstance(marks, MarkMatrix):
+            students_count = len(marks)
+            limit = 1 - round(PARAMS.lesson_percent / 100, 2)
+            few = np.array([round(count / students_count, 2) > limit for count in range(students_count + 1)])
+            empty = marks.empty_counts()
+            return lessons_count, (empty.tolist(), few[empty].tolist())
+
+        return lessons_count, None
+
+    def check(self, data, PARAMS, i, state):
+        if state is not None:
+            empty, few = state[0][i], state[1][i]
+        else:
+            empty = sum(1 for row in data.marks if row[i] == '')
+            few = round(empty / len(data.marks), 2) > 1 - round(PARAMS.lesson_percent / 100, 2)
+
+        l_type = data.lesson_types[i]
+        if l_type in PARAMS.MARKS_COL_TYPES and not (l_type == 'ПР' and data.subject.startswith(PARAMS.allowed_not_row)):
+            if empty and data.is_old(i):
+                return [['Должен быть ряд оценок', data.day(i)]]
+
+        elif few and (l_type not in ('Р', 'П') or data.is_old(i)):
+            return [['Мало оценок за урок', data.day(i)]]
+
+        return []
+
+    def batch(self, tensor, PARAMS):
+        lessons = tensor.marks.shape[2]
+        empty = (tensor.marks == 0).sum(axis=1) #padding is -1
+        limit = 1 - round(PARAMS.lesson_percent / 100, 2)
+        few = tensor.lookup(tensor.students, lambda count, students_count: round(count / students_count, 2) > limit)
+        few = few[np.arange(len(tensor))[:, None], empty]
+
+        allowed = np.array([subject.startswith(PARAMS.allowed_not_row) for subject in tensor.subjects], dtype=bool)
+        row_types = tensor.types_in(PARAMS.MARKS_COL_TYPES) & ~(tensor.types_in(('ПР',)) & allowed[:, None])
+        practice, old = tensor.types_in(('Р', 'П')), tensor.old()
+        checked = tensor.upto(tensor.lessons, lessons)
+
+        no_row = checked & row_types & (empty > 0) & old
+        few_marks = checked & ~row_types & few & (~practice | old)
+
+        return ([(k, i, [['Должен быть ряд оценок', tensor.items[k].day(i)]]) for k, i in zip(*np.nonzero(no_row))] +
+                [(k, i, [['Мало оценок за урок', tensor.items[k].day(i)]]) for k, i in zip(*np.nonzero(few_marks))])
+
+
+@register
+class TermMarks(Rule):
+    """
+    Term marks correspond to averages
+    """
+    flag = 'check_term_marks'
+    columns = ('term_marks',)
+    axis = 'term_marks'
+    section = 4
+
+    def enabled(self, PARAMS):
+        return bool(PARAMS.check_term_marks or PARAMS.only_term) #it's the only check then
+
+    def prepare(self, data, PARAMS):
+        return len(data.term_marks), None
+
+    def check(self, data, PARAMS, i, state):
+        avg_m, term_m = data.term_marks[i]
+        if not term_m.isdigit():
+            return [['Нет четвертной оценки. Строка {}'.format(i + 1)]]
+
+        try:
+            avg_m = float(avg_m.replace(',', '.'))
+        except ValueError:
+            return [['Нет среднего балла. Строка {}'.format(i + 1)]]
+
+        if not self.__avg_and_term_compare(PARAMS, avg_m, int(term_m)):
+            return [['Несоответствие средней и четвертной оценок. Строка {}'.format(i + 1)]]
+
+        return []
+
+    def batch(self, tensor, PARAMS):
+        rows = tensor.upto(tensor.term_len, tensor.term.shape[1])
+        avg, term = tensor.avg, tensor.term
+        wrong = (((avg >= PARAMS.min_for_5) & (term != 5))
+                 | ((PARAMS.min_for_4 <= avg) & (avg < PARAMS.min_for_5) & (term != 4))
+                 | ((PARAMS.min_for_3 <= avg) & (avg < PARAMS.min_for_4) & (term != 3)))
+
+        found = []
+        for hits, text in ((rows & ~tensor.term_ok, 'Нет четвертной оценки. Строка {}'),
+                           (rows & tensor.term_ok & ~tensor.avg_ok, 'Нет среднего балла. Строка {}'),
+                           (rows & tensor.term_ok & tensor.avg_ok & wrong, 'Несоответствие средней и четвертной оценок. Строка {}')):
+            found += [(k, i, [[text.format(i + 1)]]) for k, i in zip(*np.nonzero(hits))]
+
+        return found
+
+    def __avg_and_term_compare(self, PARAMS, average: float, term: int):
+        """
+        Checks whether average mark correspond to term mark
+        :return: True if correspond else False
+        """
+        if average >= PARAMS.min_for_5 and term != 5:
+            return False
+
+        elif PARAMS.min_for_4 <= average < PARAMS.min_for_5 and term != 4:
+            return False
+
+        elif PARAMS.min_for_3 <= average < PARAMS.min_for_4 and term != 3:
+            return False
+
+        return True
+
+
+class RuleEngine:
+    """
+    Evaluates the enabled rules. Every axis is walked once, all the rules of the axis are checked at each index.
+    Time spent in every rule is summed in costs: {rule_name: seconds}
+    """
+    def __init__(self, PARAMS, rules: list = None):
+        self._PARAMS = PARAMS
+        self.rules = enabled_rules(PARAMS) if rules is None else rules
+        self.costs = {rule.name: 0.0 for rule in self.rules}
+
+    def run(self, data: 'CheckData'):
+        """
+        :return: list of warnings, ordered by the rules' sections
+        """
+        return ordered(self.found(data))
+
+    def found(self, data: 'CheckData'):
+        """
+        :return: [(section, index, rule position, warnings), ...] in the order they were found
+        """
+        found = []
+        for axis in AXES:
+            rules = []
+            for pos, rule in enumerate(self.rules):
+                if rule.axis == axis:
+                    start = time.perf_counter()
+                    length, state = rule.prepare(data, self._PARAMS)
+                    self.costs[rule.name] += time.perf_counter() - start
+                    rules.append((pos, rule, length, state))
+
+            for i in range(max((length for _, _, length, _ in rules), default=0)):
+                for pos, rule, length, state in rules:
+                    if i < length:
+                        start = time.perf_counter()
+                        warns = rule.check(data, self._PARAMS, i, state)
+                        self.costs[rule.name] += time.perf_counter() - start
+                        if warns:
+                            found.append((rule.section, i, pos, warns))
+
+        return found
+
+
+def ordered(found: list):
+    """
+    :param found: [(section, index, rule position, warnings), ...]
+    :return: list of warnings in the order the checks write them
+    """
+    found.sort(key=lambda item: item[:3])
+    return [warn for _, _, _, warns in found for warn in warns]
+
+
+class RuleCosts:
+    """
+    Sums the costs of the rules over the checked subjects
+    """
+    def __init__(self):
+        self.seconds = {}
+
+    def add(self, warns_list: list):
+        """
+        Costs are taken from the Warnings, so Warnings stored for the next run aren't counted twice
+        :param warns_list: [Warnings1t, ..., WarningsNt]
+        """
+        for warns in warns_list:
+            self.add_seconds(getattr(warns, 'costs', {}))
+            warns.costs = {}
+
+    def add_seconds(self, costs: dict):
+        """
+        :param costs: {rule_name: seconds}
+        """
+        for name, seconds in costs.items():
+            self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+
+    def add_all(self, data: dict):
+        """
+        :param data: {grade: {subj_name: [Warnings1t, ...]}}
+        """
+        for subjs in data.values():
+            for warns_list in subjs.values():
+                self.add(warns_list)
+
+    def summary(self):
+        """
+        :return: {rule_name: (seconds, share of all the checks' time)} from the most expensive rule
+        """
+        total = sum(self.seconds.values()) or 1
+        return {name: (round(seconds, 3), round(seconds / total, 2))
+                for name, seconds in sorted(self.seconds.items(), key=lambda item: -item[1])}
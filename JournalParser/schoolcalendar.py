@@ -0,0 +1,71 @@
+import datetime
+from functools import lru_cache
+
+MONTHS = ('Январь', 'Февраль', 'Март', 'Апрель', 'Май', 'Июнь', 'Июль', 'Август', 'Сентябрь', 'Октябрь', 'Ноябрь', 'Декабрь')
+MONTH_NUMBERS = {name: number for number, name in enumerate(MONTHS, 1)}
+
+
+class SchoolCalendar:
+    """
+    Dates of the school year's journals. (month_name, day) -> date tables of both calendar years are built once,
+    so journal columns are turned into dates with a dict lookup. Warnings' date labels ('05 Сентябрь')
+    are rendered once per date and don't depend on the process locale
+    """
+    def __init__(self, years):
+        """
+        :param years: [year1, year2] from get_years, ints or strings
+        """
+        self.years = [int(year) for year in years]
+        self._dates = {year: self.__year_table(year) for year in self.years}
+        self._labels = {}
+
+    @staticmethod
+    def __year_table(year):
+        table = {}
+        for month, number in MONTH_NUMBERS.items():
+            for day in range(1, 32):
+                try:
+                    table[(month, day)] = datetime.date(year, number, day)
+                except ValueError: #there's no such day in the month
+                    pass
+
+        return table
+
+    def table_year(self, grade: str, term: int):
+        """
+        Calendar year of the term's journal. 10-11 grades have semesters instead of terms
+        :return: int
+        """
+        return self.years[term // 2] if grade.startswith(('10', '11')) else self.years[term // 3]
+
+    def term_dates(self, grade: str, term: int):
+        """
+        :return: {(month_name, day): datetime.date()} of the term's calendar year
+        """
+        return self._dates[self.table_year(grade, term)]
+
+    def date(self, day: int, month: str, grade: str, term: int):
+        """
+        :return: datetime.date(). KeyError for an unknown month name, ValueError for a day the month doesn't have
+        """
+        try:
+            return self.term_dates(grade, term)[(month, day)]
+        except KeyError:
+            return datetime.date(self.table_year(grade, term), MONTH_NUMBERS[month], day)
+
+    def label(self, date: 'datetime.date'):
+        """
+        :return: '05 Сентябрь'
+        """
+        if date not in self._labels:
+            self._labels[date] = '{:02d} {}'.format(date.day, MONTHS[date.month - 1])
+        return self._labels[date]
+
+
+@lru_cache(maxsize=4)
+def school_calendar(years: tuple):
+    """
+    One calendar per school year in the process
+    :return: SchoolCalendar
+    """
+    return SchoolCalendar(years)
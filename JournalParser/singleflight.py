@@ -0,0 +1,145 @@
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit
+from JournalParser.cache import url_class, normalize_url
+from JournalParser.parser import make_soup, page_markup
+
+
+class _Flight:
+    """
+    Request (or parse) being made right now. Other threads asking for the same url wait for it
+    """
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self):
+        """
+        :return: result of the leader's request, its exception is raised
+        """
+        self.event.wait()
+        if self.error:
+            raise self.error
+        return self.result
+
+
+class SingleFlightSession:
+    """
+    Wraps SESSION so that identical GET requests made during one job share one request.
+    If the url is being fetched by another thread the caller waits for that request,
+    if it was fetched recently the response is taken from a bounded in-memory memo.
+    Journal pages are requested once per job, so they're shared while in flight but never memoized.
+    Callers parsing the same url at once share one parsed page, the first journal page too. It isn't kept after that,
+    so its DOM is freed as soon as the callers drop it.
+    Requests with extra arguments (headers, params, ...) and everything but GET are passed to the wrapped session
+    """
+    def __init__(self, SESSION, memo_size: int = 64):
+        self._SESSION = SESSION
+        self.memo_size = max(0, memo_size)
+
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._soups = {} #parses in flight
+        self._responses = OrderedDict()
+        self.hits = {'requests': 0, 'memo': 0, 'shared': 0, 'shared_soups': 0}
+
+    def __getattr__(self, name):
+        return getattr(self._SESSION, name)
+
+    @staticmethod
+    def __key(url):
+        return normalize_url(url) if url_class(url) == 'journal' else url #the first journal page is the same as page=1
+
+    def __remember(self, memo, key, value):
+        """
+        Puts value into LRU memo. Lock must be held
+        """
+        memo[key] = value
+        memo.move_to_end(key)
+        while len(memo) > self.memo_size:
+            memo.popitem(last=False)
+
+    def get(self, url, **kwargs):
+        if kwargs:
+            return self._SESSION.get(url, **kwargs)
+
+        key = self.__key(url)
+        with self._lock:
+            if key in self._responses:
+                self._responses.move_to_end(key)
+                self.hits['memo'] += 1
+                return self._responses[key]
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.hits['requests'] += 1
+            else:
+                self.hits['shared'] += 1
+
+        if not leader:
+            return flight.wait()
+
+        try:
+            flight.result = self._SESSION.get(url)
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+                r = flight.result
+                if (r is not None and r.status_code == 200 and not urlsplit(r.url).path.startswith('/logon')
+                        and url_class(url) != 'journal'):
+                    self.__remember(self._responses, key, r)
+            flight.event.set()
+
+        return flight.result
+
+    def soup(self, url):
+        """
+        GETs the url and parses it. Callers asking for the url while it's being parsed get the same BS4 instance,
+        so it must only be read. The response may come from the memo, the parsed page is never kept
+        :return: BS4 instance
+        """
+        key = self.__key(url)
+        with self._lock:
+            flight = self._soups.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._soups[key] = _Flight()
+            else:
+                self.hits['shared_soups'] += 1
+
+        if not leader:
+            return flight.wait()
+
+        try:
+            flight.result = make_soup(page_markup(self.get(url)))
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._soups.pop(key, None)
+            flight.event.set()
+
+        return flight.result
+
+    def trim(self):
+        """
+        Drops memoized responses and halves the memo size. Called when memory is short
+        """
+        with self._lock:
+            self._responses.clear()
+            self.memo_size //= 2
+
+    def stats(self):
+        """
+        :return: {'requests': made, 'memo': served from memo, 'shared': joined in-flight request,
+        'shared_soups': joined in-flight parse}
+        """
+        with self._lock:
+            return dict(self.hits)
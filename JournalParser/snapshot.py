@@ -0,0 +1,69 @@
+import os
+import pickle
+import threading
+from JournalParser.rules import COLUMNS, needed_columns
+
+
+class Snapshot:
+    """
+    Merged data every subject's term was checked with: {grade: {subj_name: {term: (teacher, CheckData)}}}.
+    It's saved to PARAMS.snapshot_file after the run, so the checks can be made again with other thresholds
+    (see whatif.reevaluate) without fetching anything. All the columns are extracted while it's kept
+    """
+    def __init__(self, PARAMS):
+        self.columns = frozenset(('term_marks',)) if PARAMS.only_term else frozenset(COLUMNS) #only the first pages are fetched then
+        self.grades = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def add(self, grade, warns: 'Warnings', data: 'CheckData'):
+        with self._lock:
+            self.grades.setdefault(grade, {}).setdefault(warns.subject, {})[warns.term] = (warns.teacher, data)
+
+    def items(self):
+        """
+        :return: [(grade, subj_name, term, teacher, CheckData), ...] in the order they were checked
+        """
+        return [(grade, subj_name, term, teacher, data)
+                for grade, subjs in self.grades.items()
+                for subj_name, terms in subjs.items()
+                for term, (teacher, data) in sorted(terms.items())]
+
+    def missing(self, PARAMS):
+        """
+        :return: columns the checks of PARAMS need, but the snapshot doesn't have
+        """
+        return needed_columns(PARAMS) - self.columns
+
+    def save(self, path: str):
+        with open(path, 'wb') as ouf:
+            pickle.dump(self, ouf)
+
+    @staticmethod
+    def load(path: str):
+        """
+        :return: Snapshot or None if there's no usable snapshot
+        """
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, 'rb') as inf:
+                return pickle.load(inf)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return
+
+
+def extracted_columns(PARAMS):
+    """
+    Columns SubjectTables extracts: the ones the checks need, or all of them if the data is kept for re-evaluation
+    :return: frozenset
+    """
+    return frozenset(COLUMNS) if PARAMS.snapshot else needed_columns(PARAMS)
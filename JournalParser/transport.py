@@ -0,0 +1,145 @@
+import time
+import random
+import threading
+import requests
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from JournalParser.limiter import AdaptiveLimiter, crawl_width
+
+try:
+    import brotli #requests can decode br responses only if it's installed
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+
+class JitteredRetry(Retry):
+    """
+    Retry whose backoff is randomized, so the retries of simultaneous requests don't hit the server at once
+    """
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        return random.uniform(backoff / 2, backoff) if backoff else 0
+
+
+class TransportSession(requests.Session):
+    """
+    Session all the requests of the app are made with.
+    Connections are pooled (pool_size per host), every request has (connect, read) timeout,
+    idempotent GETs are retried on connection errors and 5xx responses with jittered exponential backoff.
+    After every request the hooks are called with {'method', 'url', 'status', 'elapsed', 'size', 'retries', 'error'}.
+    If limiter is set, it decides how many requests may be in flight at once, a request that needed retries counts as failed.
+    Responses without charset in Content-Type get the pinned encoding instead of a guessed one
+    """
+    def __init__(self, pool_size: int = 10, timeout: tuple = (10, 60), retries: int = 3, backoff: float = 0.5,
+                 limiter: 'AdaptiveLimiter' = None, encoding: str = 'utf-8'):
+        super().__init__()
+        self.timeout = timeout
+        self.encoding = encoding
+        self.request_hooks = []
+        self.limiter = limiter
+
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'errors': 0, 'retries': 0, 'bytes': 0, 'elapsed': 0.0}
+
+        retry = JitteredRetry(total=retries, connect=retries, read=retries, status=retries, backoff_factor=backoff,
+                              status_forcelist=(500, 502, 503, 504), allowed_methods=frozenset(['GET', 'HEAD']),
+                              raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+        self.headers['Accept-Encoding'] = ACCEPT_ENCODING
+
+    def request(self, method, url, *args, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+
+        if self.limiter:
+            self.limiter.acquire()
+
+        start = time.perf_counter()
+        stats = {'method': method, 'url': url, 'status': None, 'size': 0, 'retries': 0, 'error': None}
+        healthy = False
+        try:
+            r = super().request(method, url, *args, **kwargs)
+        except requests.RequestException as e:
+            stats['error'] = e
+            raise
+        else:
+            history = getattr(getattr(r.raw, 'retries', None), 'history', ())
+            stats.update(status=r.status_code, size=0 if kwargs.get('stream') else len(r.content), retries=len(history))
+            healthy = (not history #the adapter's retries are failed attempts the limiter must hear about
+                       and r.status_code < 500 and not (method == 'GET' and is_login_page(r)))
+            if self.encoding and 'charset' not in r.headers.get('Content-Type', '').lower():
+                r.encoding = self.encoding
+            return r
+        finally:
+            stats['elapsed'] = time.perf_counter() - start
+            if self.limiter:
+                self.limiter.release(stats['elapsed'], healthy)
+            self.__record(stats)
+
+    def __record(self, stats):
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats['errors'] += stats['error'] is not None
+            self._stats['retries'] += stats['retries']
+            self._stats['bytes'] += stats['size']
+            self._stats['elapsed'] += stats['elapsed']
+
+        for hook in self.request_hooks:
+            hook(stats)
+
+    def transport_stats(self):
+        """
+        :return: {'requests', 'errors', 'retries', 'bytes', 'elapsed'} totals of the session
+        """
+        with self._lock:
+            return dict(self._stats)
+
+
+def is_login_page(r):
+    """
+    Server sends the login form instead of the page when the session is dropped or requests are throttled
+    :return: bool
+    """
+    return urlsplit(r.url).path.startswith('/logon') or b'main_login2' in r.content
+
+
+def create_session(PARAMS=None):
+    """
+    Creates TransportSession configured with PARAMS (defaults if None)
+    :return: TransportSession
+    """
+    if PARAMS is None:
+        return TransportSession()
+
+    workers, host_limit = crawl_width(PARAMS)
+    limiter = AdaptiveLimiter(start=max(PARAMS.fetch_threads, PARAMS.host_limit),
+                              max_limit=PARAMS.max_concurrency) if PARAMS.adaptive else None
+
+    return TransportSession(pool_size=max(PARAMS.pool_size, workers, host_limit),
+                            timeout=(PARAMS.connect_timeout, PARAMS.read_timeout),
+                            retries=PARAMS.retries, backoff=PARAMS.backoff, limiter=limiter, encoding=PARAMS.encoding)
+
+
+def session_summary(SESSION):
+    """
+    Describes requests of the session for the label: coalesced requests, network totals and concurrency
+    :return: list of lines
+    """
+    lines = []
+    if hasattr(SESSION, 'stats'):
+        lines.append('Запросы: {requests}, из памяти {memo}, совмещено {shared}, общих разборов {shared_soups}'.format(
+            **SESSION.stats()))
+    if hasattr(SESSION, 'transport_stats'):
+        stats = SESSION.transport_stats()
+        lines.append('Сеть: {} запросов, ошибок {}, повторов {}, {:.1f} МБ за {:.1f} с'.format(
+            stats['requests'], stats['errors'], stats['retries'], stats['bytes'] / 1024 / 1024, stats['elapsed']))
+    if getattr(SESSION, 'limiter', None):
+        lines.append('Одновременных запросов: {limit} (в среднем {average}, максимум {peak}, снижений {cuts})'.format(
+            **SESSION.limiter.summary()))
+
+    return lines
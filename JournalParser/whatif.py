@@ -0,0 +1,99 @@
+"""
+Checks the data kept by the last run with other params, nothing is fetched:
+    python -m JournalParser.whatif profile1.json profile2.json ...
+A profile is a JSON object of params as for execute, login and password aren't needed.
+Every profile's result is written to 'Проверка журналов N.xlsx'
+"""
+
+import sys
+import json
+import argparse
+from JournalParser.params import Params
+from JournalParser.objects import Warnings
+from JournalParser.snapshot import Snapshot
+from JournalParser.batch import create_batch
+from JournalParser.excel import excelify, FILE_NAME
+
+
+def profile_file(number: int):
+    """
+    :return: 'Проверка журналов 1.xlsx' for the first profile etc
+    """
+    name, ext = FILE_NAME.rsplit('.', 1)
+    return f'{name} {number}.{ext}'
+
+
+def reevaluate(profiles: list, pBar=None, label=None):
+    """
+    Checks the data kept by the last run (PARAMS.snapshot) with every params profile, nothing is fetched.
+    Snapshot is walked once, all the profiles are checked on the way. Every profile's result is written to its own file
+    :param profiles: [params dict, ...] as for execute, login and password aren't needed.
+    Grades and terms are the ones of the last run
+    :return: [{grade: {subj_name: [Warnings1t, ...]}} or None if the snapshot lacks data for the profile's checks, ...]
+    """
+    profiles = [Params(profile) for profile in profiles]
+    snapshot = Snapshot.load(profiles[0].snapshot_file) if profiles else None
+    if snapshot is None:
+        if label:
+            label.emit('Нет данных прошлой проверки')
+        return []
+
+    usable = [not snapshot.missing(PARAMS) for PARAMS in profiles]
+    results = [{} if ok else None for ok in usable]
+    batches = [create_batch(PARAMS) if ok else None for PARAMS, ok in zip(profiles, usable)]
+
+    items = snapshot.items()
+    for n, (grade, subj_name, term, teacher, data) in enumerate(items, 1):
+        for PARAMS, result, batch in zip(profiles, results, batches):
+            if result is None:
+                continue
+
+            warns = Warnings.from_data(PARAMS, subj_name, teacher, term, data, batch)
+            result.setdefault(grade, {}).setdefault(subj_name, []).append(warns)
+
+        if pBar:
+            pBar.emit(int(90 * n / len(items)))
+
+    tensor = None
+    for batch in batches:
+        if batch:
+            tensor = batch.evaluate(tensor) #the same data, so the arrays are built once
+
+    for number, (PARAMS, result, ok) in enumerate(zip(profiles, results, usable), 1):
+        if not ok:
+            if label:
+                label.emit(f'Профиль {number}: в сохраненных данных нет нужных для проверки столбцов')
+            continue
+        excelify(result, PARAMS.group_by, profile_file(number))
+
+    if pBar:
+        pBar.emit(100)
+
+    return results
+
+
+def main(argv=None):
+    args = argparse.ArgumentParser(description='Reevaluate the last run with params profiles')
+    args.add_argument('profiles', nargs='+', help='JSON files with params')
+    args = args.parse_args(argv)
+
+    profiles = []
+    for path in args.profiles:
+        with open(path, encoding='utf-8') as inf:
+            profiles.append(json.load(inf))
+
+    class Label:
+        @staticmethod
+        def emit(text):
+            print(text)
+
+    results = reevaluate(profiles, label=Label())
+    for number, (path, result) in enumerate(zip(args.profiles, results), 1):
+        if result is not None:
+            print(f'{path}: {profile_file(number)}')
+
+    return 0 if results else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
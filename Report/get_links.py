@@ -1,10 +1,9 @@
 import re
-from bs4 import BeautifulSoup
+from JournalParser.funcs import get_soup
 from .params import base_url
 
-def get_links(session):
-    r = session.get(base_url + '/school/reports/')
-    html = BeautifulSoup(r.text, 'html.parser')
+def get_links(session, base_url=base_url):
+    html = get_soup(session, base_url + '/school/reports/')
 
     report_links = html.find('div', {'class': 'report_links'}).find_all_next('a', href=True)
 
@@ -18,7 +17,7 @@ def get_links(session):
         val = val.split('?')[0] + '?'
         report_links[key] = val
 
-    year_ids = get_years_ids(url, session)
+    year_ids = get_years_ids(url, session, base_url)
 
     year_ids = {
         'past': year_ids[0],
@@ -27,10 +26,9 @@ def get_links(session):
 
     return report_links, year_ids
 
-def get_years_ids(url, session):
+def get_years_ids(url, session, base_url=base_url):
 
-    r = session.get(base_url + url)
-    html = BeautifulSoup(r.text, 'html.parser')
+    html = get_soup(session, base_url + url)
 
     div = html.find('div', {'class': 'no-print'}).find_all_next('div', {'style': 'float: left; margin-left: 20px'})[-3]
 
@@ -40,16 +38,3 @@ def get_years_ids(url, session):
     this_year_id = re.findall(r'\d+', url)[0]
 
     return past_year_id, this_year_id
-
-def get_years(session):
-    """
-    Fetches this schoolyear eg 2019/2020
-    :return: list: int [year1, year2]
-    """
-    r = session.get('https://edu.tatar.ru/school')
-    html = BeautifulSoup(r.text, 'html.parser')
-
-    h3 = html.find('h3')
-    years = list(map(int, re.findall(r'\d+', h3.text)))
-
-    return years
\ No newline at end of file
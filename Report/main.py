@@ -1,32 +1,37 @@
+from functools import partial
 from JournalParser.edutatarauth import edu_auth
 from JournalParser.params import Params
 from JournalParser.objects import SubjectTables, GlobalsContainer
-from JournalParser.funcs import create_grade_to_link_dict as journal_gtl, get_initial_data
-from Report.get_links import get_links, get_years
-from Report.params import base_url
-from Report.objects import \
-    OverallTable, OverallQualitiesTable, OverallSubjectsTable, SubjectsQualitiesTable, GradePerformanceTable, \
-    StudentsPerformanceTables
-from Report.funcs import fetch_grade
+from JournalParser.funcs import create_grade_to_link_dict as journal_gtl, get_initial_data, get_years
+from Report.get_links import get_links
+from Report.objects import GradePerformanceTable, StudentsPerformanceTables, InfoLetters
 from Report.excel import excelify_oqt, excelify_spt, excelify_sqt, excelify_bst
-from bs4 import BeautifulSoup
+from JournalParser.parser import make_soup, page_markup, configure
+from JournalParser.limiter import crawl_width
+from JournalParser.transport import session_summary
+from Report.scheduler import TaskGraph
+from Report.spec import ReportPlan, report_specs, build_table, pooled_build
+from JournalParser.procpool import create_pool
+from Report.topology import TeacherTopology, parse_teacher_page
 
 
 
 def create_report(params, pBar, label):
 
     PARAMS = Params(params)
+    configure(PARAMS)
+    base_url = PARAMS.base_url
     START_GRADE = PARAMS.class1
     TERM = PARAMS.term1
     label.emit('Входим в аккаунт...')
-    SESSION = edu_auth(PARAMS.login, PARAMS.password)
+    SESSION = edu_auth(PARAMS.login, PARAMS.password, PARAMS)
     label.emit('Успешный вход в аккаунт')
     SESSION.get(base_url)
     label.emit('Сбор нужных данных...')
-    LINKS, YEAR_IDS = get_links(SESSION)
+    LINKS, YEAR_IDS = get_links(SESSION, base_url)
 
 
-    YEARS = list(map(str, get_years(SESSION)))
+    YEARS = list(map(str, get_years(SESSION, base_url)))
 
     globals_cont = GlobalsContainer(SESSION, PARAMS, YEARS)
 
@@ -39,81 +44,42 @@ def create_report(params, pBar, label):
         grades_perf_url = base_url + LINKS['Итоги успеваемости класса за учебный период'] + 'academic_year_id={}'.format(
             YEAR_IDS['this'])
         grades_perf_main_page = SESSION.get(grades_perf_url)
-        grades_perf_main_page = BeautifulSoup(grades_perf_main_page.text, 'html.parser')
+        grades_perf_main_page = make_soup(page_markup(grades_perf_main_page))
         options = grades_perf_main_page.find('select').findChildren()
         ids = [option['value'] for option in options if option.text.endswith(YEARS[0])]
         return ids
 
 
-    def get_grade_and_link(teacher_id, term, crop):
+    def teacher_url(teacher_id):
         """
-        Finds grade number and a link to required table from a page with teacher_id
-        :return: (grade_str, raw_page)
+        :return: url of the page 'Итоги успеваемости класса...' of the teacher's grade
         """
-        URL = base_url + LINKS['Итоги успеваемости класса за учебный период']
-        url = URL + 'worker_id={}'.format(teacher_id)
-        r = SESSION.get(url)
-
-        empty_grade_page = BeautifulSoup(r.text, 'html.parser')
-        div = empty_grade_page.find('div', {'class': 'h'})
-
-        labels = div.find_all('label')
-
-
-        label_texts = [label.nextSibling.strip() for label in labels]
-
-        grade_str = label_texts[-3]
-
-        if crop and (fetch_grade(grade_str) not in range(crop[0], crop[1] + 1)):
-            return
-
-        st_year = label_texts[-4]
-
-        label_texts = label_texts[:-4]
-
-        row_ind = 0
-
-        for i in range(1, len(label_texts), 2):
-            if label_texts[i] == st_year and label_texts[i + 1] == grade_str:
-                row_ind = i
-                break
-
-        grade_row = labels[row_ind]
+        return base_url + LINKS['Итоги успеваемости класса за учебный период'] + 'worker_id={}'.format(teacher_id)
 
-        a = grade_row.find_next('a')
-        required_a_text = '{} полугодие'.format(term // 4 + 1) if grade_str.startswith(
-            ('10', '11')) else '{} четверть'.format(term)
 
-        a_text = a.text.strip()
-        while a_text != required_a_text:
-            try:
-                a = a.find_next('a')
-                a_text = a.text.strip()
-            except AttributeError:
-                print('Не получилось найти ссылку на четверть/полугодие в {} классе'.format(grade_str))
-                print(url)
+    def discover_teacher(teacher_id):
+        """
+        :return: (grade_str, {'1 четверть': href, ...}) of the teacher's grade
+        """
+        return parse_teacher_page(fetch_page(teacher_url(teacher_id)))
 
-        required_journal_link = URL + a['href']
 
-        return grade_str, required_journal_link
+    def fetch_page(url):
+        """
+        :return: response text (html), bytes in raw bytes mode
+        """
+        return page_markup(SESSION.get(url))
 
 
-    def create_grade_to_link_dict(teacher_ids, term, crop=None):
+    def create_grade_to_link_dict(term, crop=None):
         """
-        Creates a sorted dict with required tables' links sorted by grade
-        :param teacher_ids:
+        Creates a sorted dict with required tables' links sorted by grade from the teachers' topology
         :param term: required term's number
         :param crop: arr of needed grades. Default is None (all grades needed)
         :return: dict {grade1: link1, ..., gradeN: linkN}
         """
-        grade_and_link = {}
-        for id_ in teacher_ids:
-            ret = get_grade_and_link(id_, term=term, crop=crop)
-            if ret:
-                grade, link = ret
-                grade_and_link[grade] = link
-        grade_and_link = {grade: link for grade, link in sorted(grade_and_link.items(), key=lambda item: int(item[0][:-1]))}
-        return grade_and_link
+        URL = base_url + LINKS['Итоги успеваемости класса за учебный период']
+        return {grade: URL + href for grade, href in topology.grade_to_link(term, crop).items()}
 
 
     def stringify_params(**kwargs):
@@ -134,7 +100,7 @@ def create_report(params, pBar, label):
         """
         Returns page 'Результативность работы школы за учебный период/год" with given params
         :param kwargs: query params
-        :return: response text (html)
+        :return: response text (html), bytes in raw bytes mode
         """
         url = base_url
         if kwargs.get('academic_year_id', YEAR_IDS['this']) == YEAR_IDS['past']:
@@ -145,14 +111,14 @@ def create_report(params, pBar, label):
         url += stringify_params(**kwargs)
         r = SESSION.get(url)
 
-        return r.text
+        return page_markup(r)
 
 
     def get_overall_subjects_page(**kwargs):
         """
         Returns page 'Результативность работы школы (по предметам) за учебный период/год" with given params
         :param kwargs: query params
-        :return: response text (html)
+        :return: response text (html), bytes in raw bytes mode
         """
         url = base_url
         if kwargs.get('academic_year_id', YEAR_IDS['this']) == YEAR_IDS['past']:
@@ -163,296 +129,93 @@ def create_report(params, pBar, label):
         url += stringify_params(**kwargs)
         r = SESSION.get(url)
 
-        return r.text
+        return page_markup(r)
 
 
-    def check_ovrls(table):
+    def check_ovrls(page):
         """
         Finds students whose overall is less than 3
-        :param html:
+        :param page: JournalPage
         :return: list: [[name1, overall1], ..., [nameN, overallN]]
         """
         w = []
 
-
-        rows = table.find('tbody').find_all('tr')
-
-        for row in rows:
-            cells = row.find_all('td')
+        for name, (avg_m, _) in zip(page.students, page.term_marks):
             try:
-                avg_m = cells[-2].text.strip().replace(',', '.')
+                avg_m = avg_m.replace(',', '.')
                 avg_m = float(avg_m)
 
                 if avg_m < 3:
-                    name = cells[1]
-                    name = ' '.join(w.strip() for w in name.text.split()[:2])
+                    name = ' '.join(w.strip() for w in name.split()[:2])
                     w.append([name, avg_m])
             except (IndexError, ValueError):
                 pass
 
         return w
 
-    """
-    Helpers are above
-    Main funcs are below
-    """
-    #TODO:
-    # simplify funcs below
-
-    def create_report_from_overall_table():
+    def fetch_report_page(page):
         """
-        Creates .xlsx from 'Результативность работы школы за учебный период/год' depending on the term number
-        :return:
+        :param page: spec.Page
+        :return: response text (html), bytes in raw bytes mode
         """
-        if TERM == 1:
-            first_term_overall_page = get_overall_page(academic_year_id=YEAR_IDS['this'], terms_count=4, term_number=1)
-            first_term_overall_table = OverallTable(first_term_overall_page)
-            ft_quals = first_term_overall_table.qualities
-
-            past_year_overall_page = get_overall_page(academic_year_id=YEAR_IDS['past'])
-            past_year_overall_table = OverallTable(past_year_overall_page, past_year=True, crop=[START_GRADE, 8])
-            py_quals = past_year_overall_table.qualities
-
-            quals_table = OverallQualitiesTable(ft_quals, py_quals)
-            quals_table.header = ['Класс', 'Прошлый уч.год, %', '1 четверть, %', 'Динамика, %']
-
-            excelify_oqt(total=(first_term_overall_table, quals_table), pred=(past_year_overall_table,))
-
-        elif TERM == 2:
-            second_term_overall_page_young = get_overall_page(academic_year_id=YEAR_IDS['this'], terms_count=4,
-                                                              term_number=2)
-            second_term_overall_table = OverallTable(second_term_overall_page_young)
-
-            second_term_overall_page_old = get_overall_page(academic_year_id=YEAR_IDS['this'], terms_count=2, term_number=1)
-            second_term_overall_table_old = OverallTable(second_term_overall_page_old)
-
-            second_term_overall_table.merge_tables(second_term_overall_table_old)  # create one table from 6-9 and 10-11
-            st_y_o_quals = second_term_overall_table.qualities
-
-            first_term_overall_page_young = get_overall_page(academic_year_id=YEAR_IDS['this'], terms_count=4,
-                                                             term_number=1)
-            first_term_overall_table = OverallTable(first_term_overall_page_young)
-
-            past_year_overall_page = get_overall_page(academic_year_id=YEAR_IDS['past'])
-            past_year_overall_table_old = OverallTable(past_year_overall_page, crop=[9, 10], past_year=True)
-
-            first_term_overall_table.merge_tables(past_year_overall_table_old)  # merge 1 term 6-9 and past year 10-11 to one table
-            ft_y_o_quals = first_term_overall_table.qualities
-
-            quals_table = OverallQualitiesTable(st_y_o_quals, ft_y_o_quals)
-            quals_table.header = ['Класс', '1 четверть/Прошлый год, %', '2 четверть/1 полугодие, %', 'Динамика, %']
-
-            excelify_oqt(total=(second_term_overall_table, quals_table), term1=(first_term_overall_table,))
-
-        elif TERM == 3:
-
-            t3_page = get_overall_page(academic_year_id=YEAR_IDS['this'], terms_count=4, term_number=3)
-            t3_table = OverallTable(t3_page)
-            t3_quals = t3_table.qualities
-
-            t2_page = get_overall_page(academic_year_id=YEAR_IDS['this'], terms_count=4, term_number=2)
-            t2_table = OverallTable(t2_page)
-            t2_quals = t2_table.qualities
-
-            t1_page = get_overall_page(academic_year_id=YEAR_IDS['this'], terms_count=4, term_number=1)
-            t1_table = OverallTable(t1_page)
-            t1_quals = t1_table.qualities
-
-            quals_table = OverallQualitiesTable(t3_quals, t2_quals, t1_quals)
-            quals_table.header = ['Класс', '1 четверть, %', '2 четверть, %', '3 четверть, %', 'Динамика, %']
-
-            excelify_oqt(total=(t3_table, quals_table), term2=(t2_table,), term1=(t1_table,))
-
-        else:
-            t4_page_y = get_overall_page(academic_year_id=YEAR_IDS['this'], terms_count=4, term_number=4)
-            t4_table = OverallTable(t4_page_y)
-
-            t4_page_o = get_overall_page(academic_year_id=YEAR_IDS['this'], terms_count=2, term_number=2)
-            t4_table.merge_tables(OverallTable(t4_page_o))
-            t4_quals = t4_table.qualities
-
-            t3_page = get_overall_page(academic_year_id=YEAR_IDS['this'], terms_count=4, term_number=3)
-            t3_table = OverallTable(t3_page)
-            t3_quals = t3_table.qualities
-
-            t2_page_y = get_overall_page(academic_year_id=YEAR_IDS['this'], terms_count=4, term_number=2)
-            t2_table = OverallTable(t2_page_y)
-
-            t2_page_o = get_overall_page(academic_year_id=YEAR_IDS['this'], terms_count=2, term_number=1)
-            t2_table.merge_tables(OverallTable(t2_page_o))
-            t2_quals = t2_table.qualities
-
-            t1_page = get_overall_page(academic_year_id=YEAR_IDS['this'], terms_count=4, term_number=1)
-            t1_table = OverallTable(t1_page)
-            t1_quals = t1_table.qualities
+        query = {'academic_year_id': YEAR_IDS[page.year]}
+        if page.terms_count:
+            query.update(terms_count=page.terms_count, term_number=page.term_number)
 
-            quals_table = OverallQualitiesTable(t4_quals, t3_quals, t2_quals, t1_quals)
-            quals_table.header = ['Класс', '1 четверть, %', '2 четверть, %', '3 четверть, %', '4 четверть, %', 'Динамика, %']
+        get_page = get_overall_page if page.kind == 'overall' else get_overall_subjects_page
+        return get_page(**query)
 
-            excelify_oqt(total=(t4_table, quals_table), term3=(t3_table,), term2=(t2_table,), term1=(t1_table,))
-
-    def create_report_from_overall_subj_table():
-        """
-        Creates .xlsx from 'Результативность работы школы (по предметам) за учебный период/год'
-        :return:
-        """
-        if TERM == 1:
-            first_term_page = get_overall_subjects_page(academic_year_id=YEAR_IDS['this'], terms_count=4, term_number=1)
-            first_term_table_young = OverallSubjectsTable(first_term_page)
-            ft_quals = first_term_table_young.qualities
-
-            prev_year_page = get_overall_subjects_page(academic_year_id=YEAR_IDS['past'])
-            prev_year_table = OverallSubjectsTable(prev_year_page, crop=[START_GRADE, 8], past_year=True)
-            py_quals = prev_year_table.qualities
-
-            qualities = SubjectsQualitiesTable(ft_quals, py_quals)
-            qualities.header = ['Класс', 'Прошлый год', '1 четверть', 'Динамика']
-
-            excelify_sqt(po_predm=(first_term_table_young, qualities), pred=(prev_year_table,))
-
-        elif TERM == 2:
-            second_term_page_young = get_overall_subjects_page(academic_year_id=YEAR_IDS['this'], terms_count=4, term_number=2)
-            second_term_table_young = OverallSubjectsTable(second_term_page_young)
-
-            second_term_page_old = get_overall_subjects_page(academic_year_id=YEAR_IDS['this'], terms_count=2, term_number=1)
-            second_term_table_old = OverallSubjectsTable(second_term_page_old)
-            second_term_table_young.merge_tables(second_term_table_old)
-            st_quals = second_term_table_young.qualities
-
-            first_term_page_young = get_overall_subjects_page(academic_year_id=YEAR_IDS['this'], terms_count=4, term_number=1)
-            first_term_table_young = OverallSubjectsTable(first_term_page_young)
-
-            prev_year_page_old = get_overall_subjects_page(academic_year_id=YEAR_IDS['past'])
-            prev_year_table_old = OverallSubjectsTable(prev_year_page_old, crop=[9, 10], past_year=True)
-            first_term_table_young.merge_tables(prev_year_table_old)
-            ft_quals = first_term_table_young.qualities
-
-            qualities = SubjectsQualitiesTable(st_quals, ft_quals)
-            qualities.header = ['Класс', '1 четверть', '2 четверть', 'Динамика']
-
-            excelify_sqt(po_predm=(second_term_table_young, qualities), pred=(first_term_table_young,))
-
-
-        elif TERM == 3:
-            t1_page = get_overall_subjects_page(academic_year_id=YEAR_IDS['this'], terms_count=4, term_number=1)
-            t1_table = OverallSubjectsTable(t1_page)
-            t1_quals = t1_table.qualities
-
-            t2_page = get_overall_subjects_page(academic_year_id=YEAR_IDS['this'], terms_count=4, term_number=2)
-            t2_table = OverallSubjectsTable(t2_page)
-            t2_quals = t2_table.qualities
-
-            t3_page = get_overall_subjects_page(academic_year_id=YEAR_IDS['this'], terms_count=4, term_number=3)
-            t3_table = OverallSubjectsTable(t3_page)
-            t3_quals = t2_table.qualities
-
-            qualities = SubjectsQualitiesTable(t3_quals, t2_quals, t1_quals)
-            qualities.header = ['Класс', '1 четверть', '2 четверть', '3 четверть', 'Динамика']
-
-            excelify_sqt(po_predm=(t3_table, qualities), term2=(t2_table,), term1=(t1_table,))
-
-
-        else:
-            t1_page = get_overall_subjects_page(academic_year_id=YEAR_IDS['this'], terms_count=4, term_number=1)
-            t1_table = OverallSubjectsTable(t1_page)
-            t1_quals = t1_table.qualities
-
-            t2_page_y = get_overall_subjects_page(academic_year_id=YEAR_IDS['this'], terms_count=4, term_number=2)
-            t2_table = OverallSubjectsTable(t2_page_y)
-            t2_page_o = get_overall_subjects_page(academic_year_id=YEAR_IDS['this'], terms_count=2, term_number=1)
-            t2_table.merge_tables(OverallSubjectsTable(t2_page_o))
-            t2_quals = t2_table.qualities
-
-            t3_page = get_overall_subjects_page(academic_year_id=YEAR_IDS['this'], terms_count=4, term_number=3)
-            t3_table = OverallSubjectsTable(t3_page)
-            t3_quals = t2_table.qualities
-
-            t4_page_y = get_overall_subjects_page(academic_year_id=YEAR_IDS['this'], terms_count=4, term_number=2)
-            t4_table = OverallSubjectsTable(t4_page_y)
-            t4_page_o = get_overall_subjects_page(academic_year_id=YEAR_IDS['this'], terms_count=2, term_number=2)
-            t4_table.merge_tables(OverallSubjectsTable(t4_page_o))
-
-            t4_quals = t4_table.qualities
-
-            qualities = SubjectsQualitiesTable(t4_quals, t3_quals, t2_quals, t1_quals)
-            qualities.header = ['Класс', '1 четверть', '2 четверть', '3 четверть', '4 четверть', 'Динамика']
-
-            excelify_sqt(po_predm=(t4_table, qualities), term3=(t3_table,), term2=(t2_table,), term1=(t1_table,))
+    """
+    Helpers are above
+    Main funcs are below
+    """
 
-    def create_report_from_grade_overall():
+    def create_report_from_grade_overall(spec):
         """
-        Creates .xlsx from 'Итоги успеваемости класса за учебный период'
+        Plans pages, tables and .xlsx of 'Итоги успеваемости класса за учебный период'.
+        Grades' links are known after the teachers' pages are fetched, so their nodes are added on the way.
+        If the kept topology hasn't expired, only the teachers lacking a needed term's link are discovered again
+        :param spec: GradesSpec
         :return:
         """
-        teacher_ids = get_teachers_ids()
-
-        if TERM == 1:
-            gr_to_link = create_grade_to_link_dict(teacher_ids, term=1, crop=[START_GRADE, 9])
-            data = {grade: GradePerformanceTable(SESSION, SESSION.get(link).text) for grade, link in gr_to_link.items()}
-            tables = StudentsPerformanceTables(data)
-            tables.header_for_exc = ['Класс', '1 четверть']
-            tables.header_for_count = ['Класс', '1 четверть']
-
-            excelify_spt(tables)
-
-        elif TERM == 2:
-
-            second_term_gr_to_link = create_grade_to_link_dict(teacher_ids, term=2)
-
-            st_data = {grade: GradePerformanceTable(SESSION, SESSION.get(link).text) for grade, link in second_term_gr_to_link.items()}
-
-            first_term_gr_to_link = create_grade_to_link_dict(teacher_ids, term=1, crop=[START_GRADE, 9])
+        def add_teacher_pages(teacher_ids, known=None):
+            nodes = [plan.node(('teacher page', id_), partial(discover_teacher, id_)) for id_ in teacher_ids]
 
-            ft_data = {grade: GradePerformanceTable(SESSION, SESSION.get(link).text) for grade, link in first_term_gr_to_link.items()}
+            def discovered(*teachers):
+                topology.update({**(known or {}), **dict(zip(teacher_ids, teachers))})
+                add_grade_tables()
 
-            tables = StudentsPerformanceTables(st_data, ft_data)
+            plan.node('grade links', discovered, *nodes)
 
-            tables.header_for_exc = ['Класс', '1 четверть', '', '2 четверть', '']
-            tables.header_for_count = ['Класс', '1 четверть', '2 четверть', 'Динамика']
+        def add_grade_tables():
+            nodes = [] #[(term's position, grade, table node), ...]
+            for n, (term, crop) in enumerate(spec.terms):
+                for grade, link in create_grade_to_link_dict(term=term, crop=crop).items():
+                    page = plan.node(('grade page', link), partial(fetch_page, link))
+                    nodes.append((n, grade, plan.node(('grade', link), partial(GradePerformanceTable, SESSION, letters=letters, base_url=base_url), page)))
 
-            excelify_spt(tables)
+            def write(*grade_tables):
+                data = [{} for _ in spec.terms] #{grade: GradePerformanceTable} of every term, newer first
+                for (n, grade, _), table in zip(nodes, grade_tables):
+                    data[n][grade] = table
 
-        elif TERM == 3:
-            t3_gr_to_link = create_grade_to_link_dict(teacher_ids, term=3, crop=[START_GRADE, 9])
-            t3_data = {grade: GradePerformanceTable(SESSION, SESSION.get(link).text) for grade, link in t3_gr_to_link.items()}
+                tables = StudentsPerformanceTables(*data)
+                tables.header_for_exc = spec.header_for_exc
+                tables.header_for_count = spec.header_for_count
 
-            second_term_gr_to_link = create_grade_to_link_dict(teacher_ids, term=2, crop=[START_GRADE, 9])
+                excelify_spt(tables)
 
-            t2_data = {grade: GradePerformanceTable(SESSION, SESSION.get(link).text) for grade, link in second_term_gr_to_link.items()}
-
-            first_term_gr_to_link = create_grade_to_link_dict(teacher_ids, term=1, crop=[START_GRADE, 9])
-
-            t1_data = {grade: GradePerformanceTable(SESSION, SESSION.get(link).text) for grade, link in first_term_gr_to_link.items()}
-
-            tables = StudentsPerformanceTables(t3_data, t2_data, t1_data)
-            tables.header_for_exc = ['Класс', '1 четверть', '', '2 четверть', '', '3 четверть', '']
-            tables.header_for_count = ['Класс', '1 четверть', '2 четверть', '3 четверть', 'Динамика']
-
-            excelify_spt(tables)
+            plan.node(('report', 'grades'), write, *(node for _, _, node in nodes))
 
+        if topology.fresh:
+            missing = topology.missing(spec.terms)
+            if missing:
+                add_teacher_pages(missing, topology.teachers)
+            else:
+                add_grade_tables()
         else:
-            t4_gr_to_link = create_grade_to_link_dict(teacher_ids, term=4)
-            t4_data = {grade: GradePerformanceTable(SESSION, SESSION.get(link).text) for grade, link in t4_gr_to_link.items()}
-
-            t3_gr_to_link = create_grade_to_link_dict(teacher_ids, term=3, crop=[START_GRADE, 9])
-            t3_data = {grade: GradePerformanceTable(SESSION, SESSION.get(link).text) for grade, link in
-                       t3_gr_to_link.items()}
-
-            second_term_gr_to_link = create_grade_to_link_dict(teacher_ids, term=2)
-
-            t2_data = {grade: GradePerformanceTable(SESSION, SESSION.get(link).text) for grade, link in
-                       second_term_gr_to_link.items()}
-
-            first_term_gr_to_link = create_grade_to_link_dict(teacher_ids, term=1, crop=[START_GRADE, 9])
-
-            t1_data = {grade: GradePerformanceTable(SESSION, SESSION.get(link).text) for grade, link in
-                       first_term_gr_to_link.items()}
-
-            tables = StudentsPerformanceTables(t4_data, t3_data, t2_data, t1_data)
-            tables.header_for_exc = ['Класс', '1 четверть', '', '2 четверть', '', '3 четверть', '', '4 четверть', '']
-            tables.header_for_count = ['Класс', '1 четверть', '2 четверть', '3 четверть', '4 четверть', 'Динамика']
-
-            excelify_spt(tables)
+            plan.node('teachers', get_teachers_ids)
+            plan.node('teacher pages', add_teacher_pages, 'teachers')
 
     def find_bad_students():
         journal_grade_to_link = journal_gtl(SESSION, PARAMS)
@@ -469,25 +232,46 @@ def create_report(params, pBar, label):
                     teacher = table.teacher
 
                     if table.raw_pages:
-                        html_table = table.raw_pages[0]
-                        ws = check_ovrls(html_table)
+                        ws = check_ovrls(table.raw_pages[0])
 
                         for w in ws:
                             warns.append([grade, *w, subj_name, teacher]) #[Класс, ФИО, балл, предмет, учитель]
 
+        if globals_cont.PLANNER:
+            globals_cont.PLANNER.save()
+
         excelify_bst(warns)
 
 
-    label.emit('Результативность работы школы за уч. период')
-    create_report_from_overall_table()
-    pBar.emit(25)
-    label.emit('Результативность работы школы (по предм.) за уч. период')
-    create_report_from_overall_subj_table()
-    pBar.emit(50)
-    label.emit('Отчеты кл. руководителей за уч. период')
-    create_report_from_grade_overall()
+    progress = 0
+
+    def show_progress(done, total):
+        nonlocal progress
+        value = int(75 * done / total)
+        if value > progress: #total grows while grades' nodes are added
+            progress = value
+            pBar.emit(value)
+
+    graph = TaskGraph(crawl_width(PARAMS)[0], show_progress)
+    pool = create_pool(PARAMS) if PARAMS.process_pool else None #report pages are parsed in worker processes
+    plan = ReportPlan(graph, fetch_report_page, pooled_build(pool, PARAMS) if pool else build_table)
+    letters = InfoLetters(SESSION, globals_cont.FETCHER)
+    topology = TeacherTopology(PARAMS)
+    overall_spec, subjects_spec, grades_spec = report_specs(TERM, START_GRADE)
+
+    label.emit('Результативность работы школы и отчеты кл. руководителей за уч. период')
+    plan.report(overall_spec, excelify_oqt)
+    plan.report(subjects_spec, excelify_sqt)
+    create_report_from_grade_overall(grades_spec)
+    try:
+        graph.run()
+    finally:
+        if pool:
+            pool.shutdown()
     pBar.emit(75)
     label.emit('Ученики со средним баллом <3')
     find_bad_students()
+    for line in session_summary(SESSION):
+        label.emit(line)
     pBar.emit(100)
     label.emit('Завершено!')
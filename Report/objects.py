@@ -1,17 +1,24 @@
+import threading
 from abc import ABC, abstractmethod
-from bs4 import BeautifulSoup
+from JournalParser.parser import make_soup, page_markup
 from .funcs import fetch_grade
-import locale
-
-locale.setlocale(locale.LC_ALL, '')
+from .params import base_url
 
 
 class Table(ABC):
     """
-    A template for the future tables
+    A template for the future tables. The page is parsed only if it's given, tables made from other tables don't have one
     """
-    def __init__(self, raw_page):
-        self.raw_page = BeautifulSoup(raw_page, 'html.parser')
+    def __init__(self, raw_page=None):
+        self.raw_page = make_soup(raw_page) if raw_page else None
+        self._table = None
+
+    def release(self):
+        """
+        Drops parsed page when all the data is extracted. Table becomes small and picklable
+        """
+        self.raw_page = None
+        self._table = None
 
     @staticmethod
     def extract_data(data: str):
@@ -55,20 +62,91 @@ class Table(ABC):
         return NotImplementedError('Table must have a header')
 
 
-class OverallTable(Table):
+class Columns:
     """
-    Table 'Результаты работы школы за учебный период/год'.
+    Rows of a table kept by columns. The first column holds grades, index maps a grade to its first row,
+    names (subjects) are indexed the same way. Rows of different lengths are kept as they are
     """
-    def __init__(self, raw_page: str, crop: list = None, past_year: bool = False):
+    def __init__(self, rows: list, names: list = ()):
+        self.widths = [len(row) for row in rows]
+        self.columns = [[row[i] if i < len(row) else None for row in rows] for i in range(max(self.widths, default=0))]
+        self.index = {}
+        for i, grade in enumerate(self.grades):
+            self.index.setdefault(grade, i)
+
+        self.names = list(names)
+        self.name_index = {}
+        for i, name in enumerate(self.names):
+            self.name_index.setdefault(name, i)
+
+    def __len__(self):
+        return len(self.widths)
+
+    @property
+    def grades(self):
+        return self.columns[0] if self.columns else []
+
+    def value(self, row: int, column: int):
+        """
+        :return: cell of the row. IndexError if the row is shorter
+        """
+        if column >= self.widths[row]:
+            raise IndexError('Row {} has no column {}'.format(row, column))
+        return self.columns[column][row]
+
+    def rows(self):
+        """
+        :return: [[cell, ...], ...] as the rows were given
+        """
+        return [[column[i] for column in self.columns[:width]] for i, width in enumerate(self.widths)]
+
+
+class ColumnTable(Table):
+    """
+    Core of the tables read from report pages. The page is read once in the constructor into Columns of values
+    typed with extract_data, then its DOM is dropped. data, grades and qualities are computed when they're needed.
+    Merged tables are kept as they are and their rows follow this table's ones
+    """
+    def __init__(self, raw_page, crop: list = None, past_year: bool = False):
         super().__init__(raw_page)
-        self._table = self.raw_page.find('table')
         self.crop = crop
         self.past_year = past_year
 
-        self._header = self.__get_header()
-        self._data = self.__get_data()
-        self._grades = self.__get_grades()
-        self._qualities = self.__get_qualities()
+        self._table = self._find_table()
+        self._header = self._read_header()
+        rows = self._read_rows()
+        if self.past_year: #increment grade from the past year
+            for row in rows:
+                row[0] = self.increment_grade(row[0])
+        self._columns = Columns(rows, self._header[1:])
+        self._merged = []
+        self.release()
+
+        self._data = self._grades = self._qualities = None
+
+    @abstractmethod
+    def _find_table(self):
+        """
+        :return: <table> of the page
+        """
+
+    @abstractmethod
+    def _read_header(self):
+        """
+        :return: list of column names
+        """
+
+    @abstractmethod
+    def _read_rows(self):
+        """
+        :return: [[grade, val1, ..., valN], ...]
+        """
+
+    @abstractmethod
+    def _own_qualities(self):
+        """
+        :return: qualities of this table's rows
+        """
 
     @property
     def header(self):
@@ -76,18 +154,51 @@ class OverallTable(Table):
 
     @property
     def data(self):
+        """
+        Numeric matrix, merged tables' rows follow this table's ones
+        :return: [[grade1, val1, val2, ..., valN], ..., [gradeN, ..., valN]]
+        """
+        if self._data is None:
+            self._data = self._columns.rows()
+            for table in self._merged:
+                self._data += table.data
         return self._data
 
-    @property
-    def grades(self):
-        return self._grades
-
     @property
     def qualities(self):
+        if self._qualities is None:
+            self._qualities = self._own_qualities()
+            for table in self._merged:
+                self._update_qualities(table)
         return self._qualities
 
+    @abstractmethod
+    def _update_qualities(self, table: 'ColumnTable'):
+        """
+        Adds qualities of the merged table
+        """
 
-    def __get_header(self):
+    def merge_tables(self, *tables: 'ColumnTable'):
+        """
+        Extends this table with other tables of the same class. E.g. if you need to merge 6-9 and 10-11 tables
+        """
+        for table in tables:
+            if not isinstance(table, type(self)):
+                raise TypeError('Table {} must be {} instance, got {}'.format(tables.index(table), type(self).__name__,
+                                                                             type(table)))
+            self._merged.append(table)
+
+        self._data = self._grades = self._qualities = None
+
+
+class OverallTable(ColumnTable):
+    """
+    Table 'Результаты работы школы за учебный период/год'.
+    """
+    def _find_table(self):
+        return self.raw_page.find('table')
+
+    def _read_header(self):
         """
         Gets table header from <thead>
         :return: list of column names
@@ -97,8 +208,7 @@ class OverallTable(Table):
 
         return head
 
-
-    def __get_data(self):
+    def _read_rows(self):
         """
         Returns numeric matrix with grades column slicing the last row
         :return: [[grade1, val1, val2, ..., valN], ..., [gradeN, ..., valN]]
@@ -137,69 +247,52 @@ class OverallTable(Table):
                 del data_row[2]
                 data_table.append(data_row)
 
-        if self.past_year: #increment grade from the past year
-            for row in data_table:
-                row[0] = self.increment_grade(row[0])
-
         return data_table
 
+    @staticmethod
+    def __is_grade(grade_string):
+        return grade_string.startswith(('1', '2', '3', '4', '5', '6', '7', '8', '9')) and len(grade_string) in (2, 3)
 
-    def __get_grades(self):
+    @property
+    def grades(self):
         """
         Collects grades str
         :return: [grade1, grade2, ..., gradeN]
         """
-        grades = []
-        for row in self.data:
-            grade_string = row[0]
-            if grade_string.startswith(('1', '2', '3', '4', '5', '6', '7', '8', '9')) and len(grade_string) in (2, 3):
-                grades.append(grade_string)
-        return grades
-
+        if self._grades is None:
+            self._grades = [grade for grade in self._columns.grades if self.__is_grade(grade)]
+            for table in self._merged:
+                self._grades += table.grades
+        return self._grades
 
-    def __get_qualities(self):
+    def _own_qualities(self):
         """
         Makes a dict -> grade: [qual]
         :return: {grade1: [qual1], ..., gradeN: [qualN]}
         """
+        columns = self._columns
+        return {grade: [columns.value(i, 3)] for i, grade in enumerate(columns.grades) if self.__is_grade(grade)}
 
-        grades, data = self.grades, self.data
-        cleaned_data = [[row[3]] for row in data if row[0] in grades]
-
-        quals = dict(zip(grades, cleaned_data))
-
-        return quals
-
-    def merge_tables(self, *tables: 'OverallTable'):
-        """
-        Extends this table adding other OverallTable's data and qualities to this table's fields.
-        *tables must be OverallTable instances. E.g. if you need to merge 6-9 and 10-11 OverallTables.
-        """
-        for table in tables:
-            if isinstance(table, OverallTable):
-                self._data += table.data
-                self._qualities.update(table.qualities)
-                self._grades += table.grades
-            else:
-                raise TypeError('Table {} must be OverallTable instance, got {}'.format(tables.index(table), type(table)))
+    def _update_qualities(self, table: 'OverallTable'):
+        self._qualities.update(table.qualities)
 
 
 class OverallQualitiesTable(Table):
     """
     Creates qualities table from Overall tables. Dicts are to be placed from newer to older
     """
-    def __init__(self, *dicts: dict, raw_page=''):
+    def __init__(self, *dicts: dict, raw_page=None):
         super().__init__(raw_page)
         self.dicts = dicts
-        self._data = self.__create_quals_table()
+        self._columns = Columns(self.__create_quals_table())
         self._header = []
 
     def __create_quals_table(self):
         """
-        Creates table of qualities from several qualities dicts.
+        Creates table of qualities from several qualities dicts. The dicts aren't changed
         :return [grade, qualN-k-1, qualN-k, ..., qualN]. Quals are sorted from older to newer
         """
-        super_dict = self.dicts[0] #set last term's quals as super
+        super_dict = {grade: list(quals) for grade, quals in self.dicts[0].items()} #set last term's quals as super
 
         for d in self.dicts[1:]:
             for key in super_dict.keys():
@@ -217,7 +310,7 @@ class OverallQualitiesTable(Table):
 
     @property
     def data(self):
-        return self._data
+        return self._columns.rows()
 
     @property
     def header(self):
@@ -232,20 +325,14 @@ class OverallQualitiesTable(Table):
         self._header = []
 
 
-class OverallSubjectsTable(Table):
-    def __init__(self, raw_page, crop=None, past_year=False):
-        super().__init__(raw_page)
-        self._table = self.raw_page.find('table', {'class': 'table no-print'})
-        self.crop = crop
-        self.past_year = past_year
-
-        self._header = self.__get_header()
-        self._subjects = self.__get_subjects()
-        self._data = self.__get_data()
-        self._grades = self.__get_grades()
-        self._qualities = self.__get_qualities()
+class OverallSubjectsTable(ColumnTable):
+    """
+    Table 'Результаты работы школы (по предметам) за учебный период/год'. Subjects are indexed by the Columns
+    """
+    def _find_table(self):
+        return self.raw_page.find('table', {'class': 'table no-print'})
 
-    def __get_header(self):
+    def _read_header(self):
         """
         Collects table header
         :return: ['', subj1, ..., subjN]
@@ -253,14 +340,7 @@ class OverallSubjectsTable(Table):
         head = [td.text.strip() for td in self._table.find('thead').find('tr').findChildren()]
         return head
 
-    def __get_subjects(self):
-        """
-        Collects array of subjects' names
-        :return: [subj1, subj2, ..., subjN]
-        """
-        return self._header[1:]
-
-    def __get_data(self):
+    def _read_rows(self):
         """
         Makes a python-matrix from the html-table as you see it on a web-page, excluding academic performance column, which is not needed
         :return: [[grade1, qual1, ..., qualN], ..., [gradeN, qual1, ..., qualN]]
@@ -285,65 +365,40 @@ class OverallSubjectsTable(Table):
             else:
                 data_table.append(self.row_handler(cells))
 
-        if self.past_year:  # increment grade from the past year
-            for row in data_table:
-                row[0] = self.increment_grade(row[0])
-
         return data_table
 
-    def __get_grades(self):
+    @property
+    def subjects(self):
+        """
+        Collects array of subjects' names
+        :return: [subj1, subj2, ..., subjN]
+        """
+        return self._columns.names
+
+    @property
+    def grades(self):
         """
         Collects array of grades' strings
         :return: [grade1, ..., gradeN]
         """
+        if self._grades is None:
+            self._grades = list(self._columns.grades)
+            for table in self._merged:
+                self._grades += table.grades
+        return self._grades
 
-        grades = [row[0] for row in self.data]
-        return grades
-
-    def __get_qualities(self):
+    def _own_qualities(self):
         """
         Collects grade and quality dict for each subject
         :return: {subj1: {grade1: [qual], ..., gradeN: [qual]}, ..., subjN: {grade1: [qual], ..., gradeN: [qual]}}
         """
-        quals = {subj: {grade: [self.data[self.grades.index(grade)][self.subjects.index(subj) + 1]] for grade in self.grades} for subj in self.subjects}
-        return quals
+        columns = self._columns
+        return {subj: {grade: [columns.value(row, column + 1)] for grade, row in columns.index.items()}
+                for subj, column in columns.name_index.items()}
 
-    @property
-    def header(self):
-        return self._header
-
-    @property
-    def subjects(self):
-        return self._subjects
-
-    @property
-    def data(self):
-        return self._data
-
-    @property
-    def qualities(self):
-        return self._qualities
-
-    @property
-    def grades(self):
-        return self._grades
-
-    def merge_tables(self, *tables: 'OverallSubjectsTable'):
-        """
-        Extends this table appending grades and qualities from *tables. *tables must be OverallSubjectsTable instances.
-        E.g. if you need to merge 6-9 and 10-11 OverallSubjectsTables.
-        :param tables: OverallSubjectsTable
-        :return: None
-        """
-        for table in tables:
-            if isinstance(table, OverallSubjectsTable):
-                self._data += table.data
-                self._grades += table.grades
-                for key in self._qualities.keys():
-                    self._qualities[key].update(table.qualities.get(key, {}))
-            else:
-                raise TypeError(
-                    'Table {} must be OverallSubjectsTable instance, got {}'.format(tables.index(table), type(table)))
+    def _update_qualities(self, table: 'OverallSubjectsTable'):
+        for key in self._qualities.keys():
+            self._qualities[key].update(table.qualities.get(key, {}))
 
     def row_handler(self, cells):
         data_row = [cells[0].text]
@@ -359,19 +414,20 @@ class SubjectsQualitiesTable(Table):
     Quality dicts are to be placed from newer to older
     """
 
-    def __init__(self, *dicts: dict, raw_page=''):
+    def __init__(self, *dicts: dict, raw_page=None):
         super().__init__(raw_page)
         self.dicts = dicts
-        self._data = self.__create_quals_table()
+        self._columns = self.__create_quals_table()
         self._header = []
 
 
     def __create_quals_table(self):
         """
-        Creates more complex qualities table from given qualities dicts.
-        :return: {subj1: [[grade1, prev2, prev1, ..., this], ..., [gradeN, prev2, ..., this]], ..., subjN: [[],..., []]}
+        Creates more complex qualities table from given qualities dicts. The dicts aren't changed
+        :return: {subj1: Columns of [[grade1, prev2, prev1, ..., this], ..., [gradeN, prev2, ..., this]], ..., subjN: ...}
         """
-        super_dict = self.dicts[0] #take the newest dict as main
+        super_dict = {subj: {grade: list(quals) for grade, quals in grades.items()}
+                      for subj, grades in self.dicts[0].items()} #take the newest dict as main
 
         for dict in self.dicts[1:]:
             for subj in super_dict.keys():
@@ -390,13 +446,16 @@ class SubjectsQualitiesTable(Table):
                 except TypeError:
                     grade_row.append('н/д')
                 subj_table.append(grade_row)
-            data_dict[subj] = subj_table
+            data_dict[subj] = Columns(subj_table)
 
         return data_dict
 
     @property
     def data(self):
-        return self._data
+        """
+        :return: {subj1: [[grade1, prev2, prev1, ..., this], ..., [gradeN, prev2, ..., this]], ..., subjN: [[],..., []]}
+        """
+        return {subj: columns.rows() for subj, columns in self._columns.items()}
 
     @property
     def header(self):
@@ -411,15 +470,79 @@ class SubjectsQualitiesTable(Table):
         self._header = []
 
 
+class InfoLetters:
+    """
+    Students' info letters, pages of 'ПР' links in 'Итоги успеваемости класса...'.
+    Every letter is fetched and parsed once, averages of all its subjects are kept by the letter's link
+    """
+    def __init__(self, SESSION, FETCHER: 'Fetcher' = None):
+        """
+        :param FETCHER: fetches the letters of prefetch concurrently. Letters are fetched one by one if it's None
+        """
+        self._SESSION = SESSION
+        self._FETCHER = FETCHER
+        self._lock = threading.Lock()
+        self._avgs = {} #link: [avg of the subject's row, ...]
+
+    def prefetch(self, links):
+        """
+        Fetches the letters that aren't cached yet
+        """
+        with self._lock:
+            misses = list(dict.fromkeys(link for link in links if link not in self._avgs))
+        if not misses:
+            return
+
+        if self._FETCHER:
+            pages = self._FETCHER.fetch(misses)
+        else:
+            pages = [page_markup(self._SESSION.get(link)) for link in misses]
+
+        avgs = [self.__parse(page) for page in pages]
+        with self._lock:
+            self._avgs.update(zip(misses, avgs))
+
+    def avg(self, link, index):
+        """
+        :param index: subject's row in the letter
+        :return: avg_mark: str
+        """
+        self.prefetch([link])
+        with self._lock:
+            return self._avgs[link][index]
+
+    @staticmethod
+    def __parse(page):
+        """
+        :return: [avg_mark of every subject's row]
+        """
+        info_letter_page = make_soup(page, 'info_letter')
+        rows = info_letter_page.find('table').find('tbody').find_all('tr')
+
+        return [InfoLetters.__row_avg(row) for row in rows]
+
+    @staticmethod
+    def __row_avg(row):
+        cells = row.find_all('td')
+        return cells[6].text.strip() if len(cells) > 6 else None
+
+
 class GradePerformanceTable(Table):
-    def __init__(self, SESSION, raw_page):
+    def __init__(self, SESSION, raw_page, letters: InfoLetters = None, base_url: str = base_url):
+        """
+        :param letters: InfoLetters shared by the report's tables. Table has its own if it's not given
+        :param base_url: site the students' links lead to
+        """
         super().__init__(raw_page)
         self._SESSION = SESSION
+        self._base_url = base_url
+        self._letters = letters or InfoLetters(SESSION)
         self._table = self.raw_page.find('table')
         self._header = self.__get_header()
         self._subjects = self.__get_subjects()
         self._data = self.__handle_table_data()
         self._excellents, self._one_fours, self._two_fours, self._one_threes, self._two_threes = self._data
+        self.release()
 
     def __get_header(self):
         """
@@ -438,8 +561,8 @@ class GradePerformanceTable(Table):
 
     def __handle_table_data(self):
         """
-        Extracts data from the table
-        :return: tuple of lists: (excellent, one_four, two_fours, one_three)
+        Extracts data from the table. Info letters of all the students with 4s or 3s are fetched at once
+        :return: tuple of lists: (excellent, one_four, two_fours, one_three, two_threes)
         """
         table_rows = self._table.find('tbody').find_all('tr')
 
@@ -448,6 +571,7 @@ class GradePerformanceTable(Table):
         two_fours = []
         one_three = []
         two_threes = []
+        pending = [] #(list, name, subjects' indexes, link) waiting for the info letters
         for row in table_rows:
             cells = row.find_all('td')[1:] #remove row number
             cells[1:] = [td.text.strip() for td in cells[1:]] #leave 1st cell unchanged
@@ -456,72 +580,36 @@ class GradePerformanceTable(Table):
             if avg == '5':
                 name, _ = self.__prettify_name(name)
                 excellent.append(name)
+                continue
 
-            elif term_marks.count('3') == 0:
-
-                if term_marks.count('4') == 1:
-                    index = term_marks.index('4')
-                    subj = self.subjects[index]
-                    name, link = self.__prettify_name(name)
-                    this_avg = self.__get_avg(index, link)
-                    one_four.append((name, subj, this_avg))
-
-                elif term_marks.count('4') == 2:
-                    subjs = []
-                    indexes = []
-                    for i in range(len(term_marks)):
-                        c = 0
-                        if term_marks[i] == '4':
-                            indexes.append(i)
-                            subjs.append(self.subjects[i])
-                            c += 1
-
-                        if c == 2:
-                            break
-
-                    subj_string = '\n'.join(subjs)
-                    name, link = self.__prettify_name(name)
-                    this_avgs = [self.__get_avg(index, link) for index in indexes]
-                    avgs_string = '\n'.join(this_avgs)
-                    two_fours.append((name, subj_string, avgs_string))
-
-            elif term_marks.count('3') == 1:
-                index = term_marks.index('3')
-                subj = self.subjects[index]
-                name, link = self.__prettify_name(name)
-                this_avg = self.__get_avg(index, link)
-                one_three.append((name, subj, this_avg))
-
-            elif term_marks.count('3') == 2:
-                subjs = []
-                indexes = []
-                for i in range(len(term_marks)):
-                    c = 0
-                    if term_marks[i] == '3':
-                        indexes.append(i)
-                        subjs.append(self.subjects[i])
-                        c += 1
-
-                    if c == 2:
-                        break
-
-                subj_string = '\n'.join(subjs)
+            if term_marks.count('3') == 0:
+                mark, lists = '4', (one_four, two_fours)
+            else:
+                mark, lists = '3', (one_three, two_threes)
+
+            count = term_marks.count(mark)
+            if count in (1, 2):
+                indexes = [i for i, term_mark in enumerate(term_marks) if term_mark == mark]
                 name, link = self.__prettify_name(name)
-                this_avgs = [self.__get_avg(index, link) for index in indexes]
-                avgs_string = '\n'.join(this_avgs)
-                two_threes.append((name, subj_string, avgs_string))
+                pending.append((lists[count - 1], name, indexes, link))
+
+        self._letters.prefetch([link for *_, link in pending])
+
+        for students, name, indexes, link in pending:
+            subj_string = '\n'.join(self.subjects[index] for index in indexes)
+            avgs_string = '\n'.join(self.__get_avg(index, link) for index in indexes)
+            students.append((name, subj_string, avgs_string))
 
         return excellent, one_four, two_fours, one_three, two_threes
 
-    @staticmethod
-    def __prettify_name(name):
+    def __prettify_name(self, name):
         """
         Makes readable student's name and a link to get avg mark
         :param name: <td> with ТБ, ПР
         :return: name, link
         """
         name_ = ' '.join(w.strip() for w in name.text.split()[:2]) #surname + name
-        link = 'https://edu.tatar.ru/school/reports/' + name.find_all('a')[-1]['href']
+        link = self._base_url + '/school/reports/' + name.find_all('a')[-1]['href']
         return name_, link
 
     def __get_avg(self, index, link):
@@ -531,16 +619,7 @@ class GradePerformanceTable(Table):
         :param link:
         :return: avg_mark: str
         """
-
-        r = self._SESSION.get(link)
-        info_letter_page = BeautifulSoup(r.text, 'html.parser')
-        rows = info_letter_page.find('table').find('tbody').find_all('tr')
-        needed_row = rows[index]
-
-        cells = needed_row.find_all('td')
-        avg_mark = cells[6].text.strip()
-
-        return avg_mark
+        return self._letters.avg(link, index)
 
 
     @property
@@ -0,0 +1,142 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class TaskGraph:
+    """
+    Small DAG scheduler of the report. A node is a page fetch or a table build. It's run in the thread pool
+    as soon as all the nodes it depends on are done and gets their results as positional arguments.
+    Running nodes can add new ones, e.g. when a fetched page tells which pages are needed next.
+    A result is dropped as soon as the last node depending on it has started, so pages and tables aren't kept
+    for the whole run
+    """
+    def __init__(self, workers: int, progress=None):
+        """
+        :param workers: number of nodes run at once, 1 runs them one by one in the order they're added
+        :param progress: callable(done, total) called after every finished node
+        """
+        self._workers = max(1, workers)
+        self._progress = progress
+        self._lock = threading.Lock()
+        self._nodes = {} #key: (func, deps)
+        self._waiting = {} #key: number of unfinished deps
+        self._dependents = {} #key: [key, ...] not finished when they were added
+        self._consumers = {} #key: number of dependents not started yet
+        self._done = set()
+        self._keep = set()
+        self._ready = []
+        self.results = {} #results not consumed yet and the kept ones
+
+    def add(self, key, func, *deps):
+        """
+        Declares a node. Its deps must be added before it
+        :param key: hashable name of the node
+        :param func: callable(*deps' results)
+        :return: key
+        """
+        with self._lock:
+            if key in self._nodes:
+                raise ValueError('Node {} is already in the graph'.format(key))
+            self.__check_deps(key, deps)
+            self.__insert(key, func, deps)
+
+        return key
+
+    def add_once(self, key, func, *deps):
+        """
+        Declares a node unless it's already in the graph. The check and the insert are done under one lock,
+        so nodes adding the same node at once don't race
+        :return: key
+        """
+        with self._lock:
+            if key not in self._nodes:
+                self.__check_deps(key, deps)
+                self.__insert(key, func, deps)
+
+        return key
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._nodes
+
+    def run(self, keep=()):
+        """
+        Runs the nodes until all of them, including the added on the way, are done.
+        The first node's exception is raised after the nodes that are already running finish
+        :param keep: keys of the nodes whose results are needed after the run
+        :return: {key: result} of the kept nodes
+        """
+        self._keep = set(keep)
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            running = {}
+            while True:
+                with self._lock:
+                    ready, self._ready = self._ready, []
+                for key in ready:
+                    func, deps = self._nodes[key]
+                    running[executor.submit(func, *self.__consume(deps))] = key
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception:
+                        for other in running:
+                            other.cancel()
+                        raise
+                    self.__finish(key, result)
+
+        with self._lock:
+            self.results = {key: result for key, result in self.results.items() if key in self._keep}
+            return dict(self.results)
+
+    def __check_deps(self, key, deps):
+        unknown = [dep for dep in deps if dep not in self._nodes]
+        if unknown:
+            raise KeyError('Node {} depends on unknown nodes {}'.format(key, unknown))
+        released = [dep for dep in deps if dep in self._done and dep not in self.results]
+        if released:
+            raise KeyError('Node {} depends on nodes whose results are already dropped {}'.format(key, released))
+
+    def __insert(self, key, func, deps):
+        self._nodes[key] = (func, deps)
+        for dep in set(deps):
+            self._consumers[dep] = self._consumers.get(dep, 0) + 1
+
+        unfinished = {dep for dep in deps if dep not in self._done}
+        self._waiting[key] = len(unfinished)
+        for dep in unfinished:
+            self._dependents.setdefault(dep, []).append(key)
+        if not unfinished:
+            self._ready.append(key)
+
+    def __consume(self, deps):
+        """
+        Takes the deps' results for a starting node and drops the ones no other node is waiting for
+        :return: tuple of results
+        """
+        with self._lock:
+            args = tuple(self.results[dep] for dep in deps)
+            for dep in set(deps):
+                self._consumers[dep] -= 1
+                if not self._consumers[dep] and dep not in self._keep:
+                    del self.results[dep]
+
+        return args
+
+    def __finish(self, key, result):
+        with self._lock:
+            self._done.add(key)
+            self.results[key] = result
+            for dependent in self._dependents.pop(key, []):
+                self._waiting[dependent] -= 1
+                if not self._waiting[dependent]:
+                    self._ready.append(dependent)
+            done, total = len(self._done), len(self._nodes)
+
+        if self._progress:
+            self._progress(done, total)
@@ -0,0 +1,183 @@
+import copy
+from collections import namedtuple
+from functools import partial
+from JournalParser import procpool
+from .objects import OverallTable, OverallQualitiesTable, OverallSubjectsTable, SubjectsQualitiesTable
+
+Page = namedtuple('Page', 'kind year terms_count term_number') #kind: 'overall' or 'subjects', year: 'this' or 'past'
+Part = namedtuple('Part', 'year terms_count term_number crop past_year') #a table built from one page
+ReportSpec = namedtuple('ReportSpec', 'kind columns sheets header')
+GradesSpec = namedtuple('GradesSpec', 'terms header_for_exc header_for_count')
+
+TABLES = {'overall': OverallTable, 'subjects': OverallSubjectsTable}
+QUALITIES = {'overall': OverallQualitiesTable, 'subjects': SubjectsQualitiesTable}
+
+
+def young(term):
+    """
+    :return: Part of this year's term page, grades with terms
+    """
+    return Part('this', 4, term, None, False)
+
+
+def old(semester):
+    """
+    :return: Part of this year's semester page, 10-11 grades
+    """
+    return Part('this', 2, semester, None, False)
+
+
+def past(crop):
+    """
+    :return: Part of the past year's page, grades are incremented
+    """
+    return Part('past', None, None, crop, True)
+
+
+def table_columns(TERM, START_GRADE):
+    """
+    Columns of 'Результативность работы школы' reports, newer first. Parts of a column are merged into one table
+    :return: [(Part, ...), ...]
+    """
+    return {
+        1: [(young(1),), (past((START_GRADE, 8)),)],
+        2: [(young(2), old(1)), (young(1), past((9, 10)))],
+        3: [(young(3),), (young(2),), (young(1),)],
+        4: [(young(4), old(2)), (young(3),), (young(2), old(1)), (young(1),)],
+    }[TERM]
+
+
+def report_specs(TERM, START_GRADE):
+    """
+    :return: (ReportSpec of the overall report, ReportSpec of the report by subjects, GradesSpec)
+    """
+    columns = table_columns(TERM, START_GRADE)
+    young_grades = (START_GRADE, 9)
+
+    if TERM == 1:
+        overall = ReportSpec('overall', columns, ['total', 'pred'],
+                             ['Класс', 'Прошлый уч.год, %', '1 четверть, %', 'Динамика, %'])
+        subjects = ReportSpec('subjects', columns, ['po_predm', 'pred'],
+                              ['Класс', 'Прошлый год', '1 четверть', 'Динамика'])
+        grades = GradesSpec([(1, young_grades)], ['Класс', '1 четверть'], ['Класс', '1 четверть'])
+
+    elif TERM == 2:
+        overall = ReportSpec('overall', columns, ['total', 'term1'],
+                             ['Класс', '1 четверть/Прошлый год, %', '2 четверть/1 полугодие, %', 'Динамика, %'])
+        subjects = ReportSpec('subjects', columns, ['po_predm', 'pred'],
+                              ['Класс', '1 четверть', '2 четверть', 'Динамика'])
+        grades = GradesSpec([(2, None), (1, young_grades)],
+                            ['Класс', '1 четверть', '', '2 четверть', ''],
+                            ['Класс', '1 четверть', '2 четверть', 'Динамика'])
+
+    elif TERM == 3:
+        overall = ReportSpec('overall', columns, ['total', 'term2', 'term1'],
+                             ['Класс', '1 четверть, %', '2 четверть, %', '3 четверть, %', 'Динамика, %'])
+        subjects = ReportSpec('subjects', columns, ['po_predm', 'term2', 'term1'],
+                              ['Класс', '1 четверть', '2 четверть', '3 четверть', 'Динамика'])
+        grades = GradesSpec([(3, young_grades), (2, young_grades), (1, young_grades)],
+                            ['Класс', '1 четверть', '', '2 четверть', '', '3 четверть', ''],
+                            ['Класс', '1 четверть', '2 четверть', '3 четверть', 'Динамика'])
+
+    else:
+        overall = ReportSpec('overall', columns, ['total', 'term3', 'term2', 'term1'],
+                             ['Класс', '1 четверть, %', '2 четверть, %', '3 четверть, %', '4 четверть, %', 'Динамика, %'])
+        subjects = ReportSpec('subjects', columns, ['po_predm', 'term3', 'term2', 'term1'],
+                              ['Класс', '1 четверть', '2 четверть', '3 четверть', '4 четверть', 'Динамика'])
+        grades = GradesSpec([(4, None), (3, young_grades), (2, None), (1, young_grades)],
+                            ['Класс', '1 четверть', '', '2 четверть', '', '3 четверть', '', '4 четверть', ''],
+                            ['Класс', '1 четверть', '2 четверть', '3 четверть', '4 четверть', 'Динамика'])
+
+    return overall, subjects, grades
+
+
+def table_kwargs(part):
+    """
+    :return: kwargs of the part's table besides the page
+    """
+    return {'crop': part.crop, 'past_year': part.past_year}
+
+
+def build_table(kind, part, raw_page):
+    """
+    :return: table of the part's page. It keeps no DOM
+    """
+    return TABLES[kind](raw_page, **table_kwargs(part))
+
+
+def pooled_build(pool, PARAMS):
+    """
+    :param pool: ProcessPoolExecutor of JournalParser.procpool.create_pool
+    :return: build_table parsing the pages in worker processes
+    """
+    params = procpool.worker_params(PARAMS)
+
+    def build(kind, part, raw_page):
+        return pool.submit(procpool.build_table, params, TABLES[kind], raw_page, table_kwargs(part)).result()
+
+    return build
+
+
+def merge(table, *others):
+    """
+    Merges copies, so the tables stay as they are for other columns sharing them
+    :return: new table
+    """
+    merged = copy.deepcopy(table)
+    merged.merge_tables(*others)
+
+    return merged
+
+
+class ReportPlan:
+    """
+    Adds the specs' pages, tables and reports to the TaskGraph. Nodes are keyed by what they are, not by the report
+    they're needed for, so every distinct page is fetched once and every distinct table is built once
+    """
+    def __init__(self, graph: 'TaskGraph', fetch, build=build_table):
+        """
+        :param fetch: callable(Page) returning the page's markup
+        :param build: callable(kind, Part, markup) returning the table, build_table or pooled_build's one
+        """
+        self._graph = graph
+        self._fetch = fetch
+        self._build = build
+
+    def node(self, key, func, *deps):
+        """
+        Adds the node unless it's already planned
+        :return: key
+        """
+        return self._graph.add_once(key, func, *deps)
+
+    def page(self, page: Page):
+        return self.node(page, partial(self._fetch, page))
+
+    def table(self, kind, part: Part):
+        page = self.page(Page(kind, part.year, part.terms_count, part.term_number))
+        return self.node(('table', kind, part), partial(self._build, kind, part), page)
+
+    def column(self, kind, parts: tuple):
+        """
+        :return: key of the column's table, parts are merged into the first one
+        """
+        tables = [self.table(kind, part) for part in parts]
+        if len(tables) == 1:
+            return tables[0]
+        return self.node(('column', kind, parts), merge, *tables)
+
+    def report(self, spec: ReportSpec, excelify):
+        """
+        Adds the node writing .xlsx of the spec with excelify(**{sheet: tables})
+        :return: key
+        """
+        def write(*tables):
+            qualities = QUALITIES[spec.kind](*(table.qualities for table in tables))
+            qualities.header = spec.header
+
+            sheets = {spec.sheets[0]: (tables[0], qualities)}
+            sheets.update((sheet, (table,)) for sheet, table in zip(spec.sheets[1:], tables[1:]))
+            excelify(**sheets)
+
+        columns = [self.column(spec.kind, parts) for parts in spec.columns]
+        return self.node(('report', spec.kind), write, *columns)
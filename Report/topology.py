@@ -0,0 +1,117 @@
+import os
+import re
+import time
+import pickle
+from JournalParser.parser import make_soup
+from .funcs import fetch_grade
+
+TERM_LINK = re.compile(r'^\d (четверть|полугодие)$')
+
+
+def term_link_text(grade_str: str, term: int):
+    """
+    10-11 grades have semesters instead of terms
+    :return: text of the term's link, e.g. '2 четверть' or '1 полугодие'
+    """
+    return '{} полугодие'.format(term // 4 + 1) if grade_str.startswith(('10', '11')) else '{} четверть'.format(term)
+
+
+def parse_teacher_page(page):
+    """
+    Finds grade number and the links of all its terms/semesters on a page 'Итоги успеваемости класса...' with worker_id
+    :param page: the page's markup
+    :return: (grade_str, {'1 четверть': href, ...})
+    """
+    empty_grade_page = make_soup(page)
+    div = empty_grade_page.find('div', {'class': 'h'})
+
+    labels = div.find_all('label')
+    label_texts = [label.nextSibling.strip() for label in labels]
+
+    grade_str = label_texts[-3]
+    st_year = label_texts[-4]
+
+    label_texts = label_texts[:-4]
+
+    row_ind = 0
+
+    for i in range(1, len(label_texts), 2):
+        if label_texts[i] == st_year and label_texts[i + 1] == grade_str:
+            row_ind = i
+            break
+
+    links = {} #the first link with the text after the grade's row
+    for a in labels[row_ind].find_all_next('a', href=True):
+        a_text = a.text.strip()
+        if TERM_LINK.match(a_text):
+            links.setdefault(a_text, a['href'])
+
+    return grade_str, links
+
+
+class TeacherTopology:
+    """
+    Teacher -> grade -> term/semester links of 'Итоги успеваемости класса...'. Teachers' pages are fetched and parsed
+    once per run, every term of the report is looked up without requests. If PARAMS.topology_ttl is set,
+    it's kept in PARAMS.topology_file as {login: (stored, {teacher_id: (grade_str, links)})} and reused until it expires
+    """
+    def __init__(self, PARAMS):
+        self._PARAMS = PARAMS
+        self._all = {}
+
+        if PARAMS.topology_ttl and os.path.exists(PARAMS.topology_file):
+            try:
+                with open(PARAMS.topology_file, 'rb') as inf:
+                    self._all = pickle.load(inf)
+            except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+                self._all = {}
+
+        stored, teachers = self._all.get(PARAMS.login, (0, {}))
+        self.fresh = bool(teachers) and time.time() - stored < PARAMS.topology_ttl
+        self.teachers = teachers if self.fresh else {}
+
+    def update(self, teachers: dict):
+        """
+        Replaces the topology with the discovered one and keeps it if it's persisted
+        :param teachers: {teacher_id: (grade_str, links)} in the order of the teachers' <select>
+        """
+        self.teachers = teachers
+        if self._PARAMS.topology_ttl:
+            self._all[self._PARAMS.login] = (time.time(), teachers)
+            with open(self._PARAMS.topology_file, 'wb') as ouf:
+                pickle.dump(self._all, ouf)
+
+    def missing(self, terms):
+        """
+        Kept links are a cache miss for the teachers lacking a needed term, e.g. it has opened since they were discovered
+        :param terms: [(term, crop), ...]
+        :return: ids of the teachers to discover again
+        """
+        return [teacher_id for teacher_id, (grade_str, links) in self.teachers.items()
+                if any(self.__needed(grade_str, crop) and term_link_text(grade_str, term) not in links
+                       for term, crop in terms)]
+
+    def grade_to_link(self, term, crop=None):
+        """
+        :param term: required term's number
+        :param crop: arr of needed grades. Default is None (all grades needed)
+        :return: dict {grade1: href1, ..., gradeN: hrefN} sorted by grade
+        """
+        grade_and_link = {}
+        for teacher_id, (grade_str, links) in self.teachers.items():
+            if not self.__needed(grade_str, crop):
+                continue
+
+            href = links.get(term_link_text(grade_str, term))
+            if href is None:
+                print('Не получилось найти ссылку на четверть/полугодие в {} классе'.format(grade_str))
+                print('worker_id={}'.format(teacher_id))
+                continue
+
+            grade_and_link[grade_str] = href
+
+        return {grade: link for grade, link in sorted(grade_and_link.items(), key=lambda item: int(item[0][:-1]))}
+
+    @staticmethod
+    def __needed(grade_str, crop):
+        return not crop or fetch_grade(grade_str) in range(crop[0], crop[1] + 1)
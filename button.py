@@ -465,6 +465,14 @@ class Ui_MainWindow(object):
         self.group_by.setMaxCount(3)
         self.group_by.setObjectName("group_by")
         self.formLayout.setWidget(20, QtWidgets.QFormLayout.LabelRole, self.group_by)
+        self.snapshot = QtWidgets.QCheckBox(self.scrollAreaWidgetContents)
+        font = QtGui.QFont()
+        font.setFamily("Calibri")
+        font.setPointSize(14)
+        self.snapshot.setFont(font)
+        self.snapshot.setLayoutDirection(QtCore.Qt.RightToLeft)
+        self.snapshot.setObjectName("snapshot")
+        self.formLayout.setWidget(21, QtWidgets.QFormLayout.LabelRole, self.snapshot)
         self.scrollArea.setWidget(self.scrollAreaWidgetContents)
         self.verticalLayout.addWidget(self.scrollArea)
         self.groupBox_6 = QtWidgets.QGroupBox(self.check_journals)
@@ -498,6 +506,15 @@ class Ui_MainWindow(object):
         self.start_check.setMinimumSize(QtCore.QSize(211, 50))
         self.start_check.setCheckable(False)
         self.start_check.setObjectName("start_check")
+        self.recheck = QtWidgets.QPushButton(self.groupBox_6)
+        self.recheck.setGeometry(QtCore.QRect(140, 20, 211, 50))
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.MinimumExpanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.recheck.sizePolicy().hasHeightForWidth())
+        self.recheck.setSizePolicy(sizePolicy)
+        self.recheck.setMinimumSize(QtCore.QSize(211, 50))
+        self.recheck.setObjectName("recheck")
         self.pb_label = QtWidgets.QLabel(self.groupBox_6)
         self.pb_label.setGeometry(QtCore.QRect(580, 20, 311, 16))
         sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed)
@@ -608,7 +625,10 @@ class Ui_MainWindow(object):
         self.label_18.setText(_translate("MainWindow", "Минимальный балл для четвертной 4"))
         self.label_19.setText(_translate("MainWindow", "Минимальный балл для четвертной 3"))
         self.label_20.setText(_translate("MainWindow", "Как отсортировать таблицы?"))
+        self.snapshot.setText(_translate("MainWindow", "Сохранить данные для перепроверки"))
         self.start_check.setText(_translate("MainWindow", "Проверить"))
+        self.recheck.setToolTip(_translate("MainWindow", "Проверить сохраненные данные прошлой проверки с текущими параметрами, журналы не загружаются"))
+        self.recheck.setText(_translate("MainWindow", "Перепроверить"))
         self.pb_label.setText(_translate("MainWindow", "Инфо"))
         self.tabWidget.setTabText(self.tabWidget.indexOf(self.check_journals), _translate("MainWindow", "Проверить журналы"))
         self.label_8.setText(_translate("MainWindow", "Четверть"))
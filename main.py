@@ -5,9 +5,11 @@ from button import Ui_MainWindow
 import sys
 import traceback
 import pickle
+import multiprocessing
 import requests
 from os import path
 from JournalParser.main import execute
+from JournalParser.whatif import reevaluate, profile_file
 from Report.main import create_report
 from requests.exceptions import ConnectionError
 
@@ -23,6 +25,38 @@ def check_cred(func):
             return func(self)
     return wrapper
 
+def check_params():
+    """
+    Journal check params from the form
+    :return: dict for Params or None if no check is chosen
+    """
+    prms = {
+        'login': application.ui.login.text(),
+        'password': application.ui.password.text(),
+        'class1': application.ui.class1.value(),
+        'class2': application.ui.class2.value(),
+        'term1': application.ui.term1.value(),
+        'term2': application.ui.term2.value(),
+        'check_RO': application.ui.check_RO.isChecked(),
+        'check_meta': application.ui.check_meta.isChecked(),
+        'check_lessons_fill': application.ui.check_lessons_fill.isChecked(),
+        'lesson_percent': application.ui.lesson_percent.value(),
+        'allowed_not_row': application.ui.allowed_not_row.text(),
+        'check_students_fill': application.ui.check_students_fill.isChecked(),
+        'term_percent': application.ui.term_percent.value(),
+        'check_double_two': application.ui.check_double_two.isChecked(),
+        'check_term_marks': application.ui.check_term_marks.isChecked(),
+        'min_for_5': application.ui.min_for_5.value(),
+        'min_for_4': application.ui.min_for_4.value(),
+        'min_for_3': application.ui.min_for_3.value(),
+        'group_by': application.ui.group_by.currentText(),
+        'snapshot': application.ui.snapshot.isChecked(),
+    }
+
+    if (prms['check_RO'] or prms['check_meta'] or prms['check_lessons_fill'] or prms['check_students_fill'] or
+            prms['check_double_two'] or prms['check_term_marks']):
+        return prms
+
 def launch(func):
     def launcher(self):
         self.thread = QThread(self)
@@ -54,30 +88,9 @@ class Worker(QObject):
     @pyqtSlot(name='journal')
     @check_cred
     def startCheck(self):
-        prms = {
-            'login': application.ui.login.text(),
-            'password': application.ui.password.text(),
-            'class1': application.ui.class1.value(),
-            'class2': application.ui.class2.value(),
-            'term1': application.ui.term1.value(),
-            'term2': application.ui.term2.value(),
-            'check_RO': application.ui.check_RO.isChecked(),
-            'check_meta': application.ui.check_meta.isChecked(),
-            'check_lessons_fill': application.ui.check_lessons_fill.isChecked(),
-            'lesson_percent': application.ui.lesson_percent.value(),
-            'allowed_not_row': application.ui.allowed_not_row.text(),
-            'check_students_fill': application.ui.check_students_fill.isChecked(),
-            'term_percent': application.ui.term_percent.value(),
-            'check_double_two': application.ui.check_double_two.isChecked(),
-            'check_term_marks': application.ui.check_term_marks.isChecked(),
-            'min_for_5': application.ui.min_for_5.value(),
-            'min_for_4': application.ui.min_for_4.value(),
-            'min_for_3': application.ui.min_for_3.value(),
-            'group_by': application.ui.group_by.currentText(),
-        }
+        prms = check_params()
 
-        if not (prms['check_RO'] or prms['check_meta'] or prms['check_lessons_fill'] or prms['check_students_fill'] or
-                prms['check_double_two'] or prms['check_term_marks']):
+        if not prms:
             self.error.emit('Нужно выбрать хотя бы один пункт для проверки')
 
         else:
@@ -93,6 +106,33 @@ class Worker(QObject):
 
         self.finished.emit()
 
+    @pyqtSlot(name='recheck')
+    def recheckJournals(self):
+        """
+        Checks the data kept by the last check with the form's params, nothing is fetched, so no login is needed
+        """
+        prms = check_params()
+
+        if not prms:
+            self.error.emit('Нужно выбрать хотя бы один пункт для проверки')
+
+        else:
+            application.ui.start_check.setEnabled(False)
+            application.ui.recheck.setEnabled(False)
+
+            results = reevaluate([prms], self.progress, self.status)
+            if not results:
+                self.error.emit('Нет сохраненных данных. Проверьте журналы с пунктом "Сохранить данные для перепроверки"')
+            elif results[0] is None:
+                self.error.emit('В сохраненных данных нет нужных для этих проверок столбцов. Проверьте журналы заново')
+            else:
+                self.alert.emit(f'Журналы перепроверены! Результат - {profile_file(1)} в папке приложения.')
+
+            application.ui.start_check.setEnabled(True)
+            application.ui.recheck.setEnabled(True)
+
+        self.finished.emit()
+
     @pyqtSlot(name='report')
     @check_cred
     def createReport(self):
@@ -135,6 +175,7 @@ class MyWindow(QtWidgets.QMainWindow):
             self.ui.password.setText(p)
 
         self.ui.start_check.clicked.connect(self.start_check)
+        self.ui.recheck.clicked.connect(self.recheck)
         self.ui.create_report.clicked.connect(self.create_report)
 
         self.ui.saveCred.clicked.connect(self.saveCred)
@@ -143,6 +184,10 @@ class MyWindow(QtWidgets.QMainWindow):
     def start_check(self):
         return self.worker.startCheck
 
+    @launch
+    def recheck(self):
+        return self.worker.recheckJournals
+
     @launch
     def create_report(self):
         return self.worker.createReport
@@ -213,11 +258,13 @@ def excepthook(exc_type, exc_value, exc_traceback):
 
     application.ui.start_check.setEnabled(True)
     application.ui.create_report.setEnabled(True)
+    application.ui.recheck.setEnabled(True)
 
 
 sys.excepthook = excepthook
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support() #worker processes of the frozen app start from this module too
     app = QtWidgets.QApplication([])
     application = MyWindow()
     application.show()
@@ -0,0 +1,265 @@
+"""
+Stand-in edu.tatar.ru served on localhost: one grade with a few subjects whose journals are generated from a seed
+"""
+
+import os
+import json
+import types
+import random
+import datetime
+import threading
+import unittest
+from contextlib import ExitStack
+from unittest import mock
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+from JournalParser import main, objects, rules, fetcher
+from JournalParser.params import Params
+from JournalParser.parser import configure
+from JournalParser.objects import GlobalsContainer, SubjectTables, Warnings
+from JournalParser.batch import create_batch
+
+YEAR = 2025
+GRADE_ID = 100
+SUBJECTS = {'1': 'Математика', '2': 'Русский язык', '3': 'Электив x', '4': 'История'}
+NO_TEACHER = '4' #its journal is empty
+PAGES = 3
+LESSONS = 12 #per page
+MONTHS = ['Январь', 'Февраль', 'Март', 'Апрель', 'Май', 'Июнь', 'Июль', 'Август', 'Сентябрь', 'Октябрь', 'Ноябрь',
+          'Декабрь']
+ALL_CHECKS = dict(check_RO=True, check_meta=True, check_lessons_fill=True, check_students_fill=True,
+                  check_double_two=True, check_term_marks=True)
+BASELINE_CONFIGS = { #data/baseline_warnings.json has the warnings the original checks gave with these params
+    'all': ALL_CHECKS,
+    'term_marks': dict(check_term_marks=True),
+    'ro_double_two': dict(check_RO=True, check_double_two=True),
+    'thresholds': dict(ALL_CHECKS, lesson_percent=60, term_percent=50, min_for_5=4.6, allowed_not_row='Мат'),
+}
+
+
+def school_days(start: datetime.date, count: int):
+    days = []
+    while len(days) < count:
+        if start.weekday() < 5:
+            days.append(start)
+        start += datetime.timedelta(days=1)
+    return days
+
+
+def journal_page(subj_id: str, term: int, page: int, pages: int = PAGES, start: datetime.date = None):
+    """
+    :param start: date of the term's first lesson
+    :return: html of the subject's term journal page
+    """
+    if subj_id == NO_TEACHER:
+        return '<html><body></body></html>'
+
+    rnd = random.Random('{}-{}-{}'.format(subj_id, term, page))
+    start = start or (datetime.date(YEAR, 9, 1) if term == 1 else datetime.date(YEAR, 11, 10))
+    days = school_days(start, pages * LESSONS)[(page - 1) * LESSONS: page * LESSONS]
+
+    months = []
+    for day in days:
+        if months and months[-1][0] == day.month:
+            months[-1][1].append(day.day)
+        else:
+            months.append((day.month, [day.day]))
+
+    html = ['<html><body><div class="line last">Учитель Иванова Мария Петровна</div>',
+            '<p class="pages">{}</p>'.format(' '.join(str(n) for n in range(1, pages + 1))),
+            '<table class="table"><thead><tr><td>№</td><td>ФИО</td>']
+    html += ['<td colspan="{}">{}</td>'.format(len(ds), MONTHS[month - 1]) for month, ds in months]
+    html.append('<td>Ср</td><td>Ч</td></tr><tr>')
+    html += ['<td colspan="1">{}</td>'.format(d) for _, ds in months for d in ds]
+    html.append('</tr><tr>')
+    html += ['<td{}>{}</td>'.format(' title="Тема"' if rnd.random() < .8 else '', rnd.choice(['Р', 'П', 'КР', 'СР', '']))
+             for _ in days]
+    html.append('</tr></thead><tbody>')
+    for n in range(10):
+        html.append('<tr><td>{0}</td><td><a href="#">Петров{0} Иван{0}</a></td>'.format(n + 1))
+        html += ['<td> {} </td>'.format(rnd.choice(['', '', '5', '4', '3', '2', 'н'])) for _ in days]
+        html.append('<td>{}</td><td>{}</td></tr>'.format(rnd.choice(['4,5', '3,2', '', '2,7']), rnd.choice(['5', '4', ''])))
+    html.append('</tbody></table></body></html>')
+
+    return ''.join(html)
+
+
+class Site(BaseHTTPRequestHandler):
+    """
+    Journals have PAGES pages. Requested paths are counted in requests
+    """
+    requests = []
+    lock = threading.Lock()
+    journal = staticmethod(journal_page) #replaced by tests needing other journals
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.__send('<html>Личный кабинет</html>')
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        with self.lock:
+            self.requests.append(self.path)
+
+        if url.path == '/school':
+            body = '<h3>Учебный год {}/{}</h3>'.format(YEAR, YEAR + 1)
+        elif url.path == '/school/journal/select_edu_class':
+            body = ('<div class="h"><ul><li>5А\tкласс</li></ul></div>'
+                    '<a href="http://{}/school/journal/edu_class/{}">Журнал класса</a>'.format(self.headers['Host'], GRADE_ID))
+        elif url.path.startswith('/school/journal/edu_class/'):
+            body = '<select id="criteria">{}</select>'.format(''.join(
+                '<option value="{}">5А / {}</option>'.format(id_, name) for id_, name in SUBJECTS.items()))
+        elif url.path == '/school/journal/school_editor':
+            body = self.journal(query['criteria'], int(query['term']), int(query.get('page', 1)))
+        else:
+            body = '<html></html>'
+
+        self.__send(body)
+
+    def __send(self, body):
+        body = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class Response:
+    def __init__(self, url, text):
+        self.url = url
+        self.text = text
+        self.content = text.encode('utf-8')
+        self.status_code = 200
+        self.headers = {'Content-Type': 'text/html; charset=utf-8'}
+
+
+class JournalSession:
+    """
+    Serves the stand-in journals without HTTP. Requested urls are kept in requests
+    """
+    def __init__(self, journal=journal_page):
+        self.journal = journal
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        with self._lock:
+            self.requests.append(url)
+        query = {key: values[0] for key, values in parse_qs(urlsplit(url).query).items()}
+        return Response(url, self.journal(query['criteria'], int(query['term']), int(query.get('page', 1))))
+
+
+def check_journals(SESSION=None, **params):
+    """
+    Checks terms 1-2 of all the stand-in subjects (the elective too) with SubjectTables and Warnings
+    :return: {subj_name: [[teacher, term, warnings], ...]} as in data/baseline_warnings.json
+    """
+    PARAMS = Params(params)
+    configure(PARAMS)
+    globals_cont = GlobalsContainer(SESSION or JournalSession(), PARAMS, [YEAR, YEAR + 1])
+    batch = create_batch(PARAMS)
+
+    checked = []
+    for subj_id, subj_name in SUBJECTS.items():
+        for term in (1, 2):
+            tables = SubjectTables(globals_cont, '5А', term, GRADE_ID, subj_name, subj_id)
+            if tables.raw_pages:
+                checked.append(Warnings(globals_cont, tables, batch))
+    if batch:
+        batch.evaluate()
+
+    return warnings_json(checked)
+
+
+def warnings_json(warns_list):
+    """
+    :param warns_list: [Warnings, ...] in SUBJECTS and terms order
+    :return: {subj_name: [[teacher, term, warnings], ...]} as in data/baseline_warnings.json
+    """
+    checked = {}
+    for warns in warns_list:
+        checked.setdefault(warns.subject, []).append([warns.teacher, warns.term, warns.warnings])
+
+    return json.loads(json.dumps(checked, ensure_ascii=False))
+
+
+def baseline(name):
+    """
+    :return: warnings of data/baseline_warnings.json made with BASELINE_CONFIGS[name]
+    """
+    with open(os.path.join(os.path.dirname(__file__), 'data', 'baseline_warnings.json'), encoding='utf-8') as inf:
+        return json.load(inf)[name]
+
+
+def frozen_today(today: datetime.date):
+    """
+    Makes the checks and the fetchers take today for today's date. The calendar's dates aren't patched,
+    so the planner still pickles plain dates
+    :return: context manager
+    """
+    class Date(datetime.date):
+        @classmethod
+        def today(cls):
+            return cls(today.year, today.month, today.day)
+
+    stack = ExitStack()
+    for module in (objects, rules, fetcher):
+        stack.enter_context(mock.patch.object(module, 'datetime', types.SimpleNamespace(date=Date,
+                                                                                      timedelta=datetime.timedelta)))
+    return stack
+
+
+class Signal:
+    """
+    pyqtSignal stand-in, emitted values are kept
+    """
+    def __init__(self):
+        self.values = []
+
+    def emit(self, value):
+        self.values.append(value)
+
+
+def summary(data):
+    """
+    :return: {grade: {subj_name: [(teacher, term, warnings), ...]}}
+    """
+    return {grade: {subj_name: [(warns.teacher, warns.term, warns.warnings) for warns in warns_list]
+                    for subj_name, warns_list in subjects.items()}
+            for grade, subjects in data.items()}
+
+
+class StandInTest(unittest.TestCase):
+    """
+    Serves the stand-in site for the test case's methods
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), Site)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = 'http://127.0.0.1:{}'.format(cls.server.server_address[1])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        Site.requests.clear()
+
+    def journal_requests(self):
+        return [path for path in Site.requests if path.startswith('/school/journal/school_editor')]
+
+    def execute(self, label=None, **params):
+        """
+        Runs the journal check of 5th grade's terms 1-2 with all the checks
+        :return: data dict handed to excelify
+        """
+        params = dict(ALL_CHECKS, class1=5, class2=5, term1=1, term2=2, base_url=self.base_url, **params)
+        with mock.patch.object(main, 'excelify') as excelify:
+            main.execute(params, Signal(), label or Signal())
+        return excelify.call_args[0][0]
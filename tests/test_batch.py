@@ -0,0 +1,34 @@
+"""
+Compares the warnings of the school-wide batch checks with the per-subject RuleEngine and the baseline
+    python -m unittest discover tests
+"""
+
+import unittest
+from unittest import mock
+from stand_in import BASELINE_CONFIGS, baseline, check_journals
+from JournalParser import batch
+from JournalParser.markgrid import HAS_NUMPY
+from JournalParser.params import Params
+
+
+@unittest.skipUnless(HAS_NUMPY, 'numpy is not installed')
+class BatchTest(unittest.TestCase):
+    def test_matches_per_subject(self):
+        for name, params in BASELINE_CONFIGS.items():
+            for numpy_marks in (True, False):
+                with self.subTest(name, numpy_marks=numpy_marks):
+                    with mock.patch.object(batch, 'MarkTensor', wraps=batch.MarkTensor) as tensor:
+                        checked = check_journals(batch_checks=True, numpy_marks=numpy_marks, **params)
+
+                    self.assertEqual(tensor.call_count, 1)
+                    self.assertEqual(len(tensor.call_args[0][0]), 6) #all the subject-terms are in one tensor
+                    self.assertEqual(checked, check_journals(batch_checks=False, numpy_marks=numpy_marks, **params))
+                    self.assertEqual(checked, baseline(name))
+
+    def test_batch_is_off_without_flag(self):
+        self.assertIsNone(batch.create_batch(Params({})))
+        self.assertIsInstance(batch.create_batch(Params(dict(batch_checks=True))), batch.BatchEvaluator)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+"""
+Runs the parser benchmark on saved pages, pages without journal table among them
+    python -m unittest discover tests
+"""
+
+import os
+import io
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from stand_in import journal_page
+from JournalParser import benchmark
+
+
+class BenchmarkTest(unittest.TestCase):
+    def run_benchmark(self, pages):
+        with tempfile.TemporaryDirectory() as dir_name:
+            for n, page in enumerate(pages):
+                with open(os.path.join(dir_name, f'{n}.html'), 'w', encoding='utf-8') as ouf:
+                    ouf.write(page)
+
+            out = io.StringIO()
+            with redirect_stdout(out):
+                code = benchmark.main([dir_name, '-n', '1'])
+
+        return code, out.getvalue()
+
+    def test_pages_without_table_are_skipped(self):
+        code, out = self.run_benchmark([journal_page('1', 1, 1), '<html><form id="main_login2"></form></html>'])
+
+        self.assertEqual(code, 0)
+        self.assertIn('Пропущено страниц без таблицы журнала: 1', out)
+        self.assertIn('Страниц: 1,', out)
+        self.assertNotIn('ОТЛИЧАЕТСЯ', out)
+
+    def test_no_journal_pages(self):
+        code, out = self.run_benchmark(['<html></html>'])
+
+        self.assertEqual(code, 1)
+        self.assertIn('Нет страниц для замера', out)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+"""
+Checks the response cache: TTLs, ETag revalidation and LRU eviction
+    python -m unittest discover tests
+"""
+
+import tempfile
+import unittest
+from unittest import mock
+from stand_in import journal_page
+from JournalParser import cache
+from JournalParser.cache import CachedSession, DiskCache
+
+JOURNAL = 'https://edu.tatar.ru/school/journal/school_editor?term={}&criteria=1&edu_class_id=100&page={}'
+
+
+class Response:
+    def __init__(self, url, text='', status_code=200, headers=None):
+        self.url = url
+        self.content = text.encode('utf-8')
+        self.encoding = 'utf-8'
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding)
+
+
+class Server:
+    """
+    Session serving the stand-in journals with an ETag of the page. Requests' headers are kept in requests
+    """
+    def __init__(self):
+        self.requests = []
+        self.changed = False
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append((url, dict(headers or {})))
+        query = dict(part.split('=') for part in url.split('?')[1].split('&'))
+        etag = '"{}-{}-{}"'.format(query['term'], query['page'], int(self.changed))
+        if (headers or {}).get('If-None-Match') == etag:
+            return Response(url, status_code=304)
+        return Response(url, journal_page('1', int(query['term']), int(query['page'])), headers={'ETag': etag})
+
+
+class CacheTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.server = Server()
+        self.now = 1000.0
+        patcher = mock.patch.object(cache.time, 'time', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.dir.cleanup)
+
+    def session(self, max_size=10 ** 7, **kwargs):
+        return CachedSession(self.server, DiskCache(self.dir.name, max_size), 'login', **kwargs)
+
+    def test_fresh_page_is_served_from_cache(self):
+        session = self.session(ttls={'journal': 60})
+        first = session.get(JOURNAL.format(2, 1))
+        self.now += 59
+        second = session.get(JOURNAL.format(2, 1))
+
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(second.text, first.text)
+
+    def test_expired_page_is_revalidated(self):
+        session = self.session(ttls={'journal': 60})
+        first = session.get(JOURNAL.format(2, 1))
+        self.now += 61
+        second = session.get(JOURNAL.format(2, 1))
+
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(self.server.requests[1][1], {'If-None-Match': '"2-1-0"'})
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.text, first.text)
+
+        self.now += 30 #revalidation made it fresh again
+        session.get(JOURNAL.format(2, 1))
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_changed_page_is_refetched(self):
+        session = self.session(ttls={'journal': 60})
+        session.get(JOURNAL.format(2, 1))
+        self.server.changed = True
+        self.now += 61
+        session.get(JOURNAL.format(2, 1))
+        self.now += 61
+        session.get(JOURNAL.format(2, 1))
+
+        self.assertEqual([headers for _, headers in self.server.requests],
+                         [{}, {'If-None-Match': '"2-1-0"'}, {'If-None-Match': '"2-1-1"'}])
+
+    def test_closed_term_never_expires(self):
+        session = self.session(ttls={'journal': 60}, closed_terms=[1])
+        session.get(JOURNAL.format(1, 1))
+        self.now += 10 ** 6
+        session.get(JOURNAL.format(1, 1))
+
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_first_page_is_page_1(self):
+        session = self.session()
+        session.get(JOURNAL.format(2, 1))
+        session.get(JOURNAL.format(2, 1).replace('&page=1', ''))
+
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_least_recently_used_is_evicted(self):
+        disk = DiskCache(self.dir.name, 10 ** 7)
+        for page in (1, 2, 3):
+            self.now += 1
+            disk.put(str(page), journal_page('1', 2, page).encode('utf-8'), 'utf-8')
+        size = disk._size
+
+        self.now += 1
+        disk.get('1') #page 2 is the least recently used now
+        disk.max_size = size - 1
+        self.now += 1
+        disk.put('1', journal_page('1', 2, 1).encode('utf-8'), 'utf-8')
+
+        self.assertIsNotNone(disk.get('1'))
+        self.assertIsNone(disk.get('2'))
+        self.assertIsNotNone(disk.get('3'))
+        self.assertLessEqual(disk._size, disk.max_size)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,22 @@
+"""
+Runs execute() against the stand-in site and compares the async crawl and its requests with the sequential check
+    python -m unittest discover tests
+"""
+
+import unittest
+from stand_in import StandInTest, summary
+
+
+class CrawlerTest(StandInTest):
+    def test_crawler_matches_sequential(self):
+        sequential = summary(self.execute(fetch_threads=4))
+        sequential_requests = sorted(self.journal_requests())
+
+        self.setUp()
+        self.assertEqual(list(sequential['5А']), ['Математика', 'Русский язык'])
+        self.assertEqual(summary(self.execute(async_crawl=True, fetch_threads=4)), sequential)
+        self.assertEqual(sorted(self.journal_requests()), sequential_requests) #page 1 isn't fetched again
+
+
+if __name__ == '__main__':
+    unittest.main()
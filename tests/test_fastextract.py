@@ -0,0 +1,49 @@
+"""
+Compares the journal tables read by the scanner with the BS4 ones
+    python -m unittest discover tests
+"""
+
+import unittest
+from unittest import mock
+from stand_in import BASELINE_CONFIGS, Signal, StandInTest, baseline, check_journals, summary
+from JournalParser import objects
+from JournalParser.fastextract import scan_table
+
+
+def misread(text, encoding='utf-8'):
+    #scanner reading twos as threes
+    return scan_table(text.replace('<td> 2 </td>', '<td> 3 </td>'), encoding)
+
+
+class FastExtractTest(unittest.TestCase):
+    def test_matches_bs4(self):
+        for name, params in BASELINE_CONFIGS.items():
+            for fast_extract in (True, 'verify'):
+                with self.subTest(name, fast_extract=fast_extract):
+                    self.assertEqual(check_journals(fast_extract=fast_extract, **params), baseline(name))
+
+    def test_verify_falls_back_to_bs4(self):
+        params = BASELINE_CONFIGS['all']
+        with mock.patch.object(objects, 'scan_table', misread):
+            self.assertNotEqual(check_journals(fast_extract=True, **params), baseline('all'))
+            self.assertEqual(check_journals(fast_extract='verify', **params), baseline('all'))
+
+    def test_unscannable_page_falls_back_to_bs4(self):
+        with mock.patch.object(objects, 'scan_table', side_effect=objects.ScanError):
+            self.assertEqual(check_journals(fast_extract=True, **BASELINE_CONFIGS['all']), baseline('all'))
+
+
+class VerifyReportTest(StandInTest):
+    def test_mismatches_are_shown_in_label(self):
+        checked = summary(self.execute(fast_extract=True))
+        label = Signal()
+        with mock.patch.object(objects, 'scan_table', misread):
+            self.assertEqual(summary(self.execute(label, fast_extract='verify')), checked)
+
+        reported = [value for value in label.values if value.startswith('Быстрое чтение таблиц отличалось от BS4')]
+        self.assertEqual(len(reported), 1)
+        self.assertIn('5А Математика 1', reported[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+"""
+Compares the check with concurrent page fetching with the sequential one and checks the per-host limit
+    python -m unittest discover tests
+"""
+
+import time
+import threading
+import unittest
+from stand_in import Response, StandInTest, summary
+from JournalParser.fetcher import Fetcher
+
+
+class SlowSession:
+    """
+    Counts the requests in flight of every host
+    """
+    def __init__(self):
+        self.in_flight = {}
+        self.peak = {}
+        self._lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        host = url.split('/')[2]
+        with self._lock:
+            self.in_flight[host] = self.in_flight.get(host, 0) + 1
+            self.peak[host] = max(self.peak.get(host, 0), self.in_flight[host])
+        time.sleep(0.02)
+        with self._lock:
+            self.in_flight[host] -= 1
+        return Response(url, url)
+
+
+class FetcherTest(unittest.TestCase):
+    def test_fetch_keeps_order_and_host_limit(self):
+        SESSION = SlowSession()
+        urls = ['https://{}/page/{}'.format(host, n) for n in range(10) for host in ('a', 'b')]
+
+        self.assertEqual(Fetcher(SESSION, workers=8, host_limit=2).fetch(urls), urls)
+        self.assertEqual(SESSION.peak, {'a': 2, 'b': 2})
+
+
+class ConcurrentCheckTest(StandInTest):
+    def test_matches_sequential(self):
+        sequential = summary(self.execute())
+        sequential_requests = sorted(self.journal_requests())
+
+        for params in (dict(fetch_threads=4), dict(fetch_threads=4, host_limit=2)):
+            with self.subTest(**params):
+                self.setUp()
+                self.assertEqual(summary(self.execute(**params)), sequential)
+                self.assertEqual(sorted(self.journal_requests()), sequential_requests)
+
+
+if __name__ == '__main__':
+    unittest.main()
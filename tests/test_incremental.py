@@ -0,0 +1,100 @@
+"""
+Checks that JournalState reuses the pages and warnings of the previous runs and drops them when they're outdated
+    python -m unittest discover tests
+"""
+
+import os
+import datetime
+import tempfile
+import unittest
+from stand_in import (ALL_CHECKS, BASELINE_CONFIGS, GRADE_ID, SUBJECTS, YEAR, JournalSession, baseline, check_journals,
+                      journal_page, warnings_json)
+from JournalParser.params import Params
+from JournalParser.parser import configure
+from JournalParser.objects import GlobalsContainer
+from JournalParser.incremental import JournalState
+
+
+def moved_lessons(subj_id, term, page):
+    #a lesson was added at the start of the term, so every page starts a day earlier
+    start = datetime.date(YEAR, 8, 29) if term == 1 else datetime.date(YEAR, 11, 7)
+    return journal_page(subj_id, term, page, start=start)
+
+
+class JournalStateTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def run_state(self, journal=journal_page, **params):
+        """
+        Checks terms 1-2 of the stand-in subjects with a JournalState loaded from the state file and saves it
+        :return: (warnings as in data/baseline_warnings.json, requested urls)
+        """
+        defaults = dict(ALL_CHECKS, incremental=True, state_file=os.path.join(self.dir.name, 'state.pkl'),
+                        sample_every=1000, login='user')
+        PARAMS = Params(dict(defaults, **params))
+        configure(PARAMS)
+        SESSION = JournalSession(journal)
+        globals_cont = GlobalsContainer(SESSION, PARAMS, [YEAR, YEAR + 1])
+
+        state = JournalState(PARAMS)
+        checked = []
+        for subj_id, subj_name in SUBJECTS.items():
+            for term in (1, 2):
+                warns = state.check(globals_cont, '5А', term, GRADE_ID, subj_name, subj_id)
+                if warns:
+                    checked.append(warns)
+        state.save()
+
+        return warnings_json(checked), SESSION.requests
+
+    def test_second_run_fetches_first_pages_only(self):
+        first, first_requests = self.run_state()
+        second, second_requests = self.run_state()
+
+        self.assertEqual(first, baseline('all'))
+        self.assertEqual(second, baseline('all'))
+        self.assertEqual(len(first_requests), 2 + 3 * 2 * 3) #empty journal's first pages and all the pages
+        self.assertEqual(len(second_requests), 2 + 3 * 2)
+        self.assertTrue(all('page' not in url for url in second_requests))
+
+    def test_changed_checks_are_reevaluated(self):
+        self.run_state()
+        checked, requests = self.run_state(**BASELINE_CONFIGS['thresholds'])
+
+        self.assertEqual(checked, baseline('thresholds'))
+        self.assertEqual(len(requests), 2 + 3 * 2)
+
+    def test_closed_term_is_not_fetched(self):
+        self.run_state()
+        checked, requests = self.run_state(closed_terms=[1])
+
+        self.assertEqual(checked, baseline('all'))
+        self.assertTrue(all('term=2' in url or 'criteria=4' in url for url in requests)) #the empty journal isn't stored
+
+    def test_moved_lessons_refetch_everything(self):
+        self.run_state()
+        checked, requests = self.run_state(moved_lessons)
+
+        self.assertNotEqual(checked, baseline('all'))
+        self.assertEqual(checked, check_journals(JournalSession(moved_lessons), **ALL_CHECKS))
+        self.assertEqual(len(requests), 2 + 3 * 2 * 3) #the fresh first page and the rest of the pages
+
+    def test_changed_extraction_drops_pages(self):
+        self.run_state()
+        checked, requests = self.run_state(fast_extract=True)
+
+        self.assertEqual(checked, baseline('all'))
+        self.assertEqual(len(requests), 2 + 3 * 2 * 3)
+
+    def test_states_are_kept_per_login(self):
+        self.run_state()
+        checked, requests = self.run_state(login='other')
+
+        self.assertEqual(checked, baseline('all'))
+        self.assertEqual(len(requests), 2 + 3 * 2 * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
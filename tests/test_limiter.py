@@ -0,0 +1,82 @@
+"""
+Checks the AIMD limit of AdaptiveLimiter and that TransportSession reports failed requests to it
+    python -m unittest discover tests
+"""
+
+import threading
+import unittest
+from stand_in import StandInTest
+from JournalParser.limiter import AdaptiveLimiter
+from JournalParser.transport import TransportSession
+
+
+class AdaptiveLimiterTest(unittest.TestCase):
+    def release(self, limiter, count, elapsed=0.1, ok=True):
+        for _ in range(count):
+            limiter.acquire()
+            limiter.release(elapsed, ok)
+
+    def test_additive_increase(self):
+        limiter = AdaptiveLimiter(start=2, max_limit=4)
+        self.release(limiter, 2)
+        self.assertEqual(int(limiter.limit), 2) #a window of 2 requests adds less than one
+        self.release(limiter, 1)
+        self.assertEqual(int(limiter.limit), 3)
+        self.release(limiter, 20)
+        self.assertEqual(limiter.limit, 4)
+
+    def test_slow_responses_hold_limit(self):
+        limiter = AdaptiveLimiter(start=2, max_limit=16)
+        self.release(limiter, 1, elapsed=0.1)
+        start = limiter.limit
+        self.release(limiter, 10, elapsed=1.0)
+
+        self.assertEqual(limiter.limit, start)
+
+    def test_multiplicative_decrease_once_per_window(self):
+        limiter = AdaptiveLimiter(start=8, max_limit=16)
+        self.release(limiter, 1, ok=False)
+        self.assertEqual(limiter.limit, 4)
+        self.release(limiter, 3, ok=False) #the same burst
+        self.assertEqual(limiter.limit, 4)
+        self.release(limiter, 1, ok=False)
+        self.assertEqual(limiter.limit, 2)
+        self.release(limiter, 2, ok=False)
+        self.assertEqual(limiter.limit, 1)
+        self.assertEqual(limiter.summary()['cuts'], 3)
+        self.release(limiter, 10, ok=False)
+        self.assertEqual(limiter.limit, 1) #min_limit
+
+        self.assertEqual(limiter.summary()['peak'], 8)
+
+    def test_acquire_waits_for_limit(self):
+        limiter = AdaptiveLimiter(start=1, max_limit=1)
+        limiter.acquire()
+        acquired = threading.Event()
+
+        def second():
+            limiter.acquire()
+            acquired.set()
+
+        thread = threading.Thread(target=second)
+        thread.start()
+        self.assertFalse(acquired.wait(0.2))
+        limiter.release(0.1, True)
+        self.assertTrue(acquired.wait(5))
+        thread.join()
+
+
+class TransportLimiterTest(StandInTest):
+    def test_login_page_cuts_limit(self):
+        limiter = AdaptiveLimiter(start=8, max_limit=16)
+        SESSION = TransportSession(limiter=limiter)
+        SESSION.get(self.base_url + '/school')
+        self.assertGreater(limiter.limit, 8)
+
+        SESSION.get(self.base_url + '/logon')
+        self.assertLess(limiter.limit, 8)
+        self.assertEqual(limiter.summary()['requests'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+"""
+Compares the warnings of the numpy mark matrix with the list path and the baseline
+    python -m unittest discover tests
+"""
+
+import re
+import itertools
+import unittest
+from unittest import mock
+from stand_in import BASELINE_CONFIGS, JournalSession, baseline, check_journals, journal_page
+from JournalParser.markgrid import HAS_NUMPY, MarkMatrix
+
+
+def noted_marks(subj_id, term, page):
+    #every mark has its own note, too many distinct cells for the int8 codes of the matrix
+    numbers = itertools.count()
+    return re.sub(r'<td> (\S+) </td>', lambda match: '<td> {}-{}{} </td>'.format(match.group(1), page, next(numbers)),
+                  journal_page(subj_id, term, page))
+
+
+@unittest.skipUnless(HAS_NUMPY, 'numpy is not installed')
+class MarkMatrixTest(unittest.TestCase):
+    def check_journals(self, *args, **params):
+        """
+        :return: checked journals, matrices MarkMatrix.from_pages made on the way
+        """
+        matrices = []
+        from_pages = MarkMatrix.from_pages
+
+        def recorded(pages):
+            matrices.append(from_pages(pages))
+            return matrices[-1]
+
+        with mock.patch.object(MarkMatrix, 'from_pages', recorded):
+            return check_journals(*args, **params), matrices
+
+    def test_matches_list_path(self):
+        for name, params in BASELINE_CONFIGS.items():
+            with self.subTest(name):
+                checked, matrices = self.check_journals(numpy_marks=True, **params)
+
+                if name != 'term_marks': #marks aren't read then
+                    self.assertTrue(matrices)
+                    self.assertTrue(all(isinstance(matrix, MarkMatrix) for matrix in matrices))
+                self.assertEqual(checked, check_journals(numpy_marks=False, **params))
+                self.assertEqual(checked, baseline(name))
+
+    def test_unjoinable_pages_use_list_path(self):
+        checked, matrices = self.check_journals(JournalSession(noted_marks), numpy_marks=True,
+                                                **BASELINE_CONFIGS['all'])
+
+        self.assertTrue(matrices)
+        self.assertEqual(matrices, [None] * len(matrices))
+        self.assertEqual(checked, check_journals(JournalSession(noted_marks), numpy_marks=False,
+                                                 **BASELINE_CONFIGS['all']))
+
+
+if __name__ == '__main__':
+    unittest.main()
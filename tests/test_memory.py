@@ -0,0 +1,51 @@
+"""
+Checks that the sequential check switches to writing subjects right away when the memory limit can't be kept
+    python -m unittest discover tests
+"""
+
+import unittest
+from unittest import mock
+from stand_in import ALL_CHECKS, Signal, StandInTest, summary
+from JournalParser import main, memory
+
+
+class MemoryLimitTest(StandInTest):
+    def check(self, process_memory):
+        """
+        :return: (data handed to excelify or None, {grade: {subj_name: [Warnings1t, ...]}} written by the streaming writer)
+        """
+        params = dict(ALL_CHECKS, class1=5, class2=5, term1=1, term2=2, base_url=self.base_url, memory_limit=1)
+        self.label = Signal()
+        streamed = {}
+
+        def add_subject(grade, subj_name, warns_list):
+            streamed.setdefault(grade, {})[subj_name] = warns_list
+
+        with mock.patch.object(memory, 'process_memory', process_memory), \
+                mock.patch.object(main, 'excelify') as excelify, mock.patch.object(main, 'ExcelWriter') as writer:
+            writer.return_value.add_data.side_effect = lambda data: [add_subject(grade, subj_name, warns_list)
+                                                                      for grade, subjs in data.items()
+                                                                      for subj_name, warns_list in subjs.items()]
+            writer.return_value.add_subject.side_effect = add_subject
+            main.execute(params, Signal(), self.label)
+
+        return excelify.call_args[0][0] if excelify.called else None, streamed
+
+    def test_fitting_check_is_kept(self):
+        data, streamed = self.check(lambda: 1024)
+
+        self.assertEqual(list(data['5А']), ['Математика', 'Русский язык'])
+        self.assertEqual(streamed, {})
+
+    def test_exceeded_limit_streams_subjects(self):
+        kept, _ = self.check(lambda: 1024)
+        data, streamed = self.check(lambda: 2 * 1024 * 1024)
+
+        self.assertIsNone(data)
+        self.assertEqual(summary(streamed), summary(kept))
+        self.assertIn('Превышен лимит памяти, проверенные предметы записываются в файл по ходу проверки',
+                      self.label.values)
+
+
+if __name__ == '__main__':
+    unittest.main()
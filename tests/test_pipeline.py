@@ -0,0 +1,33 @@
+"""
+Compares the pipelined check with the sequential one, pages from the future included
+    python -m unittest discover tests
+"""
+
+import datetime
+import unittest
+from stand_in import LESSONS, PAGES, YEAR, StandInTest, frozen_today, school_days, summary
+
+TODAY = school_days(datetime.date(YEAR, 9, 1), PAGES * LESSONS)[2 * LESSONS] #page 3 is the first one from the future
+
+
+class PipelineTest(StandInTest):
+    def compare(self, *configs):
+        sequential = summary(self.execute())
+        sequential_requests = sorted(self.journal_requests())
+
+        for params in configs:
+            with self.subTest(**params):
+                self.setUp()
+                self.assertEqual(summary(self.execute(**params)), sequential)
+                self.assertEqual(sorted(self.journal_requests()), sequential_requests)
+
+    def test_matches_sequential(self):
+        self.compare(dict(pipeline=True, fetch_threads=4), dict(pipeline=True, process_pool=True, processes=2))
+
+    def test_pages_from_future_are_not_walked(self):
+        with frozen_today(TODAY): #the pool's processes wouldn't see today's date
+            self.compare(dict(pipeline=True, fetch_threads=4))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+Checks that PaginationPlanner fetches only the pages before the cutoff and replans when the journal has changed
+    python -m unittest discover tests
+"""
+
+import os
+import datetime
+import tempfile
+import unittest
+from stand_in import ALL_CHECKS, GRADE_ID, LESSONS, PAGES, YEAR, JournalSession, frozen_today, journal_page, school_days
+from JournalParser.params import Params
+from JournalParser.parser import configure
+from JournalParser.objects import GlobalsContainer, SubjectTables, Warnings
+
+TERM_START = datetime.date(YEAR, 9, 1)
+TODAY = school_days(TERM_START, PAGES * LESSONS)[2 * LESSONS] #page 3 is the first one from the future
+
+
+def moved_lessons(subj_id, term, page):
+    #a lesson was added at the start of the term, so every page starts a day earlier
+    return journal_page(subj_id, term, page, start=datetime.date(YEAR, 8, 29))
+
+
+class PlannerTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.enterContext(frozen_today(TODAY))
+
+    def check(self, journal=journal_page, years=(YEAR, YEAR + 1), **params):
+        """
+        Checks term 1 of Математика and saves the planner
+        :return: (warnings, number of requests)
+        """
+        defaults = dict(ALL_CHECKS, plan_pages=True, planner_file=os.path.join(self.dir.name, 'pagination.pkl'),
+                        login='user')
+        PARAMS = Params(dict(defaults, **params))
+        configure(PARAMS)
+        SESSION = JournalSession(journal)
+        globals_cont = GlobalsContainer(SESSION, PARAMS, list(years))
+
+        tables = SubjectTables(globals_cont, '5А', 1, GRADE_ID, 'Математика', '1')
+        warnings = Warnings(globals_cont, tables).warnings if tables.pages else None #nothing to check yet
+        if globals_cont.PLANNER:
+            globals_cont.PLANNER.save()
+
+        return warnings, len(SESSION.requests)
+
+    def test_remembered_cutoff_is_used(self):
+        unplanned, _ = self.check(plan_pages=False)
+        first, first_requests = self.check()
+        second, second_requests = self.check()
+
+        self.assertEqual(first, unplanned)
+        self.assertEqual(second, unplanned)
+        self.assertEqual(first_requests, 3) #pages are walked up to the first one from the future
+        self.assertEqual(second_requests, 2) #page 3 isn't fetched
+
+    def test_moved_lessons_are_replanned(self):
+        self.check()
+        moved, requests = self.check(moved_lessons)
+
+        self.assertEqual(moved, self.check(moved_lessons, plan_pages=False)[0])
+        self.assertEqual(requests, 3)
+
+    def test_other_school_years_are_not_reused(self):
+        #the same journal ids a year later, all their pages were from the future
+        self.check(years=(YEAR + 1, YEAR + 2))
+        checked, requests = self.check()
+
+        self.assertEqual(checked, self.check(plan_pages=False)[0])
+        self.assertEqual(requests, 3)
+
+    def test_planners_are_kept_per_login(self):
+        self.check()
+        _, requests = self.check(login='other')
+
+        self.assertEqual(requests, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from stand_in import StandInTest, summary
+from JournalParser import whatif
+from JournalParser.params import Params
+from JournalParser.procpool import worker_params
+
+
+class ProcessPoolTest(StandInTest):
+    def test_pool_matches_sequential(self):
+        self.assertEqual(summary(self.execute(process_pool=True, processes=2)), summary(self.execute()))
+
+    def test_pooled_snapshot_is_kept(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            reevaluated = []
+            for n, params in enumerate([{}, dict(process_pool=True, processes=2)]):
+                snapshot_file = os.path.join(tmp, '{}.pkl'.format(n))
+                self.execute(snapshot=True, snapshot_file=snapshot_file, **params)
+
+                with mock.patch.object(whatif, 'excelify'):
+                    results = whatif.reevaluate([dict(check_RO=True, term_percent=10, snapshot_file=snapshot_file)])
+                reevaluated.append(summary(results[0]))
+
+        self.assertTrue(reevaluated[0]['5А'])
+        self.assertEqual(reevaluated[1], reevaluated[0])
+
+    def test_worker_params_have_no_credentials(self):
+        PARAMS = Params(dict(login='user', password='secret', check_RO=True, min_for_5=4.6, allowed_not_row='Физ, Хим'))
+        params = worker_params(PARAMS)
+
+        self.assertNotIn('secret', repr(params))
+        self.assertNotIn('user', repr(params))
+        rebuilt = Params(params)
+        self.assertEqual(rebuilt.checks_signature(), PARAMS.checks_signature())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Compares the indexed lookups of the report tables with the row scans the tables used to do
+    python -m unittest discover tests
+"""
+
+import pickle
+import unittest
+from Report.objects import Columns, OverallTable, OverallSubjectsTable
+
+SUBJECTS = ['Математика', 'Русский язык', 'Физика']
+
+
+def overall_page(grades, seed=0):
+    head = '<tr>{}</tr>'.format(''.join('<td>h{}</td>'.format(i) for i in range(11)))
+    rows = ['<tr><td>{}</td>{}</tr>'.format(grade, ''.join('<td>{}</td>'.format(cell) for cell in (
+        str(n + seed), '3', 'x', '{},5%'.format(40 + n + seed), str(n % 7), '', 'a', 'b', 'c')))
+        for n, grade in enumerate(grades)]
+    rows.append('<tr><td>итог</td>{}</tr>'.format('<td>1</td>' * 9))
+    return '<html><table><thead>{}</thead><tbody>{}</tbody></table></html>'.format(head, ''.join(rows))
+
+
+def subjects_page(grades, seed=0):
+    head = '<tr><td></td>{}</tr>'.format(''.join('<td>{}</td>'.format(subject) for subject in SUBJECTS))
+    rows = ['<tr><td>{}</td>{}</tr>'.format(grade, ''.join('<td>{}</td><td>{}</td>'.format(n * 7 + s + seed, 'x')
+                                                          for s in range(len(SUBJECTS))))
+            for n, grade in enumerate(grades)]
+    rows.append('<tr class="tr_summary"><td>итог</td>{}</tr>'.format('<td>1</td>' * 6))
+    return '<html><table class="table no-print"><thead>{}</thead><tbody>{}</tbody></table></html>'.format(
+        head, ''.join(rows))
+
+
+def scanned_overall_qualities(table):
+    #qualities as OverallTable found them by scanning its rows
+    grades = [row[0] for row in table.data
+              if row[0].startswith(('1', '2', '3', '4', '5', '6', '7', '8', '9')) and len(row[0]) in (2, 3)]
+    return dict(zip(grades, [[row[3]] for row in table.data if row[0] in grades]))
+
+
+def scanned_subjects_qualities(table):
+    #qualities as OverallSubjectsTable found them with list.index
+    grades = [row[0] for row in table.data]
+    return {subj: {grade: [table.data[grades.index(grade)][table.subjects.index(subj) + 1]] for grade in grades}
+            for subj in table.subjects}
+
+
+class ColumnsTest(unittest.TestCase):
+    def test_index_is_first_row(self):
+        columns = Columns([['5А', 1], ['5Б', 2, 3], ['5А', 4]], ['x', 'y', 'x'])
+
+        self.assertEqual(columns.index, {'5А': 0, '5Б': 1})
+        self.assertEqual(columns.name_index, {'x': 0, 'y': 1})
+        self.assertEqual(columns.value(1, 2), 3)
+        self.assertEqual(columns.rows(), [['5А', 1], ['5Б', 2, 3], ['5А', 4]])
+        with self.assertRaises(IndexError):
+            columns.value(0, 2)
+
+
+class ColumnTableTest(unittest.TestCase):
+    def test_overall_table(self):
+        table = OverallTable(overall_page(['5А', '5Б', '6А', '6А']))
+
+        self.assertEqual(table.header, ['h0', 'h1', 'h3', 'h4', 'h5', 'h6', 'h7', 'h8', 'h9', 'h10'])
+        self.assertEqual(table.data[0], ['5А', 0, 'x', 40.5, 0, '']) #values are typed when the table is built
+        self.assertEqual(table.grades, ['5А', '5Б', '6А', '6А'])
+        self.assertEqual(table.qualities, scanned_overall_qualities(table))
+
+    def test_subjects_table(self):
+        table = OverallSubjectsTable(subjects_page(['5А', '5Б', '6А', '5А']))
+
+        self.assertEqual(table.subjects, SUBJECTS)
+        self.assertEqual(table.data[1], ['5Б', 7, 8, 9])
+        self.assertEqual(table.qualities, scanned_subjects_qualities(table))
+
+    def test_merged_tables(self):
+        for cls, page in ((OverallTable, overall_page), (OverallSubjectsTable, subjects_page)):
+            with self.subTest(cls.__name__):
+                table = cls(page(['5А', '5Б']))
+                other = cls(page(['10А', '11А'], seed=3))
+                table.merge_tables(other)
+
+                self.assertEqual(table.data, cls(page(['5А', '5Б'])).data + other.data)
+                self.assertEqual(table.grades, ['5А', '5Б', '10А', '11А'])
+                scanned = scanned_overall_qualities if cls is OverallTable else scanned_subjects_qualities
+                self.assertEqual(table.qualities, scanned(table))
+                with self.assertRaises(TypeError):
+                    table.merge_tables(OverallSubjectsTable(subjects_page(['5А'])) if cls is OverallTable
+                                       else OverallTable(overall_page(['5А'])))
+
+    def test_past_year_and_crop(self):
+        table = OverallSubjectsTable(subjects_page(['4А', '5А', '9А', '10А']), crop=(4, 5), past_year=True)
+
+        self.assertEqual(table.grades, ['5А', '6А'])
+        self.assertEqual(table.qualities, scanned_subjects_qualities(table))
+
+    def test_no_dom_is_kept(self):
+        table = OverallSubjectsTable(subjects_page(['5А', '5Б']))
+        restored = pickle.loads(pickle.dumps(table))
+
+        self.assertIsNone(table.raw_page)
+        self.assertEqual(restored.qualities, table.qualities)
+
+
+if __name__ == '__main__':
+    unittest.main()
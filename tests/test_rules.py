@@ -0,0 +1,30 @@
+"""
+Checks the rule registry against the warnings the old Warnings.__deepcheck gave on the stand-in journals
+    python -m unittest discover tests
+"""
+
+import unittest
+from stand_in import BASELINE_CONFIGS, baseline, check_journals
+from JournalParser.params import Params
+from JournalParser.rules import RULES, RuleEngine, enabled_rules
+
+
+class RulesTest(unittest.TestCase):
+    def test_registry_order(self):
+        #__deepcheck wrote the checks in this order
+        self.assertEqual([rule.flag for rule in RULES], ['check_RO', 'check_meta', 'check_students_fill',
+                                                         'check_double_two', 'check_lessons_fill', 'check_term_marks'])
+
+    def test_enabled_rules(self):
+        PARAMS = Params(BASELINE_CONFIGS['ro_double_two'])
+        self.assertEqual([rule.flag for rule in enabled_rules(PARAMS)], ['check_RO', 'check_double_two'])
+        self.assertEqual(set(RuleEngine(PARAMS).costs), {'check_RO', 'check_double_two'})
+
+    def test_matches_baseline(self):
+        for name, params in BASELINE_CONFIGS.items():
+            with self.subTest(name):
+                self.assertEqual(check_journals(numpy_marks=False, **params), baseline(name))
+
+
+if __name__ == '__main__':
+    unittest.main()
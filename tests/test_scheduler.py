@@ -0,0 +1,120 @@
+"""
+Checks the report's TaskGraph: results are dropped once consumed and shared nodes are run once
+    python -m unittest discover tests
+"""
+
+import threading
+import unittest
+from collections import Counter
+from Report.scheduler import TaskGraph
+from Report.spec import ReportPlan, report_specs
+
+
+class Table:
+    """
+    Report table stand-in
+    """
+    def __init__(self, kind, part):
+        self.parts = [(kind, part)]
+        self.qualities = None
+
+    def merge_tables(self, *others):
+        for other in others:
+            self.parts += other.parts
+
+
+class TaskGraphTest(unittest.TestCase):
+    def test_results_are_dropped_once_consumed(self):
+        graph = TaskGraph(1)
+        seen = {}
+
+        def table(page):
+            seen['table'] = set(graph.results)
+            return page.upper()
+
+        def report(table):
+            seen['report'] = set(graph.results)
+            return table + '!'
+
+        graph.add('page', lambda: 'markup')
+        graph.add('table', table, 'page')
+        graph.add('report', report, 'table')
+
+        self.assertEqual(graph.run(keep=['report']), {'report': 'MARKUP!'})
+        self.assertEqual(seen, {'table': set(), 'report': set()})
+        self.assertEqual(graph.results, {'report': 'MARKUP!'})
+
+    def test_shared_result_is_kept_for_all_dependents(self):
+        graph = TaskGraph(1)
+        graph.add('page', lambda: 2)
+        for n in range(3):
+            graph.add(('table', n), lambda page, n=n: page * n, 'page')
+
+        self.assertEqual(graph.run(keep=[('table', n) for n in range(3)]),
+                         {('table', 0): 0, ('table', 1): 2, ('table', 2): 4})
+
+    def test_dropped_result_cannot_be_depended_on(self):
+        graph = TaskGraph(1)
+        graph.add('page', lambda: 1)
+        graph.add('table', lambda page: page, 'page')
+        graph.run()
+
+        with self.assertRaises(KeyError):
+            graph.add('late', lambda page: page, 'page')
+
+    def test_add_once_from_running_nodes(self):
+        graph = TaskGraph(8)
+        calls = Counter()
+        lock = threading.Lock()
+
+        def shared():
+            with lock:
+                calls['shared'] += 1
+
+        def adder():
+            graph.add_once('shared', shared)
+
+        for n in range(32):
+            graph.add(('adder', n), adder)
+        graph.run()
+
+        self.assertEqual(calls, {'shared': 1})
+        with self.assertRaises(ValueError):
+            graph.add('shared', shared)
+
+
+class ReportPlanTest(unittest.TestCase):
+    def test_every_page_is_fetched_once(self):
+        for TERM in range(1, 5):
+            with self.subTest(TERM=TERM):
+                fetched, built, written = Counter(), Counter(), []
+                lock = threading.Lock()
+
+                def fetch(page):
+                    with lock:
+                        fetched[page] += 1
+                    return page
+
+                def build(kind, part, page):
+                    with lock:
+                        built[kind, part] += 1
+                    return Table(kind, part)
+
+                graph = TaskGraph(8)
+                plan = ReportPlan(graph, fetch, build)
+                overall, subjects, _ = report_specs(TERM, 5)
+                for spec in (overall, subjects):
+                    for parts in spec.columns:
+                        written.append((plan.column(spec.kind, parts), spec.kind, parts))
+                results = graph.run(keep=[key for key, _, _ in written])
+
+                self.assertEqual(set(fetched.values()), {1})
+                self.assertEqual(set(built.values()), {1})
+                self.assertEqual(len(fetched), len({(kind, part.year, part.terms_count, part.term_number)
+                                                    for kind, part in built}))
+                for key, kind, parts in written:
+                    self.assertEqual(results[key].parts, [(kind, part) for part in parts])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Checks that SingleFlightSession shares requests and parsed pages of callers asking for the same url at once
+    python -m unittest discover tests
+"""
+
+import time
+import threading
+import unittest
+from stand_in import Response, Signal, StandInTest, journal_page, summary
+from JournalParser.params import Params
+from JournalParser.singleflight import SingleFlightSession
+
+JOURNAL = 'https://edu.tatar.ru/school/journal/school_editor?term=1&criteria=1&edu_class_id=100'
+
+
+class SlowSession:
+    def __init__(self):
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        with self._lock:
+            self.requests.append(url)
+        time.sleep(0.1)
+        return Response(url, journal_page('1', 1, 1))
+
+
+class SingleFlightTest(unittest.TestCase):
+    def call_at_once(self, func, urls):
+        results = [None] * len(urls)
+
+        def call(n):
+            results[n] = func(urls[n])
+
+        threads = [threading.Thread(target=call, args=(n,)) for n in range(len(urls))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return results
+
+    def test_coalesced_callers_share_parsed_page(self):
+        SESSION = SlowSession()
+        flight = SingleFlightSession(SESSION)
+        soups = self.call_at_once(flight.soup, [JOURNAL, JOURNAL + '&page=1'] * 4) #both are the journal's first page
+
+        self.assertEqual(len(SESSION.requests), 1)
+        self.assertTrue(all(soup is soups[0] for soup in soups))
+        self.assertEqual(flight.stats()['shared_soups'], 7)
+
+        self.assertIsNot(flight.soup(JOURNAL), soups[0]) #parsed pages aren't kept
+        self.assertEqual(len(SESSION.requests), 2) #journal pages aren't memoized
+
+    def test_coalesced_gets_share_response(self):
+        SESSION = SlowSession()
+        flight = SingleFlightSession(SESSION)
+        url = 'https://edu.tatar.ru/school'
+        responses = self.call_at_once(flight.get, [url] * 4)
+
+        self.assertEqual(len(SESSION.requests), 1)
+        self.assertTrue(all(r is responses[0] for r in responses))
+        self.assertIs(flight.get(url), responses[0]) #other pages are memoized
+        self.assertEqual(flight.stats(), {'requests': 1, 'memo': 1, 'shared': 3, 'shared_soups': 0})
+
+    def test_off_by_default(self):
+        self.assertFalse(Params({}).single_flight)
+
+
+class SingleFlightCheckTest(StandInTest):
+    def test_matches_plain_session(self):
+        plain = summary(self.execute(fetch_threads=4))
+        plain_requests = len(self.journal_requests())
+
+        self.setUp()
+        label = Signal()
+        self.assertEqual(summary(self.execute(label, fetch_threads=4, single_flight=True)), plain)
+        self.assertLessEqual(len(self.journal_requests()), plain_requests)
+        self.assertTrue(any(value.startswith('Запросы: ') for value in label.values)) #stats are shown in the label
+
+
+if __name__ == '__main__':
+    unittest.main()